@@ -0,0 +1,66 @@
+"""Dashboard load: full recompute vs materialized views, plus a consistency check.
+
+Run with ``python -m benchmarks.bench_aggregates``.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+
+from pea_bpn import InventoryItem, InventoryStore
+from pea_bpn.aggregates import DashboardViews, check_consistency, recompute
+
+from .bench_transfers import make_snapshot
+
+SIZES = (1_000, 10_000, 100_000)
+EVENTS = 2_000
+
+
+def run(sizes=SIZES) -> list[dict]:
+    results = []
+    for n in sizes:
+        inventory, _ = make_snapshot(n)
+        vehicles = [{"vehicleId": f"V-{i:03d}", "items": []} for i in range(50)]
+        store = InventoryStore.from_snapshot(inventory, vehicles)
+        views = DashboardViews(store)
+        rng = random.Random(n)
+        ids = [i["id"] for i in inventory]
+
+        start = time.perf_counter()
+        for k in range(EVENTS):
+            if k % 3:
+                store.apply_transfers(f"V-{rng.randrange(50):03d}", [{"itemId": rng.choice(ids), "quantity": 1}])
+            else:
+                item = store.item(rng.choice(ids))
+                store.upsert_item(
+                    InventoryItem(item.id, item.name, rng.choice(("cable", "fuse")), item.quantity + 1, item.unit, 10)
+                )
+        update_s = (time.perf_counter() - start) / EVENTS
+
+        start = time.perf_counter()
+        for _ in range(20):
+            views.snapshot()
+        view_s = (time.perf_counter() - start) / 20
+        start = time.perf_counter()
+        recompute(store).to_dict()
+        full_s = time.perf_counter() - start
+
+        problems = check_consistency(views)
+        results.append(
+            {"items": n, "full_s": full_s, "view_s": view_s, "update_s": update_s, "consistent": not problems}
+        )
+    return results
+
+
+def main() -> None:
+    print(f"{'items':>8} {'recompute ms':>13} {'view ms':>9} {'update us':>10} {'consistent':>11}")
+    for r in run():
+        print(
+            f"{r['items']:>8} {r['full_s'] * 1e3:>13.2f} {r['view_s'] * 1e3:>9.3f} "
+            f"{r['update_s'] * 1e6:>10.1f} {str(r['consistent']):>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
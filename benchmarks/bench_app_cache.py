@@ -0,0 +1,69 @@
+"""Streamlit rerun cost: reload from storage per rerun vs the shared cache.
+
+A "rerun" reads what the header and sidebar need (user, low-stock count,
+vehicle list). Run with ``python -m benchmarks.bench_app_cache``.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import time
+from pathlib import Path
+
+from pea_bpn import InventoryStore
+from pea_bpn.app_cache import get_app_data, session_view
+from pea_bpn.persistence import SqliteRepository
+
+from .bench_transfers import make_snapshot
+
+SIZES = (1_000, 10_000, 100_000)
+RERUNS = 200
+
+
+def _seed(path: Path, n: int) -> None:
+    inventory, vehicles = make_snapshot(n)
+    with SqliteRepository(path) as repo:
+        repo.save_all(InventoryStore.from_snapshot(inventory, vehicles))
+
+
+def run(sizes=SIZES) -> list[dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            path = Path(tmp) / f"depot-{n}.db"
+            _seed(path, n)
+
+            reloads = max(3, RERUNS // (n // 1_000))
+            start = time.perf_counter()
+            for _ in range(reloads):
+                with SqliteRepository(path) as repo:
+                    store = repo.load_store()
+                    sum(1 for i in store.items() if i.quantity <= i.min_threshold)
+                    list(store.vehicles())
+            reload_s = (time.perf_counter() - start) / reloads
+
+            get_app_data(path)  # first load, paid once per process
+            state: dict = {}
+            start = time.perf_counter()
+            for i in range(RERUNS):
+                data = get_app_data(path)
+                view = session_view(state, data)
+                data.low_stock.count
+                view.memo("vehicles", lambda: list(data.store.vehicles()))
+                if i % 50 == 0:
+                    with data.write() as store:
+                        item = next(store.items())
+                        store.set_quantity(item.id, item.quantity + 1)
+            cached_s = (time.perf_counter() - start) / RERUNS
+            results.append({"items": n, "reload_s": reload_s, "cached_s": cached_s})
+    return results
+
+
+def main() -> None:
+    print(f"{'items':>8} {'reload ms/rerun':>16} {'cached ms/rerun':>16}")
+    for r in run():
+        print(f"{r['items']:>8} {r['reload_s'] * 1e3:>16.2f} {r['cached_s'] * 1e3:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Concurrent login load test: UI-thread stalls, throughput and lookups.
+
+Submits a burst of logins through :class:`Authenticator` from the main
+thread, which meanwhile ticks like a UI loop every millisecond, and
+reports the longest gap between ticks. Also compares username lookup
+against the legacy ``users.find`` scan and cached vs uncached session
+checks. Every synthetic user shares one precomputed password hash, so
+seeding 10k users does not cost 10k key derivations. Run with
+``python -m benchmarks.bench_auth [iterations]``.
+"""
+
+from __future__ import annotations
+
+import random
+import secrets
+import sys
+import time
+
+from pea_bpn.auth import Authenticator, PasswordHasher, SessionTokens, UserRecord, UserStore
+from pea_bpn.datagen import users as synthetic_users
+from pea_bpn.metrics import Histogram
+
+from .run import legacy_login
+
+USERS = 10_000
+LOGINS = 200
+WORKERS = 4
+ITERATIONS = 100_000
+TICK = 0.001
+
+
+def _stats(samples: list[float]) -> tuple[float, float]:
+    hist = Histogram()
+    for s in samples:
+        hist.observe(s)
+    return hist.quantile(0.5), hist.quantile(0.95)
+
+
+def run(iterations: int = ITERATIONS, n_users: int = USERS, logins: int = LOGINS) -> dict:
+    rng = random.Random(0)
+    hasher = PasswordHasher(iterations)
+    shared = hasher.hash("secret")
+    records = synthetic_users(n_users)
+    store = UserStore(hasher)
+    for r in records:
+        store.add(UserRecord(r["id"], r["name"], r["username"], r["role"], shared))
+    for r in records:
+        r["password"] = "secret"
+    names = [rng.choice(records)["username"] for _ in range(logins)]
+
+    secret = secrets.token_bytes(32)
+    with Authenticator(store, SessionTokens(secret), workers=WORKERS) as auth:
+        submit: list[float] = []
+        gaps: list[float] = []
+        start = time.perf_counter()
+        futures = []
+        for i, name in enumerate(names):
+            t = time.perf_counter()
+            futures.append(auth.login(name, "secret" if i % 10 else "wrong"))
+            submit.append(time.perf_counter() - t)
+        last = time.perf_counter()
+        while not all(f.done() for f in futures):
+            time.sleep(TICK)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+        elapsed = time.perf_counter() - start
+        results = [f.result() for f in futures]
+        tokens = [r.token for r in results if r.token]
+
+        probe = rng.sample(names, 100)
+        t = time.perf_counter()
+        for name in probe:
+            store.by_username(name)
+        indexed_s = (time.perf_counter() - t) / len(probe)
+        t = time.perf_counter()
+        for name in probe:
+            legacy_login(records, name, "secret")
+        scan_s = (time.perf_counter() - t) / len(probe)
+
+        t = time.perf_counter()
+        for token in tokens:
+            auth.session(token)
+        cached_s = (time.perf_counter() - t) / len(tokens)
+        cold = SessionTokens(secret)
+        t = time.perf_counter()
+        for token in tokens:
+            cold.verify(token)
+        uncached_s = (time.perf_counter() - t) / len(tokens)
+
+    p50, p95 = _stats(gaps)
+    return {
+        "iterations": iterations,
+        "users": n_users,
+        "logins": logins,
+        "accepted": len(tokens),
+        "logins_per_s": logins / elapsed,
+        "submit_max_s": max(submit),
+        "ui_gap_p50_s": p50,
+        "ui_gap_p95_s": p95,
+        "ui_gap_max_s": max(gaps, default=0.0),
+        "indexed_lookup_s": indexed_s,
+        "scan_lookup_s": scan_s,
+        "session_cached_s": cached_s,
+        "session_uncached_s": uncached_s,
+    }
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else ITERATIONS
+    r = run(iterations)
+    print(f"{r['logins']} logins over {r['users']} users, pbkdf2 x{r['iterations']}, {WORKERS} workers")
+    print(f"  accepted            {r['accepted']:>10}")
+    print(f"  throughput          {r['logins_per_s']:>10.1f} logins/s")
+    print(f"  slowest submit      {r['submit_max_s'] * 1e3:>10.3f} ms")
+    print(
+        f"  UI tick gap         {r['ui_gap_p50_s'] * 1e3:>10.3f} ms p50, "
+        f"{r['ui_gap_p95_s'] * 1e3:.3f} ms p95, {r['ui_gap_max_s'] * 1e3:.3f} ms max (tick {TICK * 1e3:g} ms)"
+    )
+    print(f"  lookup indexed      {r['indexed_lookup_s'] * 1e6:>10.2f} µs")
+    print(f"  lookup linear scan  {r['scan_lookup_s'] * 1e6:>10.2f} µs")
+    print(f"  session cached      {r['session_cached_s'] * 1e6:>10.2f} µs")
+    print(f"  session uncached    {r['session_uncached_s'] * 1e6:>10.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Streaming backup/restore of a 1M-row synthetic depot.
+
+Times export and validated import at full size, then compares peak traced
+memory of the NDJSON reader with loading the same data as one JSON
+document, as the Dashboard import does, at a smaller size. Run with
+``python -m benchmarks.bench_backup [rows]``.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from pea_bpn.backup import export_records, read_backup, write_backup
+
+ROWS = 1_000_000
+
+
+def synthetic_records(rows: int):
+    for i in range(rows):
+        yield "inventory", {
+            "id": f"ITM-{i:07d}",
+            "name": f"Item {i}",
+            "category": ("cable", "meter", "fuse", "tool")[i % 4],
+            "quantity": i % 500,
+            "unit": "pcs",
+            "minThreshold": 10,
+        }
+
+
+def _peak(fn) -> int:
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def run(rows: int = ROWS, memory_rows: int = 200_000) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "backup.ndjson"
+        start = time.perf_counter()
+        with path.open("w", encoding="utf-8") as fh:
+            write_backup(fh, export_records(synthetic_records(rows), {"inventory": rows}))
+        export_s = time.perf_counter() - start
+        size = path.stat().st_size
+
+        start = time.perf_counter()
+        with path.open(encoding="utf-8") as fh:
+            for _ in read_backup(fh):
+                pass
+        import_s = time.perf_counter() - start
+
+        small = Path(tmp) / "small.ndjson"
+        with small.open("w", encoding="utf-8") as fh:
+            write_backup(fh, export_records(synthetic_records(memory_rows), {"inventory": memory_rows}))
+        document = Path(tmp) / "backup.json"
+        document.write_text(
+            json.dumps({"inventory": [d for _, d in synthetic_records(memory_rows)], "vehicles": []})
+        )
+
+        def stream_import() -> None:
+            with small.open(encoding="utf-8") as fh:
+                for _ in read_backup(fh):
+                    pass
+
+        stream_peak = _peak(stream_import)
+        document_peak = _peak(lambda: json.loads(document.read_text()))
+
+    return {
+        "rows": rows,
+        "bytes": size,
+        "export_s": export_s,
+        "import_s": import_s,
+        "memory_rows": memory_rows,
+        "stream_peak_bytes": stream_peak,
+        "document_peak_bytes": document_peak,
+    }
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    r = run(rows)
+    mb = 1024 * 1024
+    print(f"{r['rows']} rows, {r['bytes'] / mb:.0f} MB: export {r['export_s']:.1f} s, import+validate {r['import_s']:.1f} s")
+    print(
+        f"peak memory at {r['memory_rows']} rows: streaming {r['stream_peak_bytes'] / mb:.1f} MB, "
+        f"whole document {r['document_peak_bytes'] / mb:.1f} MB"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Memory and transfer time: list-of-dicts vs keyed records vs columnar.
+
+Run with ``python -m benchmarks.bench_columnar``.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+import tracemalloc
+
+from pea_bpn import InventoryStore
+from pea_bpn.columnar import ColumnarInventory
+
+from .bench_transfers import legacy_transfer, make_snapshot
+
+SIZES = (10_000, 100_000)
+LINES = 50
+REPEAT = 5
+
+
+def _memory(build) -> tuple[object, int]:
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+
+def _best(fn) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes=SIZES) -> list[dict]:
+    results = []
+    for n in sizes:
+        rng = random.Random(n)
+        dicts, dict_mem = _memory(lambda: make_snapshot(n))
+        inventory, vehicles = dicts  # type: ignore[misc]
+        store, store_mem = _memory(lambda: InventoryStore.from_snapshot(inventory, vehicles))
+        table, table_mem = _memory(lambda: ColumnarInventory.from_records(inventory, vehicles))
+        transfers = [{"itemId": inventory[i]["id"], "quantity": 1} for i in rng.sample(range(n), LINES)]
+
+        def columnar_with_snapshot() -> None:
+            table.snapshot()  # type: ignore[union-attr]
+            table.apply_transfers("V-001", transfers)  # type: ignore[union-attr]
+
+        results.append(
+            {
+                "items": n,
+                "dicts_bytes": dict_mem,
+                "store_bytes": store_mem,
+                "columnar_bytes": table_mem,
+                "dicts_transfer_s": _best(lambda: legacy_transfer(inventory, vehicles, "V-001", transfers)),
+                "store_transfer_s": _best(lambda: store.apply_transfers("V-001", transfers)),  # type: ignore[union-attr]
+                "columnar_transfer_s": _best(columnar_with_snapshot),
+            }
+        )
+    return results
+
+
+def main() -> None:
+    mb = 1024 * 1024
+    print(f"{'items':>8} {'dicts MB':>9} {'records MB':>11} {'columnar MB':>12} "
+          f"{'dicts ms':>9} {'records ms':>11} {'columnar+snap ms':>17}")
+    for r in run():
+        print(
+            f"{r['items']:>8} {r['dicts_bytes'] / mb:>9.1f} {r['store_bytes'] / mb:>11.1f} "
+            f"{r['columnar_bytes'] / mb:>12.1f} {r['dicts_transfer_s'] * 1e3:>9.2f} "
+            f"{r['store_transfer_s'] * 1e3:>11.3f} {r['columnar_transfer_s'] * 1e3:>17.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
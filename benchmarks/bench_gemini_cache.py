@@ -0,0 +1,80 @@
+"""Hit rate and latency of the Gemini cache against an offline stub model.
+
+Eight help-desk threads ask questions drawn from a skewed distribution over
+a small set of prompts while the inventory occasionally changes. Run with
+``python -m benchmarks.bench_gemini_cache``.
+"""
+
+from __future__ import annotations
+
+import random
+import statistics
+import threading
+import time
+
+from pea_bpn import InventoryStore
+from pea_bpn.gemini_cache import GeminiCache, SnapshotHasher, StubModel
+
+from .bench_transfers import make_snapshot
+
+MODEL = "gemini-1.5-flash"
+PROMPTS = [f"วิธีเบิกพัสดุหมายเลข {i} เข้ารถ?" for i in range(40)]
+THREADS = 8
+CALLS_PER_THREAD = 100
+STUB_LATENCY = 0.02
+
+
+def run() -> dict:
+    inventory, vehicles = make_snapshot(1_000)
+    store = InventoryStore.from_snapshot(inventory, vehicles)
+    hasher = SnapshotHasher(store)
+    stub = StubModel(STUB_LATENCY)
+    cache = GeminiCache(stub, ttl=60, max_entries=256)
+    weights = [1 / (rank + 1) for rank in range(len(PROMPTS))]
+    lock = threading.Lock()
+
+    def worker(n: int) -> None:
+        rng = random.Random(n)
+        for i in range(CALLS_PER_THREAD):
+            if n == 0 and i % 25 == 0:
+                with lock:
+                    item_id = inventory[rng.randrange(len(inventory))]["id"]
+                    store.set_quantity(item_id, store.item(item_id).quantity - 1)
+            prompt = rng.choices(PROMPTS, weights)[0]
+            cache.generate(MODEL, prompt, hasher.digest)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(THREADS)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    m = cache.metrics
+    calls = THREADS * CALLS_PER_THREAD
+    return {
+        "calls": calls,
+        "model_calls": stub.calls,
+        "hit_rate": m.hit_rate,
+        "mean_latency_s": statistics.fmean(m.call_latencies),
+        "uncached_latency_s": STUB_LATENCY,
+        "elapsed_s": elapsed,
+        "uncached_elapsed_s": calls * STUB_LATENCY / THREADS,
+        "tokens_saved": m.tokens_saved,
+    }
+
+
+def main() -> None:
+    r = run()
+    print(
+        f"{r['calls']} calls -> {r['model_calls']} model calls, hit rate {r['hit_rate']:.1%}, "
+        f"{r['tokens_saved']} tokens saved"
+    )
+    print(
+        f"mean latency {r['mean_latency_s'] * 1e3:.2f} ms vs {r['uncached_latency_s'] * 1e3:.0f} ms uncached; "
+        f"wall {r['elapsed_s']:.2f} s vs ~{r['uncached_elapsed_s']:.2f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Low-stock count: full filter per render vs the incremental index.
+
+Run with ``python -m benchmarks.bench_lowstock``.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+
+from pea_bpn import InventoryStore
+from pea_bpn.lowstock import LowStockIndex
+
+from .bench_transfers import make_snapshot
+
+SIZES = (1_000, 10_000, 100_000)
+UPDATES = 1_000
+
+
+def run(sizes=SIZES) -> list[dict]:
+    results = []
+    for n in sizes:
+        inventory, vehicles = make_snapshot(n)
+        rng = random.Random(n)
+        for item in inventory:
+            item["quantity"] = rng.randint(0, 40)
+        store = InventoryStore.from_snapshot(inventory, vehicles)
+        ids = [item["id"] for item in inventory]
+        edits = [(rng.choice(ids), rng.randint(0, 40)) for _ in range(UPDATES)]
+
+        start = time.perf_counter()
+        for item_id, qty in edits:
+            store.set_quantity(item_id, qty)
+            sum(1 for i in store.items() if i.quantity <= i.min_threshold)
+        scan_s = (time.perf_counter() - start) / UPDATES
+
+        index = LowStockIndex(store)
+        start = time.perf_counter()
+        for item_id, qty in edits:
+            store.set_quantity(item_id, qty)
+            index.count
+            index.top(10)
+        index_s = (time.perf_counter() - start) / UPDATES
+        assert index.count == sum(1 for i in store.items() if i.quantity <= i.min_threshold)
+        index.close()
+        results.append({"items": n, "scan_s": scan_s, "index_s": index_s})
+    return results
+
+
+def main() -> None:
+    print(f"{'items':>8} {'filter us/update':>17} {'index us/update':>16}")
+    for r in run():
+        print(f"{r['items']:>8} {r['scan_s'] * 1e6:>17.1f} {r['index_s'] * 1e6:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Write amplification: full JSON snapshot per change vs per-record SQLite.
+
+The snapshot side mirrors the ``useEffect`` in app.py that re-serializes
+``inventory``, ``vehicles`` and ``app_users`` after any change. Run with
+``python -m benchmarks.bench_persistence``.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from pea_bpn import InventoryStore
+from pea_bpn.persistence import SqliteRepository
+
+from .bench_transfers import make_snapshot
+
+SIZES = (1_000, 10_000, 100_000)
+CHANGES = 200
+
+
+def run(sizes=SIZES, changes: int = CHANGES) -> list[dict]:
+    results = []
+    for n in sizes:
+        inventory, vehicles = make_snapshot(n)
+        ids = [item["id"] for item in inventory]
+        rng = random.Random(n)
+        edits = [rng.choice(ids) for _ in range(changes)]
+
+        store = InventoryStore.from_snapshot(inventory, vehicles)
+        snapshot_bytes = 0
+        start = time.perf_counter()
+        for item_id in edits:
+            store.set_quantity(item_id, store.item(item_id).quantity - 1)
+            snap = store.snapshot()
+            snapshot_bytes += len(json.dumps(snap["inventory"]).encode())
+            snapshot_bytes += len(json.dumps(snap["vehicles"]).encode())
+        snapshot_s = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as tmp:
+            repo = SqliteRepository(Path(tmp) / "depot.db")
+            store = InventoryStore.from_snapshot(inventory, vehicles)
+            repo.save_all(store)
+            repo.attach(store)
+            base = repo.stats.bytes_written
+            start = time.perf_counter()
+            for item_id in edits:
+                store.set_quantity(item_id, store.item(item_id).quantity - 1)
+                repo.flush()
+            delta_s = time.perf_counter() - start
+            delta_bytes = repo.stats.bytes_written - base
+            repo.close()
+
+        results.append(
+            {
+                "items": n,
+                "changes": changes,
+                "snapshot_bytes": snapshot_bytes,
+                "snapshot_s": snapshot_s,
+                "delta_bytes": delta_bytes,
+                "delta_s": delta_s,
+            }
+        )
+    return results
+
+
+def main() -> None:
+    print(f"{'items':>8} {'snapshot KB/chg':>16} {'delta B/chg':>12} {'snapshot ms/chg':>16} {'delta ms/chg':>13}")
+    for r in run():
+        c = r["changes"]
+        print(
+            f"{r['items']:>8} {r['snapshot_bytes'] / c / 1024:>16.1f} {r['delta_bytes'] / c:>12.1f} "
+            f"{r['snapshot_s'] / c * 1e3:>16.3f} {r['delta_s'] / c * 1e3:>13.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Page cost: render-everything vs the paginated index and vehicle join.
+
+The "broad" columns search for ``itm``, which every id matches: the first
+search collects the matches, later reruns reuse them.
+Run with ``python -m benchmarks.bench_query``.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+
+from pea_bpn import InventoryStore
+from pea_bpn.query import InventoryIndex, VehicleJoin
+
+from .bench_transfers import make_snapshot
+
+SIZES = (1_000, 10_000, 100_000)
+PAGE = 50
+REPEAT = 20
+
+
+def _per_call(fn) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return (time.perf_counter() - start) / REPEAT
+
+
+def run(sizes=SIZES) -> list[dict]:
+    results = []
+    for n in sizes:
+        inventory, _ = make_snapshot(n)
+        rng = random.Random(n)
+        vehicle_items = [{"itemId": inventory[i]["id"], "quantity": 1} for i in rng.sample(range(n), min(n, 500))]
+        vehicles = [{"vehicleId": "V-001", "items": vehicle_items}]
+        store = InventoryStore.from_snapshot(inventory, vehicles)
+        index = InventoryIndex(store)
+        join = VehicleJoin(store)
+
+        def render_all() -> None:
+            rows = sorted(inventory, key=lambda i: i["name"])
+            [r for r in rows if r["name"].lower().startswith("item 12")]
+            [
+                {**next(i for i in inventory if i["id"] == line["itemId"]), "onVehicle": line["quantity"]}
+                for line in vehicle_items[:PAGE]
+            ]
+
+        def paged() -> None:
+            index.query(sort="name", offset=n // 2, limit=PAGE)
+            index.query(prefix="item 12", sort="name", limit=PAGE)
+            join.page("V-001", 0, PAGE)
+
+        def broad() -> None:
+            index.count("itm")
+            index.query(prefix="itm", sort="name", offset=10 * PAGE, limit=PAGE)
+
+        start = time.perf_counter()
+        broad()
+        broad_first_s = time.perf_counter() - start
+        results.append(
+            {
+                "items": n,
+                "full_s": _per_call(render_all),
+                "paged_s": _per_call(paged),
+                "broad_first_s": broad_first_s,
+                "broad_s": _per_call(broad),
+            }
+        )
+    return results
+
+
+def main() -> None:
+    print(f"{'items':>8} {'full ms':>10} {'paged ms':>10} {'broad 1st ms':>13} {'broad ms':>10}")
+    for r in run():
+        print(
+            f"{r['items']:>8} {r['full_s'] * 1e3:>10.2f} {r['paged_s'] * 1e3:>10.3f}"
+            f" {r['broad_first_s'] * 1e3:>13.3f} {r['broad_s'] * 1e3:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
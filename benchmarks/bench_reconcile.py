@@ -0,0 +1,106 @@
+"""Daily reconciliation of a 5k-vehicle fleet: in-process vs process pool.
+
+Opening stock comes from ``datagen.fleet``. A quarter of the vehicles get
+one or two transfers before the 07:00-09:00 count and one in the
+afternoon. The day's counts are generated from the stock as it stood at
+the count, with ``datagen``'s usual ~2% discrepancy rate, so only those
+injected discrepancies should be flagged.
+
+Also reports how long pickling the inputs alone takes. It exceeds the whole
+in-process run, which is why ``reconcile`` only uses a pool when asked
+to. Run with ``python -m benchmarks.bench_reconcile [vehicles]``.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from pea_bpn import DailyCountLog, TransferLine, TransferRecord
+from pea_bpn.datagen import daily_logs, fleet, inventory
+from pea_bpn.reconcile import day_bounds, reconcile
+
+VEHICLES = 5_000
+ITEMS = 20_000
+DAY = date(2024, 1, 1)
+
+
+def make_day(n_vehicles: int, seed: int = 0):
+    rng = random.Random(seed)
+    items = inventory(ITEMS, seed)
+    vehicles = fleet(n_vehicles, items, items_per_vehicle=30, seed=seed)
+    opening = {v["vehicleId"]: {line["itemId"]: line["quantity"] for line in v["items"]} for v in vehicles}
+
+    start, _ = day_bounds(DAY)
+    transfers = []
+    for vehicle_id in rng.sample(sorted(opening), n_vehicles // 4):
+        for _ in range(rng.randint(1, 2)):
+            lines = tuple(TransferLine(rng.choice(items)["id"], rng.randint(1, 10)) for _ in range(3))
+            transfers.append(TransferRecord(vehicle_id, lines, start + rng.randrange(6 * 3600)))
+        lines = tuple(TransferLine(rng.choice(items)["id"], rng.randint(1, 10)) for _ in range(3))
+        transfers.append(TransferRecord(vehicle_id, lines, start + 12 * 3600 + rng.randrange(6 * 3600)))
+
+    # Counts start at 07:00, so the stock they see includes the morning
+    # transfers only.
+    closing = {vehicle_id: dict(stock) for vehicle_id, stock in opening.items()}
+    for record in transfers:
+        if record.at >= start + 7 * 3600:
+            continue
+        for line in record.lines:
+            stock = closing[record.vehicle_id]
+            stock[line.item_id] = stock.get(line.item_id, 0) + line.quantity
+    counted = [
+        {"vehicleId": v, "items": [{"itemId": i, "quantity": q} for i, q in s.items()]} for v, s in closing.items()
+    ]
+    logs = [DailyCountLog.from_dict(d) for d in daily_logs(counted, days=1, start=DAY, seed=seed)]
+    return opening, transfers, logs
+
+
+def _time(fn) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def run(n_vehicles: int = VEHICLES) -> dict:
+    opening, transfers, logs = make_day(n_vehicles)
+    serial_s, report = _time(lambda: reconcile(DAY, opening, transfers, logs, workers=1))
+    workers = os.cpu_count() or 1
+    pool_s, pooled = _time(lambda: reconcile(DAY, opening, transfers, logs, workers=max(2, workers)))
+    with ProcessPoolExecutor(max_workers=max(2, workers)) as pool:
+        reconcile(DAY, opening, transfers, logs, executor=pool)  # warm the workers
+        warm_s, _ = _time(lambda: reconcile(DAY, opening, transfers, logs, executor=pool))
+    assert pooled.rows() == report.rows()  # type: ignore[union-attr]
+    pickle_s, _ = _time(lambda: pickle.dumps((opening, transfers, logs)))
+    return {
+        "vehicles": n_vehicles,
+        "lines": sum(len(s) for s in opening.values()),
+        "cpus": workers,
+        "serial_s": serial_s,
+        "pool_s": pool_s,
+        "warm_pool_s": warm_s,
+        "pickle_s": pickle_s,
+        "flagged": len(report.flagged),  # type: ignore[union-attr]
+        "discrepancies": report.discrepancy_count,  # type: ignore[union-attr]
+    }
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else VEHICLES
+    r = run(n)
+    print(f"{r['vehicles']} vehicles, {r['lines']} stock lines, {r['cpus']} CPUs")
+    print(f"  in-process          {r['serial_s'] * 1e3:>9.1f} ms")
+    print(f"  new process pool    {r['pool_s'] * 1e3:>9.1f} ms")
+    print(f"  warm process pool   {r['warm_pool_s'] * 1e3:>9.1f} ms")
+    print(f"  pickling the inputs {r['pickle_s'] * 1e3:>9.1f} ms")
+    print(f"  flagged vehicles    {r['flagged']:>9}")
+    print(f"  discrepancies       {r['discrepancies']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Scans/second absorbed: one transfer+persist per scan vs batched ingestion.
+
+Run with ``python -m benchmarks.bench_scan_ingest``.
+"""
+
+from __future__ import annotations
+
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from pea_bpn import InventoryStore
+from pea_bpn.persistence import SqliteRepository
+from pea_bpn.scan_ingest import ScanIngestor
+
+from .bench_transfers import make_snapshot
+
+ITEMS = 5_000
+VEHICLES = 20
+SCANS = 50_000
+BURST = 40
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _scans(seed: int = 0):
+    rng = random.Random(seed)
+    for n in range(SCANS):
+        vehicle = f"V-{(n // BURST) % VEHICLES:03d}"
+        yield vehicle, f"ITM-{rng.randrange(ITEMS):06d}"
+
+
+def _setup(directory: str):
+    inventory, _ = make_snapshot(ITEMS)
+    vehicles = [{"vehicleId": f"V-{i:03d}", "items": []} for i in range(VEHICLES)]
+    store = InventoryStore.from_snapshot(inventory, vehicles)
+    repo = SqliteRepository(Path(directory) / f"depot-{time.monotonic_ns()}.db")
+    repo.save_all(store)
+    repo.attach(store)
+    return store, repo
+
+
+def run() -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        return _run(tmp)
+
+
+def _run(tmp: str) -> dict:
+    store, repo = _setup(tmp)
+    start = time.perf_counter()
+    for vehicle_id, code in _scans():
+        store.apply_transfers(vehicle_id, [{"itemId": code, "quantity": 1}])
+        repo.flush()
+    per_scan_s = time.perf_counter() - start
+    repo.close()
+
+    store, repo = _setup(tmp)
+    clock = FakeClock()
+
+    def commit(vehicle_id, lines):
+        store.apply_transfers(vehicle_id, lines)
+        repo.flush()
+
+    ingestor = ScanIngestor(commit, clock=clock)
+    start = time.perf_counter()
+    for n, (vehicle_id, code) in enumerate(_scans()):
+        clock.now += 0.05
+        ingestor.push(vehicle_id, code)
+        if n % BURST == BURST - 1:
+            clock.now += 1.0
+            ingestor.poll()
+    ingestor.flush()
+    batched_s = time.perf_counter() - start
+    repo.close()
+
+    return {
+        "scans": SCANS,
+        "per_scan_sps": SCANS / per_scan_s,
+        "batched_sps": SCANS / batched_s,
+        "batches": ingestor.metrics.batches,
+        "duplicates": ingestor.metrics.duplicates,
+    }
+
+
+def main() -> None:
+    r = run()
+    print(f"{r['scans']} scans in bursts of {BURST}")
+    print(f"  per-scan transfer+persist: {r['per_scan_sps']:>10.0f} scans/s ({r['scans']} commits)")
+    print(f"  batched ingestion:         {r['batched_sps']:>10.0f} scans/s ({r['batches']} commits)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Rows and time per Sheets sync: full rewrite vs delta, against the fake server.
+
+Run with ``python -m benchmarks.bench_sheets_sync``.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+
+from pea_bpn import InventoryStore
+from pea_bpn.fake_sheets import FakeSheetsServer
+from pea_bpn.sheets_sync import HEADER, HttpSheetsTransport, SheetsSyncEngine, item_row
+
+from .bench_transfers import make_snapshot
+
+SIZES = (1_000, 10_000, 50_000)
+CHANGED_FRACTION = 0.01
+
+
+def run(sizes=SIZES) -> list[dict]:
+    results = []
+    with FakeSheetsServer() as server:
+        transport = HttpSheetsTransport("bench-token", base_url=server.url)
+        for n in sizes:
+            inventory, vehicles = make_snapshot(n)
+            store = InventoryStore.from_snapshot(inventory, vehicles)
+
+            start = time.perf_counter()
+            transport.batch_update(
+                f"full-{n}",
+                [{"range": "Sheet1!A1", "values": [HEADER, *(item_row(i) for i in store.items())]}],
+            )
+            full_s = time.perf_counter() - start
+
+            engine = SheetsSyncEngine(transport, f"delta-{n}")
+            engine.attach(store)
+            engine.sync()
+            rng = random.Random(n)
+            for item_id in rng.sample([i["id"] for i in inventory], int(n * CHANGED_FRACTION)):
+                store.set_quantity(item_id, store.item(item_id).quantity - 1)
+            start = time.perf_counter()
+            sent = engine.sync()
+            delta_s = time.perf_counter() - start
+
+            results.append(
+                {"items": n, "full_rows": n + 1, "full_s": full_s, "delta_rows": sent, "delta_s": delta_s}
+            )
+    return results
+
+
+def main() -> None:
+    print(f"{'items':>8} {'full rows':>10} {'full ms':>9} {'delta rows':>11} {'delta ms':>9}")
+    for r in run():
+        print(
+            f"{r['items']:>8} {r['full_rows']:>10} {r['full_s'] * 1e3:>9.1f} "
+            f"{r['delta_rows']:>11} {r['delta_s'] * 1e3:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
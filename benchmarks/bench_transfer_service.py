@@ -0,0 +1,96 @@
+"""Concurrent load test of the transfer service with simulated scanners.
+
+Each scanner thread repeatedly transfers 1-5 lines from a shared hot set of
+items onto its own vehicle. Reports committed transfers per second,
+conflicts, and checks that no stock was created or lost. Run with
+``python -m benchmarks.bench_transfer_service``.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+
+from pea_bpn import InventoryStore, TransferLine
+from pea_bpn.transfer_service import TransferConflict, TransferService
+
+from .bench_transfers import make_snapshot
+
+ITEMS = 10_000
+HOT_ITEMS = 200
+SCANNERS = 16
+TRANSFERS_PER_SCANNER = 2_000
+TARGET_TPS = 5_000
+
+
+def run(
+    scanners: int = SCANNERS,
+    per_scanner: int = TRANSFERS_PER_SCANNER,
+    items: int = ITEMS,
+) -> dict:
+    inventory, _ = make_snapshot(items)
+    # Hot items are scarce, so late transfers run into insufficient stock.
+    for item in inventory[:HOT_ITEMS]:
+        item["quantity"] = 500
+    vehicles = [{"vehicleId": f"V-{i:03d}", "items": []} for i in range(scanners)]
+    store = InventoryStore.from_snapshot(inventory, vehicles)
+    service = TransferService(store)
+    total_before = sum(i.quantity for i in store.items())
+
+    committed = [0] * scanners
+    conflicts = [0] * scanners
+    barrier = threading.Barrier(scanners + 1)
+
+    def scanner(n: int) -> None:
+        rng = random.Random(n)
+        vehicle_id = f"V-{n:03d}"
+        barrier.wait()
+        for _ in range(per_scanner):
+            lines = [
+                TransferLine(inventory[rng.randrange(HOT_ITEMS)]["id"], rng.randint(1, 3))
+                for _ in range(rng.randint(1, 5))
+            ]
+            try:
+                service.transfer(vehicle_id, lines)
+                committed[n] += 1
+            except TransferConflict:
+                conflicts[n] += 1
+
+    threads = [threading.Thread(target=scanner, args=(n,)) for n in range(scanners)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    on_vehicles = sum(sum(v.items.values()) for v in store.vehicles())
+    total_after = sum(i.quantity for i in store.items()) + on_vehicles
+    assert total_after == total_before, "stock was created or lost"
+    assert all(i.quantity >= 0 for i in store.items()), "negative stock"
+
+    tps = sum(committed) / elapsed
+    return {
+        "scanners": scanners,
+        "committed": sum(committed),
+        "conflicts": sum(conflicts),
+        "elapsed_s": elapsed,
+        "tps": tps,
+        "target_tps": TARGET_TPS,
+        "meets_target": tps >= TARGET_TPS,
+    }
+
+
+def main() -> None:
+    r = run()
+    print(
+        f"{r['scanners']} scanners: {r['committed']} committed, {r['conflicts']} rejected "
+        f"in {r['elapsed_s']:.2f} s -> {r['tps']:.0f} transfers/s "
+        f"(target {r['target_tps']}: {'ok' if r['meets_target'] else 'MISSED'})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Transfer cost vs catalogue size: array scans vs the keyed store.
+
+Run with ``python -m benchmarks.bench_transfers``.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+
+from pea_bpn import InventoryStore
+
+SIZES = (100, 1_000, 10_000, 100_000)
+LINES = 50
+REPEAT = 5
+
+
+def make_snapshot(n_items: int, seed: int = 0) -> tuple[list[dict], list[dict]]:
+    rng = random.Random(seed)
+    inventory = [
+        {
+            "id": f"ITM-{i:06d}",
+            "name": f"Item {i}",
+            "category": rng.choice(("cable", "meter", "fuse", "tool")),
+            "quantity": 10_000,
+            "unit": "pcs",
+            "minThreshold": 10,
+        }
+        for i in range(n_items)
+    ]
+    vehicles = [{"vehicleId": "V-001", "items": []}]
+    return inventory, vehicles
+
+
+def legacy_transfer(inventory, vehicles, vehicle_id, transfers):
+    """Line-for-line port of ``handleTransferItems`` from app.py."""
+    new_inventory = []
+    for item in inventory:
+        transfer = next((t for t in transfers if t["itemId"] == item["id"]), None)
+        if transfer:
+            item = {**item, "quantity": max(0, item["quantity"] - transfer["quantity"])}
+        new_inventory.append(item)
+
+    new_vehicles = []
+    for vehicle in vehicles:
+        if vehicle["vehicleId"] == vehicle_id:
+            updated = list(vehicle["items"])
+            for transfer in transfers:
+                idx = next(
+                    (i for i, v in enumerate(updated) if v["itemId"] == transfer["itemId"]), -1
+                )
+                if idx > -1:
+                    updated[idx] = {**updated[idx], "quantity": updated[idx]["quantity"] + transfer["quantity"]}
+                else:
+                    updated.append({"itemId": transfer["itemId"], "quantity": transfer["quantity"]})
+            vehicle = {**vehicle, "items": updated}
+        new_vehicles.append(vehicle)
+    return new_inventory, new_vehicles
+
+
+def _best(fn) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes=SIZES) -> list[dict]:
+    results = []
+    for n in sizes:
+        inventory, vehicles = make_snapshot(n)
+        rng = random.Random(n)
+        transfers = [
+            {"itemId": inventory[i]["id"], "quantity": 1}
+            for i in rng.sample(range(n), min(LINES, n))
+        ]
+        store = InventoryStore.from_snapshot(inventory, vehicles)
+        legacy = _best(lambda: legacy_transfer(inventory, vehicles, "V-001", transfers))
+        keyed = _best(lambda: store.apply_transfers("V-001", transfers))
+        results.append({"items": n, "lines": len(transfers), "legacy_s": legacy, "store_s": keyed})
+    return results
+
+
+def main() -> None:
+    print(f"{'items':>8} {'legacy ms':>11} {'store ms':>10} {'speedup':>9}")
+    for r in run():
+        print(
+            f"{r['items']:>8} {r['legacy_s'] * 1e3:>11.3f} {r['store_s'] * 1e3:>10.3f} "
+            f"{r['legacy_s'] / r['store_s']:>8.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
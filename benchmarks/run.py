@@ -0,0 +1,286 @@
+"""Scenario suite over seeded synthetic depots, with JSON output.
+
+Run with ``python -m benchmarks.run [--scale small|medium|large]
+[--scenario NAME ...] [--output results.json] [--baseline old.json]``.
+Results carry the git commit they were produced from. With ``--baseline``,
+each metric is printed next to the baseline value and their ratio.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable
+
+from pea_bpn import InventoryStore
+from pea_bpn.auth import Authenticator, PasswordHasher, UserStore
+from pea_bpn.backup import export_backup, restore_backup, write_backup
+from pea_bpn.datagen import Depot, depot
+from pea_bpn.fake_sheets import FakeSheetsServer
+from pea_bpn.logstore import checklist_store, daily_count_store
+from pea_bpn.lowstock import LowStockIndex
+from pea_bpn.metrics import Histogram
+from pea_bpn.models import DailyCountLog, EquipmentChecklist
+from pea_bpn.reconcile import reconcile
+from pea_bpn.sheets_sync import HttpSheetsTransport, SheetsSyncEngine
+
+SCALES: dict[str, dict[str, int]] = {
+    "small": {"items": 1_000, "vehicles": 10, "days": 7, "users": 100, "sheets_items": 1_000, "ops": 1_000},
+    "medium": {"items": 100_000, "vehicles": 500, "days": 30, "users": 1_000, "sheets_items": 20_000, "ops": 5_000},
+    "large": {"items": 1_000_000, "vehicles": 5_000, "days": 30, "users": 10_000, "sheets_items": 100_000, "ops": 10_000},
+}  # fmt: skip
+LOGIN_ITERATIONS = 1_000
+
+
+def _latency(samples: list[float]) -> dict[str, float]:
+    hist = Histogram()
+    for s in samples:
+        hist.observe(s)
+    return {
+        "ops": hist.count,
+        "ops_per_s": hist.count / hist.total if hist.total else 0.0,
+        "p50_ms": hist.quantile(0.5) * 1e3,
+        "p95_ms": hist.quantile(0.95) * 1e3,
+    }
+
+
+def transfers(data: Depot, scale: dict[str, int], rng: random.Random) -> dict[str, Any]:
+    store = InventoryStore.from_snapshot(data.inventory, data.vehicles)
+    ids = [item["id"] for item in data.inventory]
+    vehicle_ids = [v["vehicleId"] for v in data.vehicles]
+    samples = []
+    for _ in range(scale["ops"]):
+        lines = [{"itemId": i, "quantity": 1} for i in rng.sample(ids, 5)]
+        vehicle_id = rng.choice(vehicle_ids)
+        start = time.perf_counter()
+        try:
+            store.apply_transfers(vehicle_id, lines)
+        except ValueError:
+            pass
+        samples.append(time.perf_counter() - start)
+    return _latency(samples)
+
+
+def low_stock(data: Depot, scale: dict[str, int], rng: random.Random) -> dict[str, Any]:
+    store = InventoryStore.from_snapshot(data.inventory, data.vehicles)
+    start = time.perf_counter()
+    index = LowStockIndex(store)
+    build_s = time.perf_counter() - start
+    ids = [item["id"] for item in data.inventory]
+    samples = []
+    for _ in range(scale["ops"]):
+        item_id = rng.choice(ids)
+        start = time.perf_counter()
+        store.set_quantity(item_id, rng.randint(0, 60))
+        index.count
+        index.top(20)
+        samples.append(time.perf_counter() - start)
+    return {"build_s": build_s, "low_count": index.count, **_latency(samples)}
+
+
+def backup(data: Depot, scale: dict[str, int], rng: random.Random) -> dict[str, Any]:
+    store = InventoryStore.from_snapshot(data.inventory, data.vehicles)
+    logs = daily_count_store()
+    for record in data.daily_logs:
+        logs.append(DailyCountLog.from_dict(record))
+    lists = checklist_store()
+    for record in data.checklists:
+        lists.append(EquipmentChecklist.from_dict(record))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "backup.ndjson"
+        start = time.perf_counter()
+        with path.open("w", encoding="utf-8") as fh:
+            write_backup(fh, export_backup(store, logs, lists))
+        export_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with path.open(encoding="utf-8") as fh:
+            for _ in restore_backup(fh, InventoryStore(), daily_count_store(), checklist_store()):
+                pass
+        restore_s = time.perf_counter() - start
+        size = path.stat().st_size
+
+    rows = len(data.inventory) + len(data.vehicles) + len(data.daily_logs) + len(data.checklists)
+    return {"rows": rows, "bytes": size, "export_s": export_s, "restore_s": restore_s}
+
+
+def sheets_sync(data: Depot, scale: dict[str, int], rng: random.Random) -> dict[str, Any]:
+    store = InventoryStore.from_snapshot(data.inventory[: scale["sheets_items"]], [])
+    ids = [item.id for item in store.items()]
+    with FakeSheetsServer() as server:
+        engine = SheetsSyncEngine(HttpSheetsTransport("bench-token", base_url=server.url), "bench")
+        engine.attach(store)
+        start = time.perf_counter()
+        full_rows = engine.sync()
+        full_s = time.perf_counter() - start
+
+        for item_id in rng.sample(ids, max(1, len(ids) // 100)):
+            store.set_quantity(item_id, store.item(item_id).quantity + 1)
+        start = time.perf_counter()
+        delta_rows = engine.sync()
+        delta_s = time.perf_counter() - start
+    return {
+        "items": len(ids),
+        "full_rows": full_rows,
+        "full_s": full_s,
+        "delta_rows": delta_rows,
+        "delta_s": delta_s,
+        "requests": engine.metrics.requests,
+    }
+
+
+def legacy_login(users: list[dict[str, Any]], username: str, password: str) -> dict[str, Any] | None:
+    """Port of the ``Login`` component: ``users.find`` on plaintext fields."""
+    return next((u for u in users if u["username"] == username and u["password"] == password), None)
+
+
+def login(data: Depot, scale: dict[str, int], rng: random.Random) -> dict[str, Any]:
+    """Logins through :class:`Authenticator`, next to the legacy scan.
+
+    Uses :data:`LOGIN_ITERATIONS`, far below the production work factor, so
+    the figures show lookup and pool overhead rather than key derivation;
+    ``benchmarks.bench_auth`` load-tests the real cost.
+    """
+    attempts = []
+    for _ in range(min(scale["ops"], 1_000)):
+        user = rng.choice(data.users)
+        # One attempt in ten uses a wrong password, which scans the whole list.
+        attempts.append((user["username"], user["password"] if rng.random() >= 0.1 else "wrong"))
+
+    legacy = []
+    for username, password in attempts:
+        start = time.perf_counter()
+        legacy_login(data.users, username, password)
+        legacy.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor() as pool:
+        users = UserStore.from_records(data.users, PasswordHasher(LOGIN_ITERATIONS), executor=pool)
+    migrate_s = time.perf_counter() - start
+    samples = []
+    failures = 0
+    with Authenticator(users) as auth:
+        for username, password in attempts:
+            start = time.perf_counter()
+            ok = auth.login(username, password).result().ok
+            samples.append(time.perf_counter() - start)
+            failures += not ok
+    legacy_stats = _latency(legacy)
+    return {
+        "users": len(data.users),
+        "iterations": LOGIN_ITERATIONS,
+        "migrate_s": migrate_s,
+        "failures": failures,
+        **_latency(samples),
+        "legacy_p50_ms": legacy_stats["p50_ms"],
+        "legacy_p95_ms": legacy_stats["p95_ms"],
+    }
+
+
+def reconciliation(data: Depot, scale: dict[str, int], rng: random.Random) -> dict[str, Any]:
+    opening = {v["vehicleId"]: {line["itemId"]: line["quantity"] for line in v["items"]} for v in data.vehicles}
+    first_day = data.daily_logs[0]["date"][:10] if data.daily_logs else "2024-01-01"
+    logs = [DailyCountLog.from_dict(d) for d in data.daily_logs if d["date"].startswith(first_day)]
+    start = time.perf_counter()
+    report = reconcile(date.fromisoformat(first_day), opening, (), logs)
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    chunk_size = max(1, len(opening) // 4)
+    pooled = reconcile(date.fromisoformat(first_day), opening, (), logs, workers=2, chunk_size=chunk_size)
+    pool_s = time.perf_counter() - start
+    assert pooled.rows() == report.rows()
+    return {
+        "vehicles": len(report.vehicles),
+        "flagged": len(report.flagged),
+        "discrepancies": report.discrepancy_count,
+        "reconcile_s": elapsed,
+        "pool_s": pool_s,
+    }
+
+
+SCENARIOS: dict[str, Callable[[Depot, dict[str, int], random.Random], dict[str, Any]]] = {
+    "transfers": transfers,
+    "low_stock": low_stock,
+    "backup": backup,
+    "sheets_sync": sheets_sync,
+    "login": login,
+    "reconcile": reconciliation,
+}
+
+
+def _commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run(scale: str = "small", scenarios: list[str] | None = None, seed: int = 0) -> dict[str, Any]:
+    sizes = SCALES[scale]
+    start = time.perf_counter()
+    data = depot(sizes["items"], sizes["vehicles"], days=sizes["days"], n_users=sizes["users"], seed=seed)
+    generate_s = time.perf_counter() - start
+    results = {}
+    for name in scenarios or list(SCENARIOS):
+        results[name] = SCENARIOS[name](data, sizes, random.Random(f"{seed}:{name}"))
+    return {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "scale": scale,
+        "sizes": sizes,
+        "seed": seed,
+        "generate_s": generate_s,
+        "results": results,
+    }
+
+
+def _print(report: dict[str, Any], baseline: dict[str, Any] | None) -> None:
+    print(f"scale={report['scale']} seed={report['seed']} commit={report['commit']}")
+    base = (baseline or {}).get("results", {})
+    for name, metrics in report["results"].items():
+        print(name)
+        for key, value in metrics.items():
+            line = f"  {key:<12} {value:>14.6g}"
+            old = base.get(name, {}).get(key)
+            if isinstance(old, (int, float)) and old:
+                line += f"   baseline {old:>14.6g}   x{value / old:.2f}"
+            print(line)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=Path("benchmark-results.json"))
+    parser.add_argument("--baseline", type=Path)
+    args = parser.parse_args(argv)
+
+    report = run(args.scale, args.scenario, args.seed)
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline else None
+    _print(report, baseline)
+    print(f"wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""Python back end for the PEA BPN depot inventory app."""
+
+from .models import (
+    DailyCountLog,
+    EquipmentChecklist,
+    InventoryItem,
+    TransferLine,
+    TransferRecord,
+    VehicleInventory,
+)
+from .store import InventoryStore, TransferError
+
+__all__ = [
+    "DailyCountLog",
+    "EquipmentChecklist",
+    "InventoryItem",
+    "InventoryStore",
+    "TransferError",
+    "TransferLine",
+    "TransferRecord",
+    "VehicleInventory",
+]
@@ -0,0 +1,167 @@
+"""Incrementally maintained dashboard aggregates.
+
+``Dashboard`` derives its totals from the raw ``inventory`` and ``vehicles``
+arrays on every render. :class:`DashboardViews` keeps the same figures as
+materialized views, updated from store events. The events come from
+transfers (``handleTransferItems``) and edits (``onUpdateInventory``):
+warehouse stock per category, stock per vehicle, fleet-wide issued
+quantity per item, and the low-stock count. Reading them is O(1) in
+inventory size. :func:`check_consistency` compares the views with a full
+recompute.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any
+
+from .lowstock import is_low
+from .store import InventoryStore, ItemChanged, StoreEvent, VehicleChanged, VehicleStockChanged
+
+
+@dataclass(slots=True)
+class Aggregates:
+    item_count: int = 0
+    warehouse_quantity: int = 0
+    low_stock_count: int = 0
+    category_quantity: Counter[str] = field(default_factory=Counter)
+    category_items: Counter[str] = field(default_factory=Counter)
+    vehicle_quantity: Counter[str] = field(default_factory=Counter)
+    issued_by_item: Counter[str] = field(default_factory=Counter)
+    fleet_issued: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Scalar totals plus read-only views of the counters, in O(1).
+
+        The views follow later updates; ``dict()`` one to keep or serialize it.
+        """
+        return {
+            "itemCount": self.item_count,
+            "warehouseQuantity": self.warehouse_quantity,
+            "lowStockCount": self.low_stock_count,
+            "categoryQuantity": MappingProxyType(self.category_quantity),
+            "categoryItems": MappingProxyType(self.category_items),
+            "vehicleQuantity": MappingProxyType(self.vehicle_quantity),
+            "issuedByItem": MappingProxyType(self.issued_by_item),
+            "fleetIssued": self.fleet_issued,
+        }
+
+
+def recompute(store: InventoryStore) -> Aggregates:
+    """Full O(n) computation, the reference for :func:`check_consistency`."""
+    agg = Aggregates()
+    for item in store.items():
+        agg.item_count += 1
+        agg.warehouse_quantity += item.quantity
+        agg.low_stock_count += is_low(item)
+        agg.category_quantity[item.category] += item.quantity
+        agg.category_items[item.category] += 1
+    for vehicle in store.vehicles():
+        total = sum(vehicle.items.values())
+        agg.vehicle_quantity[vehicle.vehicle_id] = total
+        agg.fleet_issued += total
+        agg.issued_by_item.update(vehicle.items)
+    return agg
+
+
+class DashboardViews:
+    """Aggregates kept current from store events."""
+
+    def __init__(self, store: InventoryStore) -> None:
+        self.store = store
+        self.current = recompute(store)
+        # Last-seen state per row, so deltas never depend on ``event.before``.
+        self._items: dict[str, tuple[str, int, bool]] = {
+            item.id: (item.category, item.quantity, is_low(item)) for item in store.items()
+        }
+        self._vehicles: dict[str, dict[str, int]] = {v.vehicle_id: dict(v.items) for v in store.vehicles()}
+        self._unsubscribe = store.subscribe(self._on_change)
+
+    def close(self) -> None:
+        self._unsubscribe()
+
+    def snapshot(self) -> dict[str, Any]:
+        return self.current.to_dict()
+
+    def _on_change(self, event: StoreEvent) -> None:
+        if isinstance(event, ItemChanged):
+            self._item_changed(event)
+        elif isinstance(event, VehicleStockChanged):
+            self._stock_changed(event.vehicle_id, event.item_id, event.after)
+        elif isinstance(event, VehicleChanged):
+            self._vehicle_changed(event)
+
+    def _item_changed(self, event: ItemChanged) -> None:
+        agg = self.current
+        old = self._items.pop(event.item_id, None)
+        if old is not None:
+            category, qty, low = old
+            agg.item_count -= 1
+            agg.warehouse_quantity -= qty
+            agg.low_stock_count -= low
+            agg.category_quantity[category] -= qty
+            _sub(agg.category_items, category, 1)
+            if category not in agg.category_items:
+                agg.category_quantity.pop(category, None)
+        item = event.after
+        if item is not None:
+            low = is_low(item)
+            self._items[item.id] = (item.category, item.quantity, low)
+            agg.item_count += 1
+            agg.warehouse_quantity += item.quantity
+            agg.low_stock_count += low
+            agg.category_quantity[item.category] += item.quantity
+            agg.category_items[item.category] += 1
+
+    def _stock_changed(self, vehicle_id: str, item_id: str, quantity: int) -> None:
+        agg = self.current
+        items = self._vehicles.setdefault(vehicle_id, {})
+        delta = quantity - items.get(item_id, 0)
+        items[item_id] = quantity
+        agg.vehicle_quantity[vehicle_id] += delta
+        _sub(agg.issued_by_item, item_id, -delta)
+        agg.fleet_issued += delta
+
+    def _vehicle_changed(self, event: VehicleChanged) -> None:
+        agg = self.current
+        old = self._vehicles.pop(event.vehicle_id, {})
+        for item_id, qty in old.items():
+            _sub(agg.issued_by_item, item_id, qty)
+            agg.fleet_issued -= qty
+        agg.vehicle_quantity.pop(event.vehicle_id, None)
+        vehicle = event.after
+        if vehicle is not None:
+            self._vehicles[vehicle.vehicle_id] = dict(vehicle.items)
+            total = sum(vehicle.items.values())
+            agg.vehicle_quantity[vehicle.vehicle_id] = total
+            agg.issued_by_item.update(vehicle.items)
+            agg.fleet_issued += total
+
+
+def _sub(counter: Counter[str], key: str, amount: int) -> None:
+    value = counter[key] - amount
+    if value:
+        counter[key] = value
+    else:
+        del counter[key]
+
+
+def check_consistency(views: DashboardViews) -> list[str]:
+    """Differences between the views and a full recompute; empty when consistent."""
+    expected = recompute(views.store)
+    actual = views.current
+    problems = []
+    for name in ("item_count", "warehouse_quantity", "low_stock_count", "fleet_issued"):
+        a, e = getattr(actual, name), getattr(expected, name)
+        if a != e:
+            problems.append(f"{name}: view {a} != recomputed {e}")
+    for name in ("category_quantity", "category_items", "vehicle_quantity", "issued_by_item"):
+        # Zero entries (e.g. an empty vehicle) are equivalent to missing ones.
+        a = Counter({k: v for k, v in getattr(actual, name).items() if v})
+        e = Counter({k: v for k, v in getattr(expected, name).items() if v})
+        for key in sorted(set(a) | set(e)):
+            if a[key] != e[key]:
+                problems.append(f"{name}[{key!r}]: view {a[key]} != recomputed {e[key]}")
+    return problems
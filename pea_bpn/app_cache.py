@@ -0,0 +1,221 @@
+"""Process-wide data cache for the Streamlit app.
+
+Streamlit reruns the whole script on every widget interaction. Ported
+directly, the mount effect in ``App`` would reload ``inventory``,
+``vehicles``, ``app_users`` and ``google_tokens`` from storage on each
+rerun. Here the data is loaded once per process into :class:`AppData`,
+which ``st.cache_resource`` shares across sessions. Writes go through
+:meth:`AppData.write`, which flushes the changed rows and bumps a
+generation counter. Each session's :class:`SessionView` holds its own UI
+state and recomputes derived lists only when the generation moves, so a
+rerun costs O(1) in inventory size.
+"""
+
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from os import PathLike
+from typing import Any, Callable, Iterator, MutableMapping, TypeVar
+
+from .auth import Authenticator, Revocation, SessionTokens, UserRecord, UserStore
+from .lowstock import LowStockIndex
+from .metrics import REGISTRY
+from .persistence import SqliteRepository
+from .store import InventoryStore
+
+T = TypeVar("T")
+
+SESSION_KEY = "pea_bpn_view"
+
+
+class AppData:
+    """Shared store, indexes and keyed records for every session."""
+
+    def __init__(self, repo: SqliteRepository) -> None:
+        self.repo = repo
+        self.store = repo.load_store()
+        self.low_stock = LowStockIndex(self.store)
+        self.users: dict[str, Any] = dict(repo.iter_records("app_users"))
+        self.google_tokens = repo.get_record("settings", "google_tokens")
+        self.generation = 0
+        self.lock = threading.RLock()
+        self.auth = self._open_auth()
+        self.record_sizes()
+
+    def _open_auth(self) -> Authenticator:
+        """Index ``app_users`` and restore session revocations.
+
+        Plaintext passwords are rewritten as hashes, and the default admin
+        is seeded when there are no users, on the auth pool:
+        :attr:`users_loaded` completes when that is done.
+        """
+        secret = self.repo.get_record("settings", "session_secret")
+        if secret is None:
+            secret = secrets.token_hex(32)
+            self.repo.put_record("settings", "session_secret", secret)
+        now = time.time()
+        revoked = {}
+        for token, expires_at in list(self.repo.iter_records("session_revoked")):
+            if expires_at > now:
+                revoked[token] = expires_at
+            else:
+                self.repo.delete_record("session_revoked", token)
+        sessions = SessionTokens(
+            bytes.fromhex(secret),
+            revoked=revoked,
+            generations=dict(self.repo.iter_records("session_generations")),
+            on_revoked=self._store_revocation,
+        )
+        auth = Authenticator(UserStore(), sessions, on_user_changed=self._store_user)
+        self.users_loaded = auth.import_users(list(self.users.values()))
+        return auth
+
+    def _store_revocation(self, revocation: Revocation) -> None:
+        with self.lock:
+            if revocation.kind == "token":
+                self.repo.put_record("session_revoked", revocation.key, revocation.value)
+            else:
+                # Concurrent bumps may report out of order; store the latest.
+                generation = self.auth.sessions.generation(revocation.key)
+                self.repo.put_record("session_generations", revocation.key, generation)
+
+    def _store_user(self, record: UserRecord) -> None:
+        data = record.to_dict()
+        with self.lock:
+            self.users[record.id] = data
+            self.repo.put_record("app_users", record.id, data)
+            self.generation += 1
+            REGISTRY.set_gauge("app_users", len(self.users))
+
+    @contextmanager
+    def write(self) -> Iterator[InventoryStore]:
+        """Mutate the store; changed rows are persisted and views invalidated."""
+        with self.lock:
+            try:
+                yield self.store
+            finally:
+                self.repo.flush()
+                self.generation += 1
+                self.record_sizes()
+
+    def put_user(self, user: dict[str, Any]) -> Future[UserRecord]:
+        """Add or edit a user on the auth pool; see :meth:`Authenticator.put_user`.
+
+        The record is stored, and views invalidated, when the future completes.
+        """
+        return self.auth.put_user(user)
+
+    def delete_user(self, user_id: str) -> None:
+        with self.lock:
+            self.users.pop(user_id, None)
+            self.auth.users.remove(user_id)
+            self.auth.sessions.revoke_user(user_id)
+            self.repo.delete_record("app_users", user_id)
+            self.generation += 1
+            REGISTRY.set_gauge("app_users", len(self.users))
+
+    def set_google_tokens(self, tokens: dict[str, Any] | None) -> None:
+        with self.lock:
+            self.google_tokens = tokens
+            if tokens is None:
+                self.repo.delete_record("settings", "google_tokens")
+            else:
+                self.repo.put_record("settings", "google_tokens", tokens)
+            self.generation += 1
+
+    def record_sizes(self) -> None:
+        """Data-size gauges for the performance panel's trend charts."""
+        with self.lock:
+            REGISTRY.set_gauge("inventory_items", len(self.store))
+            REGISTRY.set_gauge("vehicles", sum(1 for _ in self.store.vehicles()))
+            REGISTRY.set_gauge("low_stock_items", self.low_stock.count)
+            REGISTRY.set_gauge("app_users", len(self.users))
+
+    def invalidate(self) -> None:
+        """Force every session to recompute its derived views."""
+        with self.lock:
+            self.generation += 1
+
+
+def open_app_data(path: str | PathLike[str]) -> AppData:
+    return AppData(SqliteRepository(path, check_same_thread=False))
+
+
+_fallback: dict[str, AppData] = {}
+_fallback_lock = threading.Lock()
+
+
+def get_app_data(path: str | PathLike[str]) -> AppData:
+    """The process-wide :class:`AppData` for ``path``.
+
+    Uses ``st.cache_resource`` when Streamlit is installed, otherwise a
+    module-level cache, so the same code runs in scripts and benchmarks.
+    """
+    try:
+        import streamlit as st
+    except ImportError:
+        with _fallback_lock:
+            data = _fallback.get(str(path))
+            if data is None:
+                data = _fallback[str(path)] = open_app_data(path)
+            return data
+    return _cached_app_data(st)(str(path))
+
+
+_cached: Callable[[str], AppData] | None = None
+
+
+def _cached_app_data(st: Any) -> Callable[[str], AppData]:
+    global _cached
+    if _cached is None:
+        _cached = st.cache_resource(show_spinner=False)(open_app_data)
+    return _cached
+
+
+@dataclass(slots=True)
+class SessionView:
+    """Per-session UI state plus derived data memoized per generation."""
+
+    active_tab: str = "dashboard"
+    search: str = ""
+    page: int = 0
+    user_id: str | None = None
+    generation: int = -1
+    _memo: dict[str, Any] = field(default_factory=dict)
+    _data: AppData | None = field(default=None, repr=False, compare=False)
+
+    def sync(self, data: AppData) -> None:
+        self._data = data
+        if self.generation != data.generation:
+            self._memo.clear()
+            self.generation = data.generation
+
+    def memo(self, name: str, compute: Callable[[], T]) -> T:
+        """``compute()`` once per data generation; call :meth:`sync` first.
+
+        Each session runs on its own thread, so ``compute`` holds
+        :attr:`AppData.lock` while it reads the shared store; writers hold
+        it too, so iteration never sees a dict change size.
+        """
+        try:
+            return self._memo[name]
+        except KeyError:
+            if self._data is None:
+                raise RuntimeError("SessionView.sync() must be called before memo()") from None
+            with self._data.lock:
+                value = self._memo[name] = compute()
+            return value
+
+
+def session_view(state: MutableMapping[str, Any], data: AppData) -> SessionView:
+    """This session's view from ``st.session_state``, synced to ``data``."""
+    view = state.get(SESSION_KEY)
+    if view is None:
+        view = state[SESSION_KEY] = SessionView()
+    view.sync(data)
+    return view
@@ -0,0 +1,558 @@
+"""Hashed credentials, O(1) user lookup and signed session tokens.
+
+The front end keeps ``app_users`` with plaintext ``password`` fields,
+seeds ``admin/admin`` in the mount effect, finds the user with a linear
+``users.find`` and persists the whole ``user`` object as the session.
+:class:`UserStore` indexes users by id and username and holds only salted
+PBKDF2 hashes with a tunable iteration count. Plaintext records are
+migrated on load. :class:`Authenticator` runs the hashing on a worker
+pool, so the calling (UI) thread only submits and polls a future.
+hashlib releases the GIL while it derives keys, so workers also run in
+parallel. Sessions are HMAC-signed tokens, and verified tokens are cached,
+so checking a session on each rerun is a dict lookup.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import heapq
+import hmac
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, Literal, Mapping, TypeVar
+
+from .metrics import REGISTRY
+
+T = TypeVar("T")
+
+Role = Literal["ADMIN", "USER"]
+
+ALGORITHM = "pbkdf2_sha256"
+DEFAULT_ITERATIONS = 600_000
+SALT_BYTES = 16
+
+DEFAULT_ADMIN = {"id": "U-ADMIN", "name": "ผู้ดูแลระบบ", "username": "admin", "password": "admin", "role": "ADMIN"}
+
+
+class AuthError(ValueError):
+    pass
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class PasswordHasher:
+    """``pbkdf2_sha256$<iterations>$<salt>$<hash>`` encoded password hashes."""
+
+    def __init__(self, iterations: int = DEFAULT_ITERATIONS) -> None:
+        if iterations < 1:
+            raise ValueError("iterations must be positive")
+        self.iterations = iterations
+        self._dummy: str | None = None
+        self._dummy_lock = threading.Lock()
+
+    def _dummy_hash(self) -> str:
+        # Verified against when the username is unknown, so a miss costs
+        # as much as a wrong password and does not reveal which users exist.
+        # Derived on first use, i.e. on the login pool rather than at startup.
+        with self._dummy_lock:
+            if self._dummy is None:
+                self._dummy = self.hash(secrets.token_urlsafe(16))
+            return self._dummy
+
+    def hash(self, password: str, *, salt: bytes | None = None) -> str:
+        salt = salt if salt is not None else secrets.token_bytes(SALT_BYTES)
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, self.iterations)
+        return f"{ALGORITHM}${self.iterations}${_b64(salt)}${_b64(digest)}"
+
+    def verify(self, password: str, encoded: str | None) -> bool:
+        if encoded is None:
+            self.verify(password, self._dummy_hash())
+            return False
+        try:
+            algorithm, iterations, salt, expected = encoded.split("$")
+            if algorithm != ALGORITHM:
+                return False
+            digest = hashlib.pbkdf2_hmac("sha256", password.encode(), _unb64(salt), int(iterations))
+        except ValueError:
+            return False
+        return hmac.compare_digest(digest, _unb64(expected))
+
+    def needs_rehash(self, encoded: str) -> bool:
+        """True when ``encoded`` was made with a different work factor."""
+        parts = encoded.split("$")
+        return len(parts) != 4 or parts[0] != ALGORITHM or parts[1] != str(self.iterations)
+
+
+@dataclass(slots=True)
+class UserRecord:
+    id: str
+    name: str
+    username: str
+    role: Role
+    password_hash: str
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], hasher: PasswordHasher) -> UserRecord:
+        """Load an ``app_users`` record.
+
+        A plaintext ``password`` (legacy records, or a new password from the
+        user form) is hashed and takes precedence over ``passwordHash``.
+        """
+        known = {"id", "name", "username", "role", "password", "passwordHash"}
+        if "password" in data:
+            encoded = hasher.hash(str(data["password"]))
+        elif "passwordHash" in data:
+            encoded = str(data["passwordHash"])
+        else:
+            raise AuthError(f"user {data.get('id')!r} has no password")
+        return cls(
+            id=str(data["id"]),
+            name=str(data.get("name", "")),
+            username=str(data["username"]),
+            role="ADMIN" if data.get("role") == "ADMIN" else "USER",
+            password_hash=encoded,
+            extra={k: v for k, v in data.items() if k not in known},
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Storage form; never contains the plaintext password."""
+        return {**self.public_dict(), "passwordHash": self.password_hash}
+
+    def public_dict(self) -> dict[str, Any]:
+        """The ``user`` object handed to the UI."""
+        return {"id": self.id, "name": self.name, "username": self.username, "role": self.role, **self.extra}
+
+
+class UserStore:
+    """Users keyed by id and by username."""
+
+    def __init__(self, hasher: PasswordHasher | None = None) -> None:
+        self.hasher = hasher or PasswordHasher()
+        self._by_id: dict[str, UserRecord] = {}
+        self._by_username: dict[str, UserRecord] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[Mapping[str, Any]],
+        hasher: PasswordHasher | None = None,
+        *,
+        executor: ThreadPoolExecutor | None = None,
+    ) -> UserStore:
+        """Load ``app_users``; plaintext passwords are hashed on ``executor``."""
+        users = cls(hasher)
+        records = list(records)
+        if executor is None:
+            parsed: Iterable[UserRecord] = (UserRecord.from_dict(r, users.hasher) for r in records)
+        else:
+            parsed = executor.map(lambda r: UserRecord.from_dict(r, users.hasher), records)
+        for record in parsed:
+            users.add(record)
+        return users
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[UserRecord]:
+        return iter(list(self._by_id.values()))
+
+    def get(self, user_id: str) -> UserRecord | None:
+        return self._by_id.get(user_id)
+
+    def by_username(self, username: str) -> UserRecord | None:
+        return self._by_username.get(username)
+
+    def add(self, record: UserRecord) -> None:
+        with self._lock:
+            owner = self._by_username.get(record.username)
+            if owner is not None and owner.id != record.id:
+                raise AuthError(f"username {record.username!r} is taken by {owner.id!r}")
+            old = self._by_id.get(record.id)
+            if old is not None and old.username != record.username:
+                del self._by_username[old.username]
+            self._by_id[record.id] = record
+            self._by_username[record.username] = record
+
+    def create(self, user_id: str, name: str, username: str, password: str, role: Role = "USER") -> UserRecord:
+        """Hashes on the calling thread; the UI goes through :meth:`Authenticator.put_user`."""
+        record = UserRecord(user_id, name, username, role, self.hasher.hash(password))
+        self.add(record)
+        return record
+
+    def set_password(self, user_id: str, password: str) -> UserRecord:
+        """Hashes on the calling thread; the UI goes through :meth:`Authenticator.change_password`."""
+        record = self._by_id[user_id]
+        record.password_hash = self.hasher.hash(password)
+        return record
+
+    def remove(self, user_id: str) -> UserRecord | None:
+        with self._lock:
+            record = self._by_id.pop(user_id, None)
+            if record is not None:
+                del self._by_username[record.username]
+            return record
+
+    def ensure_admin(self) -> UserRecord | None:
+        """Seed the default admin, hashed, when there are no users at all.
+
+        Returns the new record so the caller can persist it.
+        """
+        with self._lock:
+            if self._by_id:
+                return None
+            record = UserRecord.from_dict(DEFAULT_ADMIN, self.hasher)
+            self.add(record)
+            return record
+
+
+@dataclass(frozen=True, slots=True)
+class Session:
+    user_id: str
+    role: Role
+    expires_at: float
+
+
+
+
+@dataclass(frozen=True, slots=True)
+class Revocation:
+    """One revoked token, or a user whose tokens were all revoked.
+
+    ``value`` is the token's expiry for ``"token"`` and the user's new
+    generation for ``"user"``.
+    """
+
+    kind: Literal["token", "user"]
+    key: str
+    value: float
+
+
+class SessionTokens:
+    """HMAC-SHA256 signed ``<payload>.<signature>`` tokens with a verify cache.
+
+    Each user has a generation number inside their tokens, so
+    :meth:`revoke_user` (e.g. after a password change) invalidates every
+    outstanding token for that user at once.
+
+    When the secret is persisted, revocations must be too, or revoked
+    tokens verify again after a restart: save each :class:`Revocation`
+    passed to ``on_revoked`` and hand them back as ``revoked`` and
+    ``generations``.
+    """
+
+    def __init__(
+        self,
+        secret: bytes | None = None,
+        *,
+        ttl: float = 12 * 3600.0,
+        max_cached: int = 10_000,
+        clock: Callable[[], float] = time.time,
+        revoked: Mapping[str, float] | None = None,
+        generations: Mapping[str, int] | None = None,
+        on_revoked: Callable[[Revocation], None] | None = None,
+    ) -> None:
+        self._secret = secret if secret is not None else secrets.token_bytes(32)
+        self.ttl = ttl
+        self.max_cached = max_cached
+        self._clock = clock
+        self._cache: OrderedDict[str, Session] = OrderedDict()
+        self._revoked: dict[str, float] = {}
+        # (expires_at, token) min-heap, so expired revocations are dropped
+        # without scanning the rest.
+        self._expiry: list[tuple[float, str]] = []
+        self._generations: dict[str, int] = {str(u): int(g) for u, g in (generations or {}).items()}
+        self.on_revoked = on_revoked
+        self._lock = threading.Lock()
+        now = clock()
+        for token, expires_at in (revoked or {}).items():
+            if float(expires_at) > now:
+                self._revoked[str(token)] = float(expires_at)
+                self._expiry.append((float(expires_at), str(token)))
+        heapq.heapify(self._expiry)
+
+    def generation(self, user_id: str) -> int:
+        return self._generations.get(user_id, 0)
+
+    def _sign(self, payload: str) -> str:
+        return _b64(hmac.new(self._secret, payload.encode("ascii"), hashlib.sha256).digest())
+
+    def _decode(self, token: str) -> _SignedSession | None:
+        """The session in a token we signed, ignoring expiry and revocation."""
+        payload, _, signature = token.partition(".")
+        try:
+            # A non-ASCII token cannot be one we issued; treat it as forged.
+            if not hmac.compare_digest(signature.encode("ascii"), self._sign(payload).encode("ascii")):
+                return None
+            body = json.loads(_unb64(payload))
+            return _SignedSession(body["u"], body["r"], float(body["e"]), int(body["g"]))
+        except (ValueError, TypeError, KeyError):
+            return None
+
+    def issue(self, user: UserRecord) -> str:
+        expires_at = self._clock() + self.ttl
+        body = {"u": user.id, "r": user.role, "e": expires_at, "g": self.generation(user.id)}
+        payload = _b64(json.dumps(body, separators=(",", ":")).encode())
+        token = f"{payload}.{self._sign(payload)}"
+        with self._lock:
+            self._remember(token, Session(user.id, user.role, expires_at))
+        return token
+
+    def verify(self, token: str) -> Session | None:
+        now = self._clock()
+        with self._lock:
+            session = self._cache.get(token)
+            if session is not None:
+                if session.expires_at > now:
+                    self._cache.move_to_end(token)
+                    return session
+                del self._cache[token]
+                return None
+            if token in self._revoked:
+                return None
+        signed = self._decode(token)
+        if signed is None or signed.expires_at <= now:
+            return None
+        with self._lock:
+            # Check again now that the lock is held: a revoke may have run
+            # while the signature was being checked.
+            if token in self._revoked or signed.generation != self.generation(signed.user_id):
+                return None
+            session = Session(signed.user_id, signed.role, signed.expires_at)
+            self._remember(token, session)
+        return session
+
+    def revoke(self, token: str) -> None:
+        """Reject ``token`` from now on.
+
+        Tokens we did not sign are ignored, and revoked ones are forgotten
+        once they would have expired anyway, so the set stays bounded by
+        the tokens issued within one ``ttl``.
+        """
+        now = self._clock()
+        with self._lock:
+            self._cache.pop(token, None)
+            signed = self._decode(token)
+            while self._expiry and self._expiry[0][0] <= now:
+                self._revoked.pop(heapq.heappop(self._expiry)[1], None)
+            if signed is None or signed.expires_at <= now or token in self._revoked:
+                return
+            self._revoked[token] = signed.expires_at
+            heapq.heappush(self._expiry, (signed.expires_at, token))
+        if self.on_revoked is not None:
+            self.on_revoked(Revocation("token", token, signed.expires_at))
+
+    def revoke_user(self, user_id: str) -> None:
+        with self._lock:
+            generation = self._generations[user_id] = self.generation(user_id) + 1
+            for token in [t for t, s in self._cache.items() if s.user_id == user_id]:
+                del self._cache[token]
+        if self.on_revoked is not None:
+            self.on_revoked(Revocation("user", user_id, generation))
+
+    def _remember(self, token: str, session: Session) -> None:
+        self._cache[token] = session
+        while len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+
+
+@dataclass(frozen=True, slots=True)
+class _SignedSession:
+    user_id: str
+    role: Role
+    expires_at: float
+    generation: int
+
+
+@dataclass(frozen=True, slots=True)
+class LoginResult:
+    user: UserRecord | None
+    token: str | None
+
+    @property
+    def ok(self) -> bool:
+        return self.user is not None
+
+
+def _gather(futures: list[Future[T]]) -> Future[list[T]]:
+    """A future for all of ``futures``' results, failing with the first error."""
+    result: Future[list[T]] = Future()
+    remaining = len(futures)
+    lock = threading.Lock()
+
+    def done(_: Future[T]) -> None:
+        nonlocal remaining
+        with lock:
+            remaining -= 1
+            if remaining:
+                return
+        for future in futures:
+            if future.exception() is not None:
+                result.set_exception(future.exception())  # type: ignore[arg-type]
+                return
+        result.set_result([future.result() for future in futures])
+
+    if not futures:
+        result.set_result([])
+    for future in futures:
+        future.add_done_callback(done)
+    return result
+
+
+class Authenticator:
+    """Logins and password changes on a worker pool.
+
+    Nothing here derives a key on the calling (UI) thread: :meth:`login`,
+    :meth:`import_users`, :meth:`put_user` and :meth:`change_password`
+    submit the work and return a future.
+    """
+
+    def __init__(
+        self,
+        users: UserStore,
+        sessions: SessionTokens | None = None,
+        *,
+        workers: int = 4,
+        on_user_changed: Callable[[UserRecord], None] | None = None,
+    ) -> None:
+        self.users = users
+        self.sessions = sessions or SessionTokens()
+        self.on_user_changed = on_user_changed
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auth")
+        self._imports: list[Future[Any]] = []
+
+    def __enter__(self) -> Authenticator:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def _changed(self, record: UserRecord) -> None:
+        if self.on_user_changed is not None:
+            self.on_user_changed(record)
+
+    def import_users(self, records: Iterable[Mapping[str, Any]]) -> Future[list[UserRecord]]:
+        """Load ``app_users`` records.
+
+        Records with a ``passwordHash`` are added at once. Plaintext ones
+        are hashed on the pool, and the default admin is seeded there when
+        there are no records at all. Logins submitted meanwhile wait for the
+        import. ``on_user_changed`` gets every record whose storage form
+        differs from its input, i.e. the ones that need writing back.
+        """
+        futures: list[Future[UserRecord | None]] = []
+        for data in records:
+            if "password" in data:
+                futures.append(self._pool.submit(self._import, dict(data)))
+                continue
+            record = UserRecord.from_dict(data, self.users.hasher)
+            self.users.add(record)
+            if record.to_dict() != data:
+                self._changed(record)
+            done: Future[UserRecord | None] = Future()
+            done.set_result(record)
+            futures.append(done)
+        if not futures:
+            futures.append(self._pool.submit(self._seed_admin))
+        # Queued ahead of any later login, so a login waiting on these
+        # cannot starve them of workers.
+        self._imports = [f for f in futures if not f.done()]
+        imported: Future[list[UserRecord]] = Future()
+
+        def finish(all_done: Future[list[UserRecord | None]]) -> None:
+            error = all_done.exception()
+            if error is not None:
+                imported.set_exception(error)
+            else:
+                imported.set_result([r for r in all_done.result() if r is not None])
+
+        _gather(futures).add_done_callback(finish)
+        return imported
+
+    def _import(self, data: dict[str, Any]) -> UserRecord:
+        record = UserRecord.from_dict(data, self.users.hasher)
+        self.users.add(record)
+        self._changed(record)
+        return record
+
+    def _seed_admin(self) -> UserRecord | None:
+        admin = self.users.ensure_admin()
+        if admin is not None:
+            self._changed(admin)
+        return admin
+
+    def login(self, username: str, password: str) -> Future[LoginResult]:
+        return self._pool.submit(self._login, username, password)
+
+    def login_sync(self, username: str, password: str) -> LoginResult:
+        return self.login(username, password).result()
+
+    def _login(self, username: str, password: str) -> LoginResult:
+        wait(self._imports)
+        with REGISTRY.span("login"):
+            user = self.users.by_username(username)
+            hasher = self.users.hasher
+            if not hasher.verify(password, user.password_hash if user is not None else None):
+                REGISTRY.inc("login_total", result="rejected")
+                return LoginResult(None, None)
+            assert user is not None
+            if hasher.needs_rehash(user.password_hash):
+                user.password_hash = hasher.hash(password)
+                self._changed(user)
+            REGISTRY.inc("login_total", result="ok")
+            return LoginResult(user, self.sessions.issue(user))
+
+    def session(self, token: str | None) -> UserRecord | None:
+        """The user behind ``token``, or ``None``; O(1) for cached tokens."""
+        if not token:
+            return None
+        session = self.sessions.verify(token)
+        return self.users.get(session.user_id) if session is not None else None
+
+    def logout(self, token: str) -> None:
+        self.sessions.revoke(token)
+
+    def put_user(self, data: Mapping[str, Any]) -> Future[UserRecord]:
+        """Add or edit a user from the user form.
+
+        A plaintext ``password`` is hashed and signs out the user's existing
+        sessions; without one the current hash is kept.
+        """
+        return self._pool.submit(self._put_user, dict(data))
+
+    def _put_user(self, data: dict[str, Any]) -> UserRecord:
+        wait(self._imports)
+        old = self.users.get(str(data["id"]))
+        if old is not None and "password" not in data and "passwordHash" not in data:
+            data["passwordHash"] = old.password_hash
+        record = UserRecord.from_dict(data, self.users.hasher)
+        self.users.add(record)
+        if old is not None and old.password_hash != record.password_hash:
+            self.sessions.revoke_user(record.id)
+        self._changed(record)
+        return record
+
+    def change_password(self, user_id: str, password: str) -> Future[UserRecord]:
+        return self._pool.submit(self._change_password, user_id, password)
+
+    def _change_password(self, user_id: str, password: str) -> UserRecord:
+        record = self.users.set_password(user_id, password)
+        self.sessions.revoke_user(user_id)
+        self._changed(record)
+        return record
@@ -0,0 +1,276 @@
+"""Streaming NDJSON backup and restore.
+
+The Dashboard backup serializes ``inventory`` and ``vehicles`` in one
+``JSON.stringify`` and ``onImportData`` needs the whole parsed object before
+anything happens. Here a backup is one JSON document per line::
+
+    {"type": "manifest", "format": "pea-bpn-backup", "version": 1, "counts": {...}}
+    {"type": "inventory", "data": {...}}
+    {"type": "vehicle", "data": {...}}
+    {"type": "dailyLog", "data": {...}}
+    {"type": "checklist", "data": {...}}
+    {"type": "end", "counts": {...}, "checksum": "..."}
+
+Export and import are generators over lines, so apart from the set of ids
+already seen, memory stays bounded by one record. Every record is validated
+as it is read, and the trailer's counts and checksum catch truncated files.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import IO, Any, Callable, Iterable, Iterator
+
+from .logstore import LogStore
+from .metrics import REGISTRY
+from .models import DailyCountLog, EquipmentChecklist, InventoryItem, VehicleInventory, parse_timestamp
+from .store import InventoryStore
+
+FORMAT = "pea-bpn-backup"
+VERSION = 1
+KINDS = ("inventory", "vehicle", "dailyLog", "checklist")
+
+
+class BackupError(ValueError):
+    """The backup is malformed; ``line`` is 1-based."""
+
+    def __init__(self, line: int, message: str) -> None:
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+@dataclass(frozen=True, slots=True)
+class Progress:
+    """Records handled so far; ``total`` comes from the manifest."""
+
+    done: int
+    total: int
+    kind: str
+
+    @property
+    def fraction(self) -> float:
+        return self.done / self.total if self.total else 1.0
+
+
+ProgressCallback = Callable[[Progress], None]
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+# -- export --------------------------------------------------------------
+
+
+def export_records(
+    records: Iterable[tuple[str, dict[str, Any]]],
+    counts: dict[str, int],
+) -> Iterator[str]:
+    """Encode ``(kind, data)`` pairs as backup lines, newline-terminated.
+
+    ``counts`` must give the number of records of each kind; it is written
+    to the manifest so importers can report progress.
+    """
+    manifest = {
+        "type": "manifest",
+        "format": FORMAT,
+        "version": VERSION,
+        "createdAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "counts": {kind: counts.get(kind, 0) for kind in KINDS},
+    }
+    yield _dumps(manifest) + "\n"
+    digest = hashlib.blake2b(digest_size=16)
+    seen = dict.fromkeys(KINDS, 0)
+    for kind, data in records:
+        line = _dumps({"type": kind, "data": data}) + "\n"
+        digest.update(line.encode())
+        seen[kind] += 1
+        yield line
+    yield _dumps({"type": "end", "counts": seen, "checksum": digest.hexdigest()}) + "\n"
+
+
+def export_backup(
+    store: InventoryStore,
+    daily_logs: LogStore[DailyCountLog] | None = None,
+    checklists: LogStore[EquipmentChecklist] | None = None,
+) -> Iterator[str]:
+    """Backup lines for ``store`` and, optionally, the log stores."""
+
+    def records() -> Iterator[tuple[str, dict[str, Any]]]:
+        for item in store.items():
+            yield "inventory", item.to_dict()
+        for vehicle in store.vehicles():
+            yield "vehicle", vehicle.to_dict()
+        if daily_logs is not None:
+            for log in daily_logs.iter_range():
+                yield "dailyLog", log.to_dict()
+        if checklists is not None:
+            for checklist in checklists.iter_range():
+                yield "checklist", checklist.to_dict()
+
+    counts = {
+        "inventory": len(store),
+        "vehicle": sum(1 for _ in store.vehicles()),
+        "dailyLog": len(daily_logs) if daily_logs is not None else 0,
+        "checklist": len(checklists) if checklists is not None else 0,
+    }
+    return export_records(records(), counts)
+
+
+def write_backup(
+    fh: IO[str],
+    lines: Iterable[str],
+    progress: ProgressCallback | None = None,
+    every: int = 10_000,
+) -> int:
+    """Write ``lines`` to ``fh``; returns the number of data records."""
+    it = iter(lines)
+    manifest = next(it)
+    fh.write(manifest)
+    total = sum(json.loads(manifest)["counts"].values())
+    written = 0
+    for line in it:
+        fh.write(line)
+        written += 1
+        if progress is not None and written % every == 0:
+            progress(Progress(written, total, "export"))
+    done = written - 1  # the trailer
+    if progress is not None:
+        progress(Progress(done, total, "export"))
+    return done
+
+
+# -- import --------------------------------------------------------------
+
+
+_PARSERS: dict[str, Callable[[dict[str, Any]], Any]] = {
+    "inventory": InventoryItem.from_dict,
+    "vehicle": VehicleInventory.from_dict,
+    "dailyLog": DailyCountLog.from_dict,
+    "checklist": EquipmentChecklist.from_dict,
+}
+
+
+def read_backup(lines: Iterable[str | bytes]) -> Iterator[tuple[str, Any]]:
+    """Yield ``(kind, record)`` for each validated record, in file order.
+
+    The first pair is ``("manifest", dict)``. Raises :class:`BackupError`
+    on the first bad line, on duplicate ids, on vehicle lines that refer to
+    unknown items, and when the trailer is missing or does not match.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    seen = dict.fromkeys(KINDS, 0)
+    ids: dict[str, set[str]] = {kind: set() for kind in KINDS}
+    manifest = None
+    number = 0
+    for number, raw in enumerate(lines, 1):
+        try:
+            line = raw.decode() if isinstance(raw, bytes) else raw
+        except UnicodeDecodeError as exc:
+            raise BackupError(number, f"invalid UTF-8: {exc.reason}") from None
+        if not line.strip():
+            continue
+        try:
+            doc = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise BackupError(number, f"invalid JSON: {exc.msg}") from None
+        kind = doc.get("type") if isinstance(doc, dict) else None
+
+        if manifest is None:
+            if kind != "manifest" or doc.get("format") != FORMAT:
+                raise BackupError(number, "not a PEA BPN backup (missing manifest)")
+            if doc.get("version") != VERSION:
+                raise BackupError(number, f"unsupported backup version {doc.get('version')!r}")
+            manifest = doc
+            yield "manifest", doc
+            continue
+
+        if kind == "end":
+            if doc.get("counts") != seen:
+                raise BackupError(number, f"record counts {seen} do not match trailer {doc.get('counts')}")
+            if doc.get("checksum") != digest.hexdigest():
+                raise BackupError(number, "checksum mismatch")
+            return
+
+        parse = _PARSERS.get(kind)  # type: ignore[arg-type]
+        if parse is None:
+            raise BackupError(number, f"unknown record type {kind!r}")
+        data = doc.get("data")
+        if not isinstance(data, dict):
+            raise BackupError(number, f"invalid {kind} record: data must be an object")
+        try:
+            record = parse(data)
+        except (AttributeError, KeyError, TypeError, ValueError) as exc:
+            raise BackupError(number, f"invalid {kind} record: {exc!r}") from None
+        _validate(number, kind, record, ids)
+        # The exporter hashed each line with a bare "\n"; CRLF files hash the same.
+        digest.update((line.rstrip("\r\n") + "\n").encode())
+        seen[kind] += 1
+        yield kind, record
+
+    raise BackupError(number, "backup is truncated (no end record)")
+
+
+def _validate(number: int, kind: str, record: Any, ids: dict[str, set[str]]) -> None:
+    key = record.vehicle_id if kind == "vehicle" else record.id
+    if not key:
+        raise BackupError(number, f"{kind} record without id")
+    if key in ids[kind]:
+        raise BackupError(number, f"duplicate {kind} id {key!r}")
+    ids[kind].add(key)
+    if kind in ("dailyLog", "checklist"):
+        # ``timestamp`` is parsed lazily; check it now so a bad date fails
+        # here, with a line number, rather than part way through a restore.
+        try:
+            parse_timestamp(record.date)
+        except ValueError:
+            raise BackupError(number, f"invalid date {record.date!r} on {kind} {key!r}") from None
+    elif kind == "inventory":
+        if record.quantity < 0 or record.min_threshold < 0:
+            raise BackupError(number, f"negative quantity on {key!r}")
+    elif kind == "vehicle":
+        for item_id, qty in record.items.items():
+            if item_id not in ids["inventory"]:
+                raise BackupError(number, f"vehicle {key!r} carries unknown item {item_id!r}")
+            if qty < 0:
+                raise BackupError(number, f"negative quantity of {item_id!r} on {key!r}")
+
+
+def restore_backup(
+    lines: Iterable[str | bytes],
+    store: InventoryStore,
+    daily_logs: LogStore[DailyCountLog] | None = None,
+    checklists: LogStore[EquipmentChecklist] | None = None,
+    every: int = 10_000,
+) -> Iterator[Progress]:
+    """Load a backup into empty targets, yielding progress as it goes.
+
+    Records are applied as they are validated, so restore into fresh
+    stores and swap them in only once the generator finishes; a
+    :class:`BackupError` part way through leaves the targets half filled.
+    """
+    total = done = 0
+    kind = "manifest"
+    # Wall time, including time spent by the consumer between progress yields.
+    with REGISTRY.span("backup_import"):
+        for kind, record in read_backup(lines):
+            if kind == "manifest":
+                total = sum(record["counts"].values())
+                yield Progress(0, total, kind)
+                continue
+            if kind == "inventory":
+                store.upsert_item(record)
+            elif kind == "vehicle":
+                store.upsert_vehicle(record)
+            elif kind == "dailyLog" and daily_logs is not None:
+                daily_logs.append(record)
+            elif kind == "checklist" and checklists is not None:
+                checklists.append(record)
+            done += 1
+            if done % every == 0:
+                yield Progress(done, total, kind)
+    REGISTRY.inc("backup_records_imported_total", done)
+    yield Progress(done, total, kind)
@@ -0,0 +1,275 @@
+"""Compact, array-backed inventory representation.
+
+Every ``InventoryItem`` in the front end is a full object repeating strings
+like ``category`` and ``unit``, and ``handleTransferItems`` clones items
+with ``{ ...item, quantity }`` on every change. :class:`ColumnarInventory`
+stores one column per field instead. Categories and units are interned to
+small integer codes, and quantities and thresholds live in ``array``
+columns. Columns are split into fixed-size chunks, and :meth:`snapshot`
+shares them copy-on-write, so a write after a snapshot copies only the
+chunk it touches, never the whole table. Vehicle lines are shared the same
+way, one vehicle at a time. Rows are append-only, so a snapshot also shares
+the id index and simply remembers its row count.
+
+NumPy is not a dependency of this project, so the numeric columns use the
+standard library's ``array`` module.
+"""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Iterable, Iterator, Mapping
+
+from .models import InventoryItem, TransferLine
+from .store import TransferError, merge_lines
+
+CHUNK = 4096
+
+
+class StringTable:
+    """Interns repeated strings as small integer codes."""
+
+    def __init__(self) -> None:
+        self._codes: dict[str, int] = {}
+        self.values: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+@dataclass(slots=True)
+class _Chunk:
+    """One CHUNK-row slice of every column, owned by a single generation."""
+
+    ids: list[str]
+    names: list[str]
+    category: array
+    unit: array
+    quantity: array
+    min_threshold: array
+    # unknown fields per row, None when there are none; never mutated in place
+    extra: list[dict[str, Any] | None]
+    generation: int
+
+    def copy(self, generation: int) -> _Chunk:
+        return _Chunk(
+            list(self.ids),
+            list(self.names),
+            array(self.category.typecode, self.category),
+            array(self.unit.typecode, self.unit),
+            array(self.quantity.typecode, self.quantity),
+            array(self.min_threshold.typecode, self.min_threshold),
+            list(self.extra),
+            generation,
+        )
+
+
+def _empty_chunk(generation: int) -> _Chunk:
+    return _Chunk([], [], array("H"), array("H"), array("q"), array("q"), [], generation)
+
+
+class ColumnarView:
+    """Read-only access shared by the live table and its snapshots.
+
+    ``index`` may be shared with a table that keeps appending; rows at or
+    past ``rows`` were added later and are invisible to this view.
+    """
+
+    __slots__ = ("_chunks", "_index", "_rows", "categories", "units", "vehicles")
+
+    def __init__(
+        self,
+        chunks: list[_Chunk],
+        index: dict[str, int],
+        rows: int,
+        categories: StringTable,
+        units: StringTable,
+        vehicles: Mapping[str, Mapping[str, int]],
+    ) -> None:
+        self._chunks = chunks
+        self._index = index
+        self._rows = rows
+        self.categories = categories
+        self.units = units
+        self.vehicles = vehicles
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __contains__(self, item_id: object) -> bool:
+        row = self._index.get(item_id)  # type: ignore[call-overload]
+        return row is not None and row < self._rows
+
+    def _locate(self, item_id: str) -> tuple[_Chunk, int]:
+        row = self._index[item_id]
+        if row >= self._rows:
+            raise KeyError(item_id)
+        return self._chunks[row // CHUNK], row % CHUNK
+
+    def quantity(self, item_id: str) -> int:
+        chunk, i = self._locate(item_id)
+        return chunk.quantity[i]
+
+    def item(self, item_id: str) -> InventoryItem:
+        chunk, i = self._locate(item_id)
+        return self._materialize(chunk, i)
+
+    def _materialize(self, chunk: _Chunk, i: int) -> InventoryItem:
+        extra = chunk.extra[i]
+        return InventoryItem(
+            chunk.ids[i],
+            chunk.names[i],
+            self.categories.values[chunk.category[i]],
+            chunk.quantity[i],
+            self.units.values[chunk.unit[i]],
+            chunk.min_threshold[i],
+            dict(extra) if extra else {},
+        )
+
+    def items(self) -> Iterator[InventoryItem]:
+        for chunk in self._chunks:
+            for i in range(len(chunk.ids)):
+                yield self._materialize(chunk, i)
+
+    def low_stock_count(self) -> int:
+        return sum(
+            q <= t for chunk in self._chunks for q, t in zip(chunk.quantity, chunk.min_threshold)
+        )
+
+    def total_quantity(self) -> int:
+        return sum(sum(chunk.quantity) for chunk in self._chunks)
+
+
+class ColumnarInventory(ColumnarView):
+    """Mutable column store with chunked copy-on-write snapshots.
+
+    Rows are append-only; removing an item is not supported here since the
+    row index would need compaction. Vehicle stock stays in a
+    ``{vehicle_id: {item_id: qty}}`` mapping, as in the model; the line
+    dicts are shared with snapshots, so change them only through
+    :meth:`apply_transfers`.
+    """
+
+    __slots__ = ("_generation", "_owned")
+
+    vehicles: dict[str, dict[str, int]]
+
+    def __init__(self) -> None:
+        super().__init__([], {}, 0, StringTable(), StringTable(), {})
+        self._generation = 0
+        # vehicles whose line dicts no snapshot has seen yet
+        self._owned: set[str] = set()
+
+    @classmethod
+    def from_records(
+        cls,
+        inventory: Iterable[InventoryItem | Mapping[str, Any]],
+        vehicles: Iterable[Mapping[str, Any]] = (),
+    ) -> ColumnarInventory:
+        table = cls()
+        for record in inventory:
+            table.append(record if isinstance(record, InventoryItem) else InventoryItem.from_dict(record))
+        for vehicle in vehicles:
+            items = table._vehicle_lines(str(vehicle["vehicleId"]))
+            for line in vehicle.get("items", ()):
+                items[str(line["itemId"])] = items.get(str(line["itemId"]), 0) + int(line["quantity"])
+        return table
+
+    def snapshot(self) -> ColumnarView:
+        """Frozen view of items and vehicle stock.
+
+        Costs O(n / CHUNK) for the chunk list plus O(vehicles) for the
+        vehicle map; later writes copy only the chunks and vehicles they
+        touch. The snapshot's vehicle lines are read-only.
+        """
+        self._generation += 1
+        self._owned.clear()
+        vehicles = MappingProxyType({v: MappingProxyType(items) for v, items in self.vehicles.items()})
+        return ColumnarView(list(self._chunks), self._index, self._rows, self.categories, self.units, vehicles)
+
+    def _writable(self, row: int) -> tuple[_Chunk, int]:
+        c, i = divmod(row, CHUNK)
+        chunk = self._chunks[c]
+        if chunk.generation != self._generation:
+            chunk = self._chunks[c] = chunk.copy(self._generation)
+        return chunk, i
+
+    def _vehicle_lines(self, vehicle_id: str) -> dict[str, int]:
+        """``vehicle_id``'s line dict, copied first if a snapshot shares it."""
+        if vehicle_id not in self._owned:
+            self.vehicles[vehicle_id] = dict(self.vehicles.get(vehicle_id, ()))
+            self._owned.add(vehicle_id)
+        return self.vehicles[vehicle_id]
+
+    def append(self, item: InventoryItem) -> None:
+        """Add ``item``, or overwrite every column of the row with its id."""
+        row = self._index.get(item.id)
+        if row is not None:
+            chunk, i = self._writable(row)
+            chunk.names[i] = item.name
+            chunk.category[i] = self.categories.code(item.category)
+            chunk.unit[i] = self.units.code(item.unit)
+            chunk.quantity[i] = item.quantity
+            chunk.min_threshold[i] = item.min_threshold
+            chunk.extra[i] = dict(item.extra) or None
+            return
+        row = self._rows
+        if row % CHUNK == 0:
+            self._chunks.append(_empty_chunk(self._generation))
+        chunk, _ = self._writable(row)
+        chunk.ids.append(item.id)
+        chunk.names.append(item.name)
+        chunk.category.append(self.categories.code(item.category))
+        chunk.unit.append(self.units.code(item.unit))
+        chunk.quantity.append(item.quantity)
+        chunk.min_threshold.append(item.min_threshold)
+        chunk.extra.append(dict(item.extra) or None)
+        self._index[item.id] = row
+        self._rows = row + 1
+
+    def set_quantity(self, item_id: str, quantity: int) -> None:
+        if quantity < 0:
+            raise ValueError(f"quantity for {item_id!r} must be >= 0, got {quantity}")
+        chunk, i = self._writable(self._index[item_id])
+        chunk.quantity[i] = quantity
+
+    def apply_transfers(
+        self,
+        vehicle_id: str,
+        transfers: Iterable[TransferLine | Mapping[str, Any]],
+    ) -> None:
+        """Same contract as :meth:`InventoryStore.apply_transfers`."""
+        lines = merge_lines(transfers)
+        problems = []
+        if vehicle_id not in self.vehicles:
+            problems.append(f"unknown vehicle {vehicle_id!r}")
+        for line in lines:
+            row = self._index.get(line.item_id)
+            if row is None:
+                problems.append(f"unknown item {line.item_id!r}")
+                continue
+            available = self._chunks[row // CHUNK].quantity[row % CHUNK]
+            if line.quantity <= 0:
+                problems.append(f"quantity for {line.item_id!r} must be positive")
+            elif line.quantity > available:
+                problems.append(
+                    f"insufficient stock for {line.item_id!r}: "
+                    f"requested {line.quantity}, available {available}"
+                )
+        if problems:
+            raise TransferError(problems)
+
+        on_vehicle = self._vehicle_lines(vehicle_id)
+        for line in lines:
+            chunk, i = self._writable(self._index[line.item_id])
+            chunk.quantity[i] -= line.quantity
+            on_vehicle[line.item_id] = on_vehicle.get(line.item_id, 0) + line.quantity
@@ -0,0 +1,184 @@
+"""Seeded synthetic depot data at realistic scale.
+
+``INITIAL_INVENTORY``, ``INITIAL_VEHICLES`` and ``TOOL_LIST`` in the front
+end hold a handful of records. These generators produce the same JSON
+shapes (camelCase keys, as stored in ``localStorage``) for catalogues of
+1k–1M items, fleets of 10–5k vehicles, and months of daily counts and
+checklists. Every generator draws from its own ``random.Random`` seeded
+from ``(seed, kind)``, so changing one size does not change the others.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Iterator, Sequence
+
+CATEGORIES: tuple[str, ...] = ("สายไฟ", "มิเตอร์", "ฟิวส์", "อุปกรณ์ป้องกัน", "เครื่องมือ", "ฉนวน", "ข้อต่อ")
+UNITS: tuple[str, ...] = ("ม้วน", "ตัว", "ชิ้น", "เมตร", "ชุด", "กล่อง")
+TOOLS: tuple[str, ...] = (
+    "ไม้ชักฟิวส์",
+    "ถุงมือยาง",
+    "เข็มขัดนิรภัย",
+    "หมวกนิรภัย",
+    "เครื่องวัดแรงดัน",
+    "บันไดอลูมิเนียม",
+    "สายดิน",
+    "กรวยจราจร",
+)
+TOOL_STATUSES: tuple[str, ...] = ("ok", "damaged", "missing")
+LOW_STOCK_FRACTION = 0.05
+
+
+def _rng(seed: int, kind: str) -> random.Random:
+    return random.Random(f"{seed}:{kind}")
+
+
+def inventory(n_items: int, seed: int = 0) -> list[dict[str, Any]]:
+    """``n_items`` warehouse items; about 5% start at or below their threshold."""
+    rng = _rng(seed, "inventory")
+    items = []
+    for i in range(n_items):
+        threshold = rng.choice((5, 10, 20, 50))
+        low = rng.random() < LOW_STOCK_FRACTION
+        items.append(
+            {
+                "id": f"ITM-{i:07d}",
+                "name": f"{rng.choice(CATEGORIES)} รุ่น {rng.randrange(100, 999)}-{i}",
+                "category": rng.choice(CATEGORIES),
+                "quantity": rng.randint(0, threshold) if low else rng.randint(threshold + 1, 5_000),
+                "unit": rng.choice(UNITS),
+                "minThreshold": threshold,
+            }
+        )
+    return items
+
+
+def fleet(
+    n_vehicles: int,
+    items: Sequence[dict[str, Any]],
+    items_per_vehicle: int = 20,
+    seed: int = 0,
+) -> list[dict[str, Any]]:
+    """Vehicles each carrying ``items_per_vehicle`` distinct items from ``items``."""
+    rng = _rng(seed, "fleet")
+    per_vehicle = min(items_per_vehicle, len(items))
+    return [
+        {
+            "vehicleId": f"V-{v:05d}",
+            "items": [
+                {"itemId": items[i]["id"], "quantity": rng.randint(1, 50)}
+                for i in rng.sample(range(len(items)), per_vehicle)
+            ],
+        }
+        for v in range(n_vehicles)
+    ]
+
+
+def _timestamps(days: int, start: date, rng: random.Random) -> Iterator[tuple[int, str]]:
+    for day in range(days):
+        moment = datetime.combine(start + timedelta(days=day), datetime.min.time(), timezone.utc)
+        # Morning shift: counts are taken between 07:00 and 09:00.
+        moment += timedelta(hours=7, seconds=rng.randrange(7_200))
+        yield day, moment.isoformat().replace("+00:00", "Z")
+
+
+def daily_logs(
+    vehicles: Sequence[dict[str, Any]],
+    days: int = 30,
+    start: date = date(2024, 1, 1),
+    seed: int = 0,
+    discrepancy_rate: float = 0.02,
+) -> Iterator[dict[str, Any]]:
+    """One count per vehicle per day, in time order.
+
+    Counted quantities match the vehicle's stock except for about
+    ``discrepancy_rate`` of the lines, which are off by a few units.
+    """
+    rng = _rng(seed, "daily_logs")
+    for day, stamp in _timestamps(days, start, rng):
+        for vehicle in vehicles:
+            lines = []
+            for line in vehicle["items"]:
+                counted = line["quantity"]
+                if rng.random() < discrepancy_rate:
+                    counted = max(0, counted + rng.choice((-3, -2, -1, 1, 2)))
+                lines.append({"itemId": line["itemId"], "countedQuantity": counted})
+            yield {
+                "id": f"DL-{vehicle['vehicleId']}-{day:04d}",
+                "vehicleId": vehicle["vehicleId"],
+                "date": stamp,
+                "items": lines,
+                "checkedBy": f"user{rng.randrange(1000):04d}",
+            }
+
+
+def checklists(
+    vehicles: Sequence[dict[str, Any]],
+    days: int = 30,
+    start: date = date(2024, 1, 1),
+    seed: int = 0,
+    tools: Sequence[str] = TOOLS,
+) -> Iterator[dict[str, Any]]:
+    """One equipment checklist per vehicle per day, in time order."""
+    rng = _rng(seed, "checklists")
+    for day, stamp in _timestamps(days, start, rng):
+        for vehicle in vehicles:
+            yield {
+                "id": f"CL-{vehicle['vehicleId']}-{day:04d}",
+                "vehicleId": vehicle["vehicleId"],
+                "date": stamp,
+                "items": [
+                    {"name": tool, "status": rng.choices(TOOL_STATUSES, (94, 5, 1))[0]} for tool in tools
+                ],
+                "checkedBy": f"user{rng.randrange(1000):04d}",
+            }
+
+
+def users(n_users: int, seed: int = 0) -> list[dict[str, Any]]:
+    """``app_users`` records: the default admin first, then ``n_users - 1`` staff."""
+    rng = _rng(seed, "users")
+    records = [{"id": "U-ADMIN", "name": "ผู้ดูแลระบบ", "username": "admin", "password": "admin", "role": "ADMIN"}]
+    for i in range(1, n_users):
+        records.append(
+            {
+                "id": f"U-{i:06d}",
+                "name": f"พนักงาน {i}",
+                "username": f"user{i:06d}",
+                "password": f"pw-{rng.getrandbits(48):012x}",
+                "role": "ADMIN" if rng.random() < 0.01 else "USER",
+            }
+        )
+    return records
+
+
+@dataclass(slots=True)
+class Depot:
+    """A full synthetic data set; logs are materialized lists."""
+
+    inventory: list[dict[str, Any]]
+    vehicles: list[dict[str, Any]]
+    daily_logs: list[dict[str, Any]] = field(default_factory=list)
+    checklists: list[dict[str, Any]] = field(default_factory=list)
+    users: list[dict[str, Any]] = field(default_factory=list)
+
+
+def depot(
+    n_items: int,
+    n_vehicles: int,
+    *,
+    days: int = 30,
+    n_users: int = 100,
+    items_per_vehicle: int = 20,
+    seed: int = 0,
+) -> Depot:
+    items = inventory(n_items, seed)
+    vehicles = fleet(n_vehicles, items, items_per_vehicle, seed)
+    return Depot(
+        items,
+        vehicles,
+        list(daily_logs(vehicles, days, seed=seed)),
+        list(checklists(vehicles, days, seed=seed)),
+        users(n_users, seed),
+    )
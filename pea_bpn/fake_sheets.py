@@ -0,0 +1,196 @@
+"""In-process stand-in for the Google Sheets values API and OAuth token endpoint.
+
+Implements just enough of ``values:batchUpdate``, ``values/{range}`` and
+``/token`` for the sync engine, the API client and the benchmarks to run
+without network access::
+
+    with FakeSheetsServer() as server:
+        transport = HttpSheetsTransport("token", base_url=server.url)
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, unquote
+
+_RANGE = re.compile(r"^(?P<sheet>[^!]+)!(?P<c1>[A-Z]+)(?P<r1>\d+)(?::(?P<c2>[A-Z]+)(?P<r2>\d+))?$")
+_BATCH_UPDATE = re.compile(r"^/v4/spreadsheets/(?P<sid>[^/]+)/values:batchUpdate$")
+_GET_VALUES = re.compile(r"^/v4/spreadsheets/(?P<sid>[^/]+)/values/(?P<range>[^?]+)$")
+
+
+def _column_index(letters: str) -> int:
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch) - ord("A") + 1
+    return n - 1
+
+
+class FakeSheetsServer:
+    """Threaded HTTP server holding sheets as ``{(sheet, row, col): value}``.
+
+    ``fail_next`` makes the next N Sheets requests answer ``fail_status``
+    (with ``Retry-After: retry_after`` when set). With ``check_auth`` only
+    access tokens issued by ``/token`` are accepted.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        check_auth: bool = False,
+        token_ttl: int = 3600,
+    ) -> None:
+        self.cells: dict[str, dict[tuple[str, int, int], Any]] = {}
+        self.requests = 0
+        self.rows_written = 0
+        self.fail_next = 0
+        self.fail_status = 503
+        self.retry_after: float | None = None
+        self.check_auth = check_auth
+        self.token_ttl = token_ttl
+        self.tokens_issued = 0
+        self.valid_tokens: set[str] = set()
+        self.connections = 0
+        self._token_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> FakeSheetsServer:
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> FakeSheetsServer:
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    def rows(self, spreadsheet_id: str, sheet: str = "Sheet1") -> list[list[Any]]:
+        """The sheet as a dense matrix, trailing empty rows trimmed."""
+        cells = {k[1:]: v for k, v in self.cells.get(spreadsheet_id, {}).items() if k[0] == sheet and v != ""}
+        if not cells:
+            return []
+        height = max(r for r, _ in cells)
+        width = max(c for _, c in cells) + 1
+        return [[cells.get((r, c), "") for c in range(width)] for r in range(1, height + 1)]
+
+    def _write(self, spreadsheet_id: str, range_: str, values: list[list[Any]]) -> None:
+        m = _RANGE.match(range_)
+        if m is None:
+            raise ValueError(f"bad range {range_!r}")
+        sheet, row0, col0 = m["sheet"], int(m["r1"]), _column_index(m["c1"])
+        grid = self.cells.setdefault(spreadsheet_id, {})
+        for dr, row in enumerate(values):
+            for dc, value in enumerate(row):
+                grid[sheet, row0 + dr, col0 + dc] = value
+        self.rows_written += len(values)
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def _reply(self, status: int, payload: dict[str, Any], headers: dict[str, str] | None = None) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _rejected(self) -> bool:
+                """Apply injected failures and auth checks; call with the lock held."""
+                server.requests += 1
+                if server.fail_next > 0:
+                    server.fail_next -= 1
+                    headers = {}
+                    if server.retry_after is not None:
+                        headers["Retry-After"] = str(server.retry_after)
+                    status = server.fail_status
+                    self._reply(status, {"error": {"code": status, "message": "injected failure"}}, headers)
+                    return True
+                if server.check_auth:
+                    token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+                    if token not in server.valid_tokens:
+                        self._reply(401, {"error": {"code": 401, "message": "invalid credentials"}})
+                        return True
+                return False
+
+            def _token(self, body: bytes) -> None:
+                form = {k: v[0] for k, v in parse_qs(body.decode()).items()}
+                grant = form.get("grant_type")
+                if grant not in ("authorization_code", "refresh_token"):
+                    self._reply(400, {"error": "unsupported_grant_type"})
+                    return
+                with server._lock:
+                    n = next(server._token_ids)
+                    access = f"fake-access-{n}"
+                    server.valid_tokens.add(access)
+                    server.tokens_issued += 1
+                reply = {"access_token": access, "expires_in": server.token_ttl, "token_type": "Bearer"}
+                if grant == "authorization_code":
+                    reply["refresh_token"] = f"fake-refresh-{n}"
+                self._reply(200, reply)
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                if self.path == "/token":
+                    self._token(body)
+                    return
+                payload = json.loads(body or b"{}")
+                m = _BATCH_UPDATE.match(self.path)
+                if m is None:
+                    self._reply(404, {"error": {"code": 404, "message": "not found"}})
+                    return
+                with server._lock:
+                    if self._rejected():
+                        return
+                    for entry in payload.get("data", []):
+                        server._write(m["sid"], entry["range"], entry["values"])
+                self._reply(200, {"spreadsheetId": m["sid"], "totalUpdatedRanges": len(payload.get("data", []))})
+
+            def do_GET(self) -> None:
+                m = _GET_VALUES.match(self.path)
+                if m is None:
+                    self._reply(404, {"error": {"code": 404, "message": "not found"}})
+                    return
+                sheet = unquote(m["range"]).split("!", 1)[0]
+                with server._lock:
+                    if self._rejected():
+                        return
+                    values = server.rows(m["sid"], sheet)
+                self._reply(200, {"range": unquote(m["range"]), "values": values})
+
+        return Handler
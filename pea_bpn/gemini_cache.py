@@ -0,0 +1,234 @@
+"""Cached, deduplicated Gemini calls for the assistant/help features.
+
+Responses are content-addressed by model name, prompt and a hash of the
+inventory they were asked about, kept for a TTL with LRU eviction.
+Identical requests already in flight wait for that call instead of issuing
+their own. The model is pluggable: :class:`GenaiModel` wraps
+``google-generativeai`` (imported lazily) and :class:`StubModel` answers
+offline with a fixed latency, for benchmarks and development without an
+API key.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Protocol
+
+from .models import InventoryItem
+from .store import InventoryStore, ItemChanged, StoreEvent
+
+_MASK = (1 << 128) - 1
+
+
+@dataclass(frozen=True, slots=True)
+class ModelReply:
+    text: str
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class GeminiReply:
+    text: str
+    prompt_tokens: int
+    output_tokens: int
+    cached: bool
+    latency: float
+
+
+class TextModel(Protocol):
+    def generate(self, model: str, prompt: str) -> ModelReply: ...
+
+
+class GenaiModel:
+    """``google-generativeai`` backend; the package is imported on first use."""
+
+    def __init__(self, api_key: str) -> None:
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self._models: dict[str, object] = {}
+
+    def generate(self, model: str, prompt: str) -> ModelReply:
+        handle = self._models.get(model)
+        if handle is None:
+            handle = self._models[model] = self._genai.GenerativeModel(model)
+        response = handle.generate_content(prompt)  # type: ignore[attr-defined]
+        usage = getattr(response, "usage_metadata", None)
+        return ModelReply(
+            response.text,
+            getattr(usage, "prompt_token_count", 0) or 0,
+            getattr(usage, "candidates_token_count", 0) or 0,
+        )
+
+
+class StubModel:
+    """Offline stand-in that sleeps ``latency`` seconds and echoes the prompt."""
+
+    def __init__(self, latency: float = 0.05) -> None:
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, model: str, prompt: str) -> ModelReply:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        text = f"[{model}] {prompt[:80]}"
+        return ModelReply(text, max(1, len(prompt) // 4), max(1, len(text) // 4))
+
+
+def _item_hash(item: InventoryItem) -> int:
+    encoded = repr((item.id, item.name, item.category, item.quantity, item.unit, item.min_threshold))
+    return int.from_bytes(hashlib.blake2b(encoded.encode(), digest_size=16).digest(), "big")
+
+
+class SnapshotHasher:
+    """Order-independent hash of the inventory, updated per change in O(1).
+
+    The digest is the sum of per-item hashes modulo 2**128, so an edit only
+    subtracts the old item's hash and adds the new one.
+    """
+
+    def __init__(self, store: InventoryStore) -> None:
+        # Last-seen hash per item, so updates never depend on ``event.before``.
+        self._hashes = {item.id: _item_hash(item) for item in store.items()}
+        self._sum = sum(self._hashes.values()) & _MASK
+        self._unsubscribe = store.subscribe(self._on_change)
+
+    def close(self) -> None:
+        self._unsubscribe()
+
+    def _on_change(self, event: StoreEvent) -> None:
+        if not isinstance(event, ItemChanged):
+            return
+        old = self._hashes.pop(event.item_id, 0)
+        new = 0
+        if event.after is not None:
+            new = self._hashes[event.item_id] = _item_hash(event.after)
+        self._sum = (self._sum - old + new) & _MASK
+
+    @property
+    def digest(self) -> str:
+        return f"{self._sum:032x}"
+
+
+@dataclass(slots=True)
+class CacheMetrics:
+    calls: int = 0
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    errors: int = 0
+    evictions: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    tokens_saved: int = 0
+    model_latencies: deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+    call_latencies: deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+
+    @property
+    def hit_rate(self) -> float:
+        served = self.hits + self.coalesced
+        return served / self.calls if self.calls else 0.0
+
+
+@dataclass(slots=True)
+class _Entry:
+    reply: ModelReply
+    expires_at: float
+
+
+class GeminiCache:
+    """TTL + LRU response cache in front of a :class:`TextModel`."""
+
+    def __init__(
+        self,
+        model: TextModel,
+        *,
+        ttl: float = 600.0,
+        max_entries: int = 512,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.model = model
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.metrics = CacheMetrics()
+        self._clock = clock
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._inflight: dict[str, Future[ModelReply]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model: str, prompt: str, snapshot: str = "") -> str:
+        h = hashlib.sha256()
+        for part in (model, prompt, snapshot):
+            h.update(part.encode())
+            h.update(b"\x00")
+        return h.hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def generate(self, model: str, prompt: str, snapshot: str = "") -> GeminiReply:
+        """Answer ``prompt``; ``snapshot`` is e.g. ``SnapshotHasher.digest``."""
+        start = time.perf_counter()
+        key = self.key(model, prompt, snapshot)
+        metrics = self.metrics
+        with self._lock:
+            metrics.calls += 1
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > self._clock():
+                self._entries.move_to_end(key)
+                metrics.hits += 1
+                metrics.tokens_saved += entry.reply.prompt_tokens + entry.reply.output_tokens
+                return self._reply(entry.reply, True, start)
+            if entry is not None:
+                del self._entries[key]
+            waiting = self._inflight.get(key)
+            if waiting is None:
+                future: Future[ModelReply] = Future()
+                self._inflight[key] = future
+            else:
+                metrics.coalesced += 1
+
+        if waiting is not None:
+            return self._reply(waiting.result(), True, start)
+
+        try:
+            model_start = time.perf_counter()
+            reply = self.model.generate(model, prompt)
+            metrics.model_latencies.append(time.perf_counter() - model_start)
+        except BaseException as exc:
+            with self._lock:
+                metrics.errors += 1
+                del self._inflight[key]
+            future.set_exception(exc)
+            raise
+
+        with self._lock:
+            metrics.misses += 1
+            metrics.prompt_tokens += reply.prompt_tokens
+            metrics.output_tokens += reply.output_tokens
+            self._entries[key] = _Entry(reply, self._clock() + self.ttl)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                metrics.evictions += 1
+            del self._inflight[key]
+        future.set_result(reply)
+        return self._reply(reply, False, start)
+
+    def _reply(self, reply: ModelReply, cached: bool, start: float) -> GeminiReply:
+        latency = time.perf_counter() - start
+        self.metrics.call_latencies.append(latency)
+        return GeminiReply(reply.text, reply.prompt_tokens, reply.output_tokens, cached, latency)
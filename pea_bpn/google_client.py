@@ -0,0 +1,340 @@
+"""Async client for the Google OAuth and Sheets endpoints.
+
+The front end makes a one-shot ``fetch`` to ``/api/auth/google/url`` and
+``/api/gsheets/sync`` per action. Every sync sends the raw ``googleTokens``,
+and nothing retries or refreshes an expired token. :class:`GoogleApiClient`
+keeps one pooled ``aiohttp`` session, so connections and TLS sessions are
+reused. A token bucket keeps requests inside the Sheets per-user quota,
+429/5xx and network errors are retried with full-jitter backoff, and the
+access token is refreshed before it expires rather than after a 401.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json as _json
+import random
+import time
+import urllib.parse
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Mapping
+
+import aiohttp
+
+from .sheets_sync import SheetsSyncError
+
+AUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
+TOKEN_URL = "https://oauth2.googleapis.com/token"
+SHEETS_URL = "https://sheets.googleapis.com"
+SHEETS_SCOPE = "https://www.googleapis.com/auth/spreadsheets"
+
+# Sheets API default quota: 60 read and 60 write requests per minute per user.
+SHEETS_REQUESTS_PER_MINUTE = 60
+
+_RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class GoogleApiError(SheetsSyncError):
+    """A Google API call failed after retries; ``status`` is 0 for network errors."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(f"HTTP {status}: {message}" if status else message)
+        self.status = status
+
+
+@dataclass(slots=True)
+class OAuthTokens:
+    access_token: str
+    refresh_token: str | None = None
+    expires_at: float = 0.0
+    token_type: str = "Bearer"
+    scope: str = ""
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], now: float | None = None) -> OAuthTokens:
+        """Accept both token-endpoint replies (``expires_in``) and the
+        ``expiry_date`` milliseconds stored by the Node ``googleapis`` client."""
+        if "expiry_date" in data and data["expiry_date"]:
+            expires_at = float(data["expiry_date"]) / 1000
+        elif "expires_in" in data:
+            expires_at = (time.time() if now is None else now) + float(data["expires_in"])
+        else:
+            expires_at = 0.0
+        return cls(
+            access_token=str(data["access_token"]),
+            refresh_token=data.get("refresh_token"),
+            expires_at=expires_at,
+            token_type=str(data.get("token_type", "Bearer")),
+            scope=str(data.get("scope", "")),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "access_token": self.access_token,
+            "refresh_token": self.refresh_token,
+            "expiry_date": int(self.expires_at * 1000),
+            "token_type": self.token_type,
+            "scope": self.scope,
+        }
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` tokens per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic) -> None:
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Wait until ``tokens`` are available; returns seconds spent waiting."""
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+
+@dataclass(slots=True)
+class ClientMetrics:
+    requests: int = 0
+    retries: int = 0
+    refreshes: int = 0
+    failures: int = 0
+    throttled_s: float = 0.0
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+
+
+class GoogleApiClient:
+    """Pooled, rate-limited, self-refreshing client; use as ``async with``.
+
+    ``on_tokens`` is called with fresh :class:`OAuthTokens` after every
+    exchange or refresh so they can be persisted (the ``google_tokens``
+    record) instead of being shipped with each request.
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        tokens: OAuthTokens | None = None,
+        *,
+        token_url: str = TOKEN_URL,
+        sheets_url: str = SHEETS_URL,
+        requests_per_minute: int = SHEETS_REQUESTS_PER_MINUTE,
+        burst: int = 10,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 32.0,
+        refresh_margin: float = 300.0,
+        pool_size: int = 10,
+        timeout: float = 30.0,
+        on_tokens: Callable[[OAuthTokens], Awaitable[None] | None] | None = None,
+        session: aiohttp.ClientSession | None = None,
+    ) -> None:
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.tokens = tokens
+        self.token_url = token_url
+        self.sheets_url = sheets_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.refresh_margin = refresh_margin
+        self.metrics = ClientMetrics()
+        self._bucket = TokenBucket(requests_per_minute / 60.0, burst)
+        self._on_tokens = on_tokens
+        self._pool_size = pool_size
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session = session
+        self._owns_session = session is None
+        self._refresh_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> GoogleApiClient:
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self._pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self._timeout)
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._session is not None and self._owns_session:
+            await self._session.close()
+        self._session = None
+
+    # -- OAuth -----------------------------------------------------------
+
+    def auth_url(self, redirect_uri: str, state: str = "", scopes: tuple[str, ...] = (SHEETS_SCOPE,)) -> str:
+        """Consent URL, built locally instead of via ``/api/auth/google/url``."""
+        query = {
+            "client_id": self.client_id,
+            "redirect_uri": redirect_uri,
+            "response_type": "code",
+            "scope": " ".join(scopes),
+            "access_type": "offline",
+            "prompt": "consent",
+        }
+        if state:
+            query["state"] = state
+        return f"{AUTH_URL}?{urllib.parse.urlencode(query)}"
+
+    async def exchange_code(self, code: str, redirect_uri: str) -> OAuthTokens:
+        return await self._token_request(
+            {"grant_type": "authorization_code", "code": code, "redirect_uri": redirect_uri}
+        )
+
+    async def refresh(self) -> OAuthTokens:
+        if self.tokens is None or not self.tokens.refresh_token:
+            raise GoogleApiError(401, "no refresh token; reconnect Google")
+        refresh_token = self.tokens.refresh_token
+        tokens = await self._token_request({"grant_type": "refresh_token", "refresh_token": refresh_token})
+        if tokens.refresh_token is None:
+            tokens.refresh_token = refresh_token
+        self.metrics.refreshes += 1
+        return tokens
+
+    async def _token_request(self, form: dict[str, str]) -> OAuthTokens:
+        form = {"client_id": self.client_id, "client_secret": self.client_secret, **form}
+        data = await self._send("POST", self.token_url, form=form, auth=False)
+        tokens = OAuthTokens.from_dict(data)
+        self.tokens = tokens
+        if self._on_tokens is not None:
+            result = self._on_tokens(tokens)
+            if asyncio.iscoroutine(result):
+                await result
+        return tokens
+
+    async def _access_token(self, force_refresh: bool = False) -> str:
+        tokens = self.tokens
+        if tokens is None:
+            raise GoogleApiError(401, "not connected to Google")
+        if force_refresh or tokens.expires_at - time.time() < self.refresh_margin:
+            # Single-flight: concurrent callers wait for one refresh.
+            async with self._refresh_lock:
+                if self.tokens is tokens:
+                    tokens = await self.refresh()
+                else:
+                    tokens = self.tokens  # type: ignore[assignment]
+        return tokens.access_token
+
+    # -- Sheets ----------------------------------------------------------
+
+    async def batch_update(self, spreadsheet_id: str, data: list[dict[str, Any]]) -> dict[str, Any]:
+        url = f"{self.sheets_url}/v4/spreadsheets/{urllib.parse.quote(spreadsheet_id)}/values:batchUpdate"
+        return await self._send("POST", url, json={"valueInputOption": "RAW", "data": data})
+
+    async def get_values(self, spreadsheet_id: str, range_: str) -> list[list[Any]]:
+        url = (
+            f"{self.sheets_url}/v4/spreadsheets/{urllib.parse.quote(spreadsheet_id)}"
+            f"/values/{urllib.parse.quote(range_, safe='!:')}"
+        )
+        data = await self._send("GET", url)
+        return data.get("values", [])
+
+    # -- transport -------------------------------------------------------
+
+    def _backoff(self, attempt: int, retry_after: str | None) -> float:
+        if retry_after:
+            try:
+                return min(self.backoff_cap, float(retry_after))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2**attempt))
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        *,
+        json: Any = None,
+        form: dict[str, str] | None = None,
+        auth: bool = True,
+    ) -> dict[str, Any]:
+        if self._session is None:
+            raise RuntimeError("GoogleApiClient must be used as 'async with'")
+        refreshed = False
+        last_error = ""
+        last_status = 0
+        for attempt in range(self.max_retries + 1):
+            headers = {}
+            if auth:
+                # Only Sheets calls count against the Sheets quota.
+                self.metrics.throttled_s += await self._bucket.acquire()
+                headers["Authorization"] = f"Bearer {await self._access_token()}"
+            start = time.perf_counter()
+            retry_after = None
+            try:
+                async with self._session.request(method, url, json=json, data=form, headers=headers) as resp:
+                    self.metrics.requests += 1
+                    body = await resp.read()
+                    self.metrics.latencies.append(time.perf_counter() - start)
+                    last_status = resp.status
+                    # Proxies answer 502/503 with HTML, so decode only after
+                    # the status is known and never let a bad body escape.
+                    try:
+                        payload = _json.loads(body) if body.strip() else None
+                    except ValueError:
+                        payload = body[:200].decode("utf-8", "replace")
+                        if resp.status < 400:
+                            last_error = f"invalid JSON response: {payload!r}"
+                            break
+                    if resp.status < 400:
+                        return payload or {}
+                    last_error = _error_message(payload)
+                    retry_after = resp.headers.get("Retry-After")
+                    if resp.status == 401 and auth and not refreshed:
+                        refreshed = True
+                        await self._access_token(force_refresh=True)
+                        continue
+                    if resp.status not in _RETRY_STATUSES:
+                        break
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                last_status, last_error = 0, f"{type(exc).__name__}: {exc}"
+            if attempt < self.max_retries:
+                self.metrics.retries += 1
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+        self.metrics.failures += 1
+        raise GoogleApiError(last_status, last_error)
+
+
+def _error_message(payload: Any) -> str:
+    if isinstance(payload, dict):
+        error = payload.get("error")
+        if isinstance(error, dict):
+            return str(error.get("message", error))
+        if error:
+            return str(payload.get("error_description", error))
+    return str(payload)
+
+
+class BlockingSheetsTransport:
+    """Adapts :class:`GoogleApiClient` to the synchronous ``SheetsTransport``.
+
+    Calls are run on ``loop``, which must be running in another thread, so
+    :class:`~pea_bpn.sheets_sync.SheetsSyncEngine` shares the pooled session.
+    """
+
+    def __init__(self, client: GoogleApiClient, loop: asyncio.AbstractEventLoop) -> None:
+        self.client = client
+        self.loop = loop
+
+    def batch_update(self, spreadsheet_id: str, data: list[dict[str, Any]]) -> None:
+        asyncio.run_coroutine_threadsafe(self.client.batch_update(spreadsheet_id, data), self.loop).result()
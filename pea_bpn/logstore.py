@@ -0,0 +1,203 @@
+"""Append-only, month-partitioned store for daily counts and checklists.
+
+The front end keeps ``dailyLogs``/``checklists`` in React state and copies
+the whole array on every append. :class:`LogStore` appends in O(log n) into
+monthly partitions, each with a time-ordered index overall and per
+``vehicleId``. Range queries only touch the partitions they overlap and
+page through results with opaque cursors. Records are ordered by
+``(timestamp, id)``, both of which are stored with the record, so ordering
+and cursors survive a reopen. With a ``directory`` every partition is also
+an append-only ``YYYY-MM.jsonl`` file that is replayed on open.
+"""
+
+from __future__ import annotations
+
+import base64
+import bisect
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Generic, Iterator, Mapping, Protocol, TypeVar
+
+from .models import DailyCountLog, EquipmentChecklist, parse_timestamp
+
+
+class LogRecord(Protocol):
+    id: str
+    vehicle_id: str
+
+    @property
+    def timestamp(self) -> float: ...
+
+    def to_dict(self) -> dict[str, Any]: ...
+
+
+R = TypeVar("R", bound=LogRecord)
+_Key = tuple[float, str]
+
+
+def partition_of(timestamp: float) -> str:
+    """The ``YYYY-MM`` (UTC) partition a timestamp belongs to."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m")
+
+
+def _encode_cursor(key: _Key) -> str:
+    return base64.urlsafe_b64encode(f"{key[0]!r}:{key[1]}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> _Key:
+    try:
+        ts, record_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":", 1)
+        return float(ts), record_id
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError(f"invalid cursor {cursor!r}") from exc
+
+
+@dataclass(slots=True)
+class _Partition(Generic[R]):
+    keys: list[_Key] = field(default_factory=list)
+    by_vehicle: dict[str, list[_Key]] = field(default_factory=dict)
+    records: dict[str, R] = field(default_factory=dict)
+
+    def add(self, key: _Key, record: R) -> None:
+        _insert(self.keys, key)
+        _insert(self.by_vehicle.setdefault(record.vehicle_id, []), key)
+        self.records[key[1]] = record
+
+
+def _insert(keys: list[_Key], key: _Key) -> None:
+    # Logs almost always arrive in time order, so appending is the fast path.
+    if not keys or keys[-1] < key:
+        keys.append(key)
+    else:
+        bisect.insort(keys, key)
+
+
+@dataclass(frozen=True, slots=True)
+class Page(Generic[R]):
+    records: list[R]
+    next_cursor: str | None
+
+
+class LogStore(Generic[R]):
+    """Time-indexed log of ``DailyCountLog`` or ``EquipmentChecklist`` records."""
+
+    def __init__(
+        self,
+        parse: Callable[[Mapping[str, Any]], R],
+        directory: str | Path | None = None,
+    ) -> None:
+        self._parse = parse
+        self._partitions: dict[str, _Partition[R]] = {}
+        self._months: list[str] = []
+        self._ids: set[str] = set()
+        self._directory = Path(directory) if directory is not None else None
+        if self._directory is not None:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            self._replay()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, record_id: object) -> bool:
+        return record_id in self._ids
+
+    def _replay(self) -> None:
+        assert self._directory is not None
+        for path in sorted(self._directory.glob("*.jsonl")):
+            with path.open(encoding="utf-8") as fh:
+                for line in fh:
+                    if line.strip():
+                        self._index(self._parse(json.loads(line)))
+
+    def _index(self, record: R) -> None:
+        if record.id in self._ids:
+            raise ValueError(f"duplicate log id {record.id!r}")
+        ts = record.timestamp
+        month = partition_of(ts)
+        partition = self._partitions.get(month)
+        if partition is None:
+            partition = self._partitions[month] = _Partition()
+            bisect.insort(self._months, month)
+        partition.add((ts, record.id), record)
+        self._ids.add(record.id)
+
+    def append(self, record: R) -> None:
+        """Add one record; on disk this is a single line appended to its month."""
+        self._index(record)
+        if self._directory is not None:
+            path = self._directory / f"{partition_of(record.timestamp)}.jsonl"
+            with path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(record.to_dict(), ensure_ascii=False) + "\n")
+
+    def query(
+        self,
+        *,
+        vehicle_id: str | None = None,
+        start: str | float | None = None,
+        end: str | float | None = None,
+        limit: int = 100,
+        cursor: str | None = None,
+    ) -> Page[R]:
+        """Records with ``start <= timestamp < end``, oldest first.
+
+        Records with the same timestamp are ordered by id. Pass the returned
+        ``next_cursor`` back in to fetch the following page; it stays valid
+        while new records are appended and after the store is reopened.
+        """
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        lo: _Key = (parse_timestamp(start), "") if start is not None else (float("-inf"), "")
+        hi: _Key = (parse_timestamp(end), "") if end is not None else (float("inf"), "")
+        if cursor is not None:
+            lo = max(lo, _next_key(_decode_cursor(cursor)))
+
+        records: list[R] = []
+        last: _Key | None = None
+        for key, record in self._scan(vehicle_id, lo, hi):
+            if len(records) == limit:
+                return Page(records, _encode_cursor(last))  # type: ignore[arg-type]
+            records.append(record)
+            last = key
+        return Page(records, None)
+
+    def iter_range(
+        self,
+        *,
+        vehicle_id: str | None = None,
+        start: str | float | None = None,
+        end: str | float | None = None,
+    ) -> Iterator[R]:
+        """All matching records without pagination."""
+        lo: _Key = (parse_timestamp(start), "") if start is not None else (float("-inf"), "")
+        hi: _Key = (parse_timestamp(end), "") if end is not None else (float("inf"), "")
+        for _, record in self._scan(vehicle_id, lo, hi):
+            yield record
+
+    def _scan(self, vehicle_id: str | None, lo: _Key, hi: _Key) -> Iterator[tuple[_Key, R]]:
+        months = self._months
+        first = bisect.bisect_left(months, partition_of(lo[0])) if lo[0] != float("-inf") else 0
+        for month in months[first:]:
+            if hi[0] != float("inf") and month > partition_of(hi[0]):
+                break
+            partition = self._partitions[month]
+            keys = partition.keys if vehicle_id is None else partition.by_vehicle.get(vehicle_id)
+            if not keys:
+                continue
+            for i in range(bisect.bisect_left(keys, lo), bisect.bisect_left(keys, hi)):
+                key = keys[i]
+                yield key, partition.records[key[1]]
+
+
+def _next_key(key: _Key) -> _Key:
+    # the smallest key after ``key``: no id sorts between ``id`` and ``id + "\0"``
+    return key[0], key[1] + "\0"
+
+
+def daily_count_store(directory: str | Path | None = None) -> LogStore[DailyCountLog]:
+    return LogStore(DailyCountLog.from_dict, directory)
+
+
+def checklist_store(directory: str | Path | None = None) -> LogStore[EquipmentChecklist]:
+    return LogStore(EquipmentChecklist.from_dict, directory)
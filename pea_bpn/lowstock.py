@@ -0,0 +1,153 @@
+"""Incrementally maintained low-stock index and alert feed.
+
+``App`` recomputes ``inventory.filter(i => i.quantity <= i.minThreshold)``
+on every render just to show a count. :class:`LowStockIndex` follows the
+store's change events instead: the count is O(1), the most critical items
+come from a heap keyed by ``quantity - minThreshold``, and crossing the
+threshold in either direction is pushed to an :class:`AlertFeed`.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Iterator, Literal
+
+from .models import InventoryItem
+from .store import InventoryStore, ItemChanged, StoreEvent
+
+
+def is_low(item: InventoryItem) -> bool:
+    return item.quantity <= item.min_threshold
+
+
+@dataclass(frozen=True, slots=True)
+class LowStockAlert:
+    item_id: str
+    name: str
+    quantity: int
+    min_threshold: int
+    kind: Literal["low", "recovered", "removed"]
+    at: float
+
+
+class AlertFeed:
+    """Bounded, newest-last feed of threshold crossings for the Bell button."""
+
+    def __init__(self, maxlen: int = 500) -> None:
+        self._alerts: deque[LowStockAlert] = deque(maxlen=maxlen)
+        self._listeners: list[Callable[[LowStockAlert], None]] = []
+        self.unread = 0
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def __iter__(self) -> Iterator[LowStockAlert]:
+        return iter(self._alerts)
+
+    def subscribe(self, listener: Callable[[LowStockAlert], None]) -> Callable[[], None]:
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def publish(self, alert: LowStockAlert) -> None:
+        self._alerts.append(alert)
+        self.unread = min(self.unread + 1, len(self._alerts))
+        for listener in self._listeners:
+            listener(alert)
+
+    def recent(self, n: int = 20) -> list[LowStockAlert]:
+        """The ``n`` newest alerts, newest first."""
+        return list(itertools.islice(reversed(self._alerts), n))
+
+    def mark_read(self) -> None:
+        self.unread = 0
+
+
+class LowStockIndex:
+    """Items at or below ``minThreshold``, kept current from store events."""
+
+    def __init__(self, store: InventoryStore, feed: AlertFeed | None = None) -> None:
+        self.feed = feed if feed is not None else AlertFeed()
+        self._gaps: dict[str, int] = {}
+        # Lazy-deletion heap of (gap, seq, item_id). ``_seqs`` holds the seq
+        # of each item's live entry; any other entry is stale, even one with
+        # the same gap, and is skipped and compacted away.
+        self._seqs: dict[str, int] = {}
+        self._heap: list[tuple[int, int, str]] = []
+        self._counter = itertools.count()
+        for item in store.items():
+            if is_low(item):
+                self._set(item.id, item.quantity - item.min_threshold)
+        self._store = store
+        self._unsubscribe = store.subscribe(self._on_change)
+
+    def close(self) -> None:
+        self._unsubscribe()
+
+    def __len__(self) -> int:
+        return len(self._gaps)
+
+    @property
+    def count(self) -> int:
+        """Number of low-stock items; replaces ``lowStockCount``."""
+        return len(self._gaps)
+
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self._gaps
+
+    def top(self, n: int = 10) -> list[InventoryItem]:
+        """The ``n`` items furthest below their threshold, most critical first."""
+        picked: list[tuple[int, int, str]] = []
+        heap = self._heap
+        while heap and len(picked) < n:
+            entry = heapq.heappop(heap)
+            if self._seqs.get(entry[2]) == entry[1]:
+                picked.append(entry)
+        for entry in picked:
+            heapq.heappush(heap, entry)
+        return [self._store.item(item_id) for _, _, item_id in picked]
+
+    def _set(self, item_id: str, gap: int) -> None:
+        if self._gaps.get(item_id) == gap:
+            return
+        self._gaps[item_id] = gap
+        seq = self._seqs[item_id] = next(self._counter)
+        heapq.heappush(self._heap, (gap, seq, item_id))
+        if len(self._heap) > 2 * len(self._gaps) + 64:
+            self._heap = [(g, self._seqs[i], i) for i, g in self._gaps.items()]
+            heapq.heapify(self._heap)
+
+    def _clear(self, item_id: str) -> None:
+        self._gaps.pop(item_id, None)
+        self._seqs.pop(item_id, None)
+
+    def _on_change(self, event: StoreEvent) -> None:
+        if not isinstance(event, ItemChanged):
+            return
+        before, after = event.before, event.after
+        # Own state rather than ``before``, which an in-place edit followed
+        # by ``upsert_item`` leaves identical to ``after``.
+        was_low = event.item_id in self._gaps
+        now_low = after is not None and is_low(after)
+
+        if now_low:
+            assert after is not None
+            self._set(event.item_id, after.quantity - after.min_threshold)
+        else:
+            self._clear(event.item_id)
+
+        if now_low and not was_low:
+            assert after is not None
+            self._alert(after, "low")
+        elif was_low and not now_low:
+            item = after or before
+            assert item is not None
+            self._alert(item, "recovered" if after is not None else "removed")
+
+    def _alert(self, item: InventoryItem, kind: Literal["low", "recovered", "removed"]) -> None:
+        self.feed.publish(
+            LowStockAlert(item.id, item.name, item.quantity, item.min_threshold, kind, time.time())
+        )
@@ -0,0 +1,277 @@
+"""In-process timing spans, counters and gauges for hot paths.
+
+In the front end, ``handleSyncToSheets`` and ``handleConnectGoogle`` only
+report problems through ``alert()`` and ``console.error``, and nothing
+records how long transfers, writes, imports or logins take.
+:class:`Registry` collects duration histograms from :meth:`Registry.span`,
+plus counters and gauges whose recent history is kept for trend charts.
+A snapshot exports as Prometheus text or JSON. The hot paths in this
+package record into the module-level :data:`REGISTRY`, and
+:func:`render_performance_panel` shows it to admins in Streamlit.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Iterator, Mapping, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Seconds; roughly x2.5 steps from 100µs to 30s.
+BUCKETS: tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)  # fmt: skip
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: Mapping[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+@dataclass(slots=True)
+class Histogram:
+    """Cumulative buckets for export, plus a window of recent samples for
+    exact percentiles."""
+
+    buckets: tuple[float, ...] = BUCKETS
+    counts: list[int] = field(default_factory=list)
+    count: int = 0
+    total: float = 0.0
+    recent: deque[float] = field(default_factory=lambda: deque(maxlen=2048))
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.recent.append(value)
+
+    def quantile(self, q: float) -> float:
+        """Nearest-rank quantile of the recent window; NaN when empty."""
+        if not self.recent:
+            return math.nan
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+@dataclass(slots=True)
+class Gauge:
+    value: float = 0.0
+    history: deque[tuple[float, float]] = field(default_factory=lambda: deque(maxlen=512))
+
+
+class Registry:
+    """Thread-safe metric store keyed by name and label set."""
+
+    def __init__(self, *, clock: Callable[[], float] = time.time) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, Labels], float] = {}
+        self._histograms: dict[tuple[str, Labels], Histogram] = {}
+        self._gauges: dict[tuple[str, Labels], Gauge] = {}
+        self.enabled = True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._gauges.clear()
+
+    def inc(self, name: str, amount: float = 1, **labels: Any) -> None:
+        if not self.enabled:
+            return
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        if not self.enabled:
+            return
+        key = (name, _labels(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram()
+            hist.observe(value)
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        """Set a gauge; each change is also appended to its trend history."""
+        if not self.enabled:
+            return
+        key = (name, _labels(labels))
+        with self._lock:
+            gauge = self._gauges.get(key)
+            if gauge is None:
+                gauge = self._gauges[key] = Gauge()
+            if gauge.value != value or not gauge.history:
+                gauge.history.append((self._clock(), value))
+            gauge.value = value
+
+    @contextmanager
+    def span(self, name: str, **labels: Any) -> Iterator[None]:
+        """Time the block into ``<name>_seconds``; errors also count
+        ``<name>_errors_total`` by exception type."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        except GeneratorExit:
+            # A generator closed early by its consumer, not a failure.
+            raise
+        except BaseException as exc:
+            self.inc(f"{name}_errors_total", error=type(exc).__name__, **labels)
+            raise
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - start, **labels)
+
+    def timed(self, name: str, **labels: Any) -> Callable[[F], F]:
+        """Decorator form of :meth:`span`."""
+
+        def decorate(fn: F) -> F:
+            @wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.span(name, **labels):
+                    return fn(*args, **kwargs)
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorate
+
+    def histogram(self, name: str, **labels: Any) -> Histogram | None:
+        return self._histograms.get((name, _labels(labels)))
+
+    def counter(self, name: str, **labels: Any) -> float:
+        return self._counters.get((name, _labels(labels)), 0)
+
+    # -- export ------------------------------------------------------------
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            counters = [
+                {"name": n, "labels": dict(lb), "value": v} for (n, lb), v in sorted(self._counters.items())
+            ]
+            histograms = [
+                {
+                    "name": n,
+                    "labels": dict(lb),
+                    "count": h.count,
+                    "sum": h.total,
+                    "p50": _finite(h.quantile(0.5)),
+                    "p95": _finite(h.quantile(0.95)),
+                    "p99": _finite(h.quantile(0.99)),
+                }
+                for (n, lb), h in sorted(self._histograms.items())
+            ]
+            gauges = [
+                {"name": n, "labels": dict(lb), "value": g.value, "history": [list(p) for p in g.history]}
+                for (n, lb), g in sorted(self._gauges.items())
+            ]
+        return {"generatedAt": self._clock(), "counters": counters, "histograms": histograms, "gauges": gauges}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def to_prometheus(self, prefix: str = "pea_bpn_") -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        out: list[str] = []
+        with self._lock:
+            typed: set[str] = set()
+            for (name, lb), value in sorted(self._counters.items()):
+                full = prefix + name
+                if full not in typed:
+                    typed.add(full)
+                    out.append(f"# TYPE {full} counter")
+                out.append(f"{full}{_fmt_labels(lb)} {_num(value)}")
+            for (name, lb), gauge in sorted(self._gauges.items()):
+                full = prefix + name
+                if full not in typed:
+                    typed.add(full)
+                    out.append(f"# TYPE {full} gauge")
+                out.append(f"{full}{_fmt_labels(lb)} {_num(gauge.value)}")
+            for (name, lb), hist in sorted(self._histograms.items()):
+                full = prefix + name
+                if full not in typed:
+                    typed.add(full)
+                    out.append(f"# TYPE {full} histogram")
+                running = 0
+                for bound, n in zip((*hist.buckets, math.inf), hist.counts):
+                    running += n
+                    le = "+Inf" if bound == math.inf else repr(bound)
+                    out.append(f"{full}_bucket{_fmt_labels(lb + (('le', le),))} {running}")
+                out.append(f"{full}_sum{_fmt_labels(lb)} {_num(hist.total)}")
+                out.append(f"{full}_count{_fmt_labels(lb)} {hist.count}")
+        return "\n".join(out) + "\n"
+
+
+def _finite(value: float) -> float | None:
+    return None if math.isnan(value) else value
+
+
+def _num(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+REGISTRY = Registry()
+span = REGISTRY.span
+timed = REGISTRY.timed
+
+
+def render_performance_panel(st: Any, registry: Registry = REGISTRY, *, role: str | None = None) -> None:
+    """Latency percentiles and data-size trends, shown only when ``role`` is
+    ``"ADMIN"``."""
+    if role != "ADMIN":
+        st.warning("เฉพาะผู้ดูแลระบบเท่านั้น")
+        return
+    snapshot = registry.to_dict()
+    st.subheader("ประสิทธิภาพระบบ")
+    rows = [
+        {
+            "operation": h["name"].removesuffix("_seconds"),
+            "labels": ", ".join(f"{k}={v}" for k, v in h["labels"].items()),
+            "count": h["count"],
+            "p50 (ms)": None if h["p50"] is None else round(h["p50"] * 1e3, 3),
+            "p95 (ms)": None if h["p95"] is None else round(h["p95"] * 1e3, 3),
+        }
+        for h in snapshot["histograms"]
+    ]
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+    errors = [c for c in snapshot["counters"] if c["name"].endswith("_errors_total")]
+    if errors:
+        st.caption("ข้อผิดพลาด")
+        st.dataframe(
+            [{"metric": c["name"], **c["labels"], "count": c["value"]} for c in errors],
+            use_container_width=True,
+            hide_index=True,
+        )
+    for gauge in snapshot["gauges"]:
+        if len(gauge["history"]) > 1:
+            st.caption(gauge["name"])
+            st.line_chart({"value": [v for _, v in gauge["history"]]})
+    col_json, col_prom = st.columns(2)
+    col_json.download_button("ดาวน์โหลด JSON", registry.to_json(), "metrics.json", "application/json")
+    col_prom.download_button("ดาวน์โหลด Prometheus", registry.to_prometheus(), "metrics.prom", "text/plain")
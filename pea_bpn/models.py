@@ -0,0 +1,228 @@
+"""Record types for the Python side of PEA BPN.
+
+Field names follow the JSON stored by the React app (``inventory``,
+``vehicles`` in localStorage), so ``from_dict``/``to_dict`` round-trip the
+existing data unchanged.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Mapping
+
+
+def whole(value: Any) -> int:
+    """``int(value)``, but 1.7 raises ``ValueError`` instead of becoming 1."""
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError(f"expected a whole number, got {value!r}")
+    return int(value)
+
+
+def _line_extra(line: Mapping[str, Any], known: tuple[str, ...]) -> dict[str, Any]:
+    return {k: v for k, v in line.items() if k not in known}
+
+
+@dataclass(slots=True)
+class InventoryItem:
+    """One SKU in the main warehouse."""
+
+    id: str
+    name: str
+    category: str
+    quantity: int
+    unit: str
+    min_threshold: int = 0
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> InventoryItem:
+        known = {"id", "name", "category", "quantity", "unit", "minThreshold"}
+        return cls(
+            id=str(data["id"]),
+            name=str(data.get("name", "")),
+            category=str(data.get("category", "")),
+            quantity=whole(data.get("quantity", 0)),
+            unit=str(data.get("unit", "")),
+            min_threshold=whole(data.get("minThreshold", 0)),
+            extra={k: v for k, v in data.items() if k not in known},
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "category": self.category,
+            "quantity": self.quantity,
+            "unit": self.unit,
+            "minThreshold": self.min_threshold,
+            **self.extra,
+        }
+
+
+@dataclass(slots=True)
+class VehicleInventory:
+    """Stock carried by one vehicle, keyed by ``itemId``.
+
+    ``line_extra`` keeps any other fields of a line, by ``itemId``.
+    """
+
+    vehicle_id: str
+    items: dict[str, int] = field(default_factory=dict)
+    extra: dict[str, Any] = field(default_factory=dict)
+    line_extra: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> VehicleInventory:
+        items: dict[str, int] = {}
+        line_extra: dict[str, dict[str, Any]] = {}
+        for line in data.get("items", ()):
+            item_id = str(line["itemId"])
+            items[item_id] = items.get(item_id, 0) + whole(line.get("quantity", 0))
+            if extra := _line_extra(line, ("itemId", "quantity")):
+                line_extra.setdefault(item_id, {}).update(extra)
+        return cls(
+            vehicle_id=str(data["vehicleId"]),
+            items=items,
+            extra={k: v for k, v in data.items() if k not in ("vehicleId", "items")},
+            line_extra=line_extra,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        line_extra = self.line_extra
+        return {
+            "vehicleId": self.vehicle_id,
+            **self.extra,
+            "items": [{"itemId": k, "quantity": q, **line_extra.get(k, {})} for k, q in self.items.items()],
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class TransferLine:
+    """One ``{itemId, quantity}`` entry of a transfer request."""
+
+    item_id: str
+    quantity: int
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> TransferLine:
+        return cls(item_id=str(data["itemId"]), quantity=whole(data["quantity"]))
+
+
+@dataclass(frozen=True, slots=True)
+class TransferRecord:
+    """A committed warehouse-to-vehicle transfer."""
+
+    vehicle_id: str
+    lines: tuple[TransferLine, ...]
+    at: float
+
+
+def parse_timestamp(value: str | float | int) -> float:
+    """Epoch seconds from an ISO date/datetime string or a number.
+
+    Naive values are taken as UTC; ``Z`` suffixes from ``toISOString()``
+    are accepted.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+@dataclass(slots=True)
+class DailyCountLog:
+    """End-of-day count of what is left on a vehicle.
+
+    Lines are written back under ``quantity_key``, the key the first line was
+    read with (older logs use ``quantity``); ``line_extra`` keeps any other
+    fields of a line, by ``itemId``.
+    """
+
+    id: str
+    vehicle_id: str
+    date: str
+    counts: dict[str, int] = field(default_factory=dict)
+    checked_by: str = ""
+    extra: dict[str, Any] = field(default_factory=dict)
+    line_extra: dict[str, dict[str, Any]] = field(default_factory=dict)
+    quantity_key: str = "countedQuantity"
+
+    @property
+    def timestamp(self) -> float:
+        return parse_timestamp(self.date)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> DailyCountLog:
+        known = {"id", "vehicleId", "date", "items", "checkedBy"}
+        counts: dict[str, int] = {}
+        line_extra: dict[str, dict[str, Any]] = {}
+        quantity_key = None
+        for line in data.get("items", ()):
+            key = "countedQuantity" if "countedQuantity" in line else "quantity"
+            quantity_key = quantity_key or key
+            item_id = str(line["itemId"])
+            counts[item_id] = whole(line.get(key, 0))
+            if extra := _line_extra(line, ("itemId", key)):
+                line_extra[item_id] = extra
+        return cls(
+            id=str(data["id"]),
+            vehicle_id=str(data["vehicleId"]),
+            date=str(data["date"]),
+            counts=counts,
+            checked_by=str(data.get("checkedBy", "")),
+            extra={k: v for k, v in data.items() if k not in known},
+            line_extra=line_extra,
+            quantity_key=quantity_key or "countedQuantity",
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        key, line_extra = self.quantity_key, self.line_extra
+        return {
+            "id": self.id,
+            "vehicleId": self.vehicle_id,
+            "date": self.date,
+            "items": [{"itemId": k, key: q, **line_extra.get(k, {})} for k, q in self.counts.items()],
+            "checkedBy": self.checked_by,
+            **self.extra,
+        }
+
+
+@dataclass(slots=True)
+class EquipmentChecklist:
+    """A tool checklist filled in for one vehicle."""
+
+    id: str
+    vehicle_id: str
+    date: str
+    items: list[dict[str, Any]] = field(default_factory=list)
+    checked_by: str = ""
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def timestamp(self) -> float:
+        return parse_timestamp(self.date)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> EquipmentChecklist:
+        known = {"id", "vehicleId", "date", "items", "checkedBy"}
+        return cls(
+            id=str(data["id"]),
+            vehicle_id=str(data["vehicleId"]),
+            date=str(data["date"]),
+            items=[dict(line) for line in data.get("items", ())],
+            checked_by=str(data.get("checkedBy", "")),
+            extra={k: v for k, v in data.items() if k not in known},
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "vehicleId": self.vehicle_id,
+            "date": self.date,
+            "items": self.items,
+            "checkedBy": self.checked_by,
+            **self.extra,
+        }
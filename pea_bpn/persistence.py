@@ -0,0 +1,273 @@
+"""Per-record SQLite persistence for :class:`~pea_bpn.store.InventoryStore`.
+
+The React app rewrites the whole ``inventory``, ``vehicles`` and
+``app_users`` arrays after every change. Here the store's change events mark
+individual rows dirty and :meth:`SqliteRepository.flush` writes only those
+rows, so a write costs O(delta). The database runs in WAL mode, which keeps
+each commit to an append to the log; SQLite's automatic checkpointing
+compacts the log back into the main file periodically.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from dataclasses import dataclass
+from os import PathLike
+from typing import Any, Callable, Iterator
+
+from .metrics import REGISTRY
+from .models import InventoryItem, VehicleInventory
+from .store import InventoryStore, ItemChanged, StoreEvent, VehicleChanged, VehicleStockChanged
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS vehicles (
+    vehicle_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS vehicle_items (
+    vehicle_id TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    position INTEGER NOT NULL DEFAULT 0,
+    extra TEXT,
+    PRIMARY KEY (vehicle_id, item_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS records (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+"""
+
+
+# Upserts keep the rowid stable, so loading items and vehicles in rowid order
+# preserves the original array order of the front end's JSON. vehicle_items
+# is keyed by (vehicle_id, item_id) and has no rowid, so each line carries an
+# explicit position instead: a rewrite numbers the lines in order, an updated
+# line keeps its position and a new one goes after the vehicle's last line,
+# matching how the store's dict orders them. A line's extra fields only change
+# with a rewrite, so the stock upsert leaves them alone.
+_UPSERT_ITEM = "INSERT INTO items (id, data) VALUES (?, ?) ON CONFLICT (id) DO UPDATE SET data = excluded.data"
+_UPSERT_VEHICLE = (
+    "INSERT INTO vehicles (vehicle_id, data) VALUES (?, ?) "
+    "ON CONFLICT (vehicle_id) DO UPDATE SET data = excluded.data"
+)
+_UPSERT_STOCK = (
+    "INSERT INTO vehicle_items (vehicle_id, item_id, quantity, position) VALUES (?1, ?2, ?3, "
+    "(SELECT COALESCE(MAX(position), -1) + 1 FROM vehicle_items WHERE vehicle_id = ?1)) "
+    "ON CONFLICT (vehicle_id, item_id) DO UPDATE SET quantity = excluded.quantity"
+)
+_INSERT_LINE = "INSERT INTO vehicle_items (vehicle_id, item_id, quantity, position, extra) VALUES (?, ?, ?, ?, ?)"
+_LOAD_LINES = (
+    "SELECT vehicle_id, item_id, quantity, extra FROM vehicle_items ORDER BY vehicle_id, position, item_id"
+)
+
+
+@dataclass(slots=True)
+class WriteStats:
+    """Cumulative write volume, used to measure write amplification."""
+
+    flushes: int = 0
+    rows_written: int = 0
+    rows_deleted: int = 0
+    bytes_written: int = 0
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+class SqliteRepository:
+    """Stores items, vehicles and keyed app records in one SQLite file.
+
+    Call :meth:`attach` to track an :class:`InventoryStore`; edits are
+    buffered as dirty keys and written in a single transaction by
+    :meth:`flush`. Other app state (``app_users``, ``google_tokens``) goes
+    through :meth:`put_record`/:meth:`delete_record`, one row per key.
+    """
+
+    def __init__(self, path: str | PathLike[str] = ":memory:", *, check_same_thread: bool = True) -> None:
+        self._conn = sqlite3.connect(path, check_same_thread=check_same_thread)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {name for _, name, *_ in self._conn.execute("PRAGMA table_info(vehicle_items)")}
+        # databases from before these columns keep item_id order until rewritten
+        with self._conn:
+            for column, decl in (("position", "INTEGER NOT NULL DEFAULT 0"), ("extra", "TEXT")):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE vehicle_items ADD COLUMN {column} {decl}")
+        self.stats = WriteStats()
+        self._store: InventoryStore | None = None
+        self._unsubscribe: Callable[[], None] | None = None
+        # dicts rather than sets so rows are written in change order
+        self._dirty_items: dict[str, None] = {}
+        self._dirty_vehicles: dict[str, None] = {}
+        self._dirty_stock: dict[tuple[str, str], None] = {}
+
+    def close(self) -> None:
+        self.detach()
+        self._conn.close()
+
+    def __enter__(self) -> SqliteRepository:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # -- inventory store -------------------------------------------------
+
+    def load_store(self) -> InventoryStore:
+        """Read every item and vehicle into a new, attached store."""
+        items = (
+            InventoryItem.from_dict(json.loads(data))
+            for (data,) in self._conn.execute("SELECT data FROM items ORDER BY rowid")
+        )
+        vehicles = {
+            vehicle_id: VehicleInventory.from_dict({"vehicleId": vehicle_id, **json.loads(data)})
+            for vehicle_id, data in self._conn.execute("SELECT vehicle_id, data FROM vehicles ORDER BY rowid")
+        }
+        for vehicle_id, item_id, quantity, extra in self._conn.execute(_LOAD_LINES):
+            vehicle = vehicles.get(vehicle_id)
+            if vehicle is not None:
+                vehicle.items[item_id] = quantity
+                if extra is not None:
+                    vehicle.line_extra[item_id] = json.loads(extra)
+        store = InventoryStore(items, vehicles.values())
+        self.attach(store)
+        return store
+
+    def attach(self, store: InventoryStore) -> None:
+        """Track ``store`` so that :meth:`flush` persists its changes."""
+        self.detach()
+        self._store = store
+        self._unsubscribe = store.subscribe(self._on_change)
+
+    def detach(self) -> None:
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+        self._store = None
+        self._unsubscribe = None
+
+    def save_all(self, store: InventoryStore) -> None:
+        """Write every row of ``store``; used for the initial import only."""
+        self._dirty_items.update(dict.fromkeys(item.id for item in store.items()))
+        self._dirty_vehicles.update(dict.fromkeys(v.vehicle_id for v in store.vehicles()))
+        previous, self._store = self._store, store
+        try:
+            self.flush()
+        finally:
+            self._store = previous
+
+    def _on_change(self, event: StoreEvent) -> None:
+        if isinstance(event, ItemChanged):
+            self._dirty_items[event.item_id] = None
+        elif isinstance(event, VehicleStockChanged):
+            self._dirty_stock[event.vehicle_id, event.item_id] = None
+        elif isinstance(event, VehicleChanged):
+            self._dirty_vehicles[event.vehicle_id] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of dirty rows waiting for :meth:`flush`."""
+        return len(self._dirty_items) + len(self._dirty_vehicles) + len(self._dirty_stock)
+
+    def flush(self) -> int:
+        """Write dirty rows in one transaction and return how many changed."""
+        store = self._store
+        if store is None or not self.pending:
+            return 0
+        stats = self.stats
+        written = deleted = size = 0
+        with REGISTRY.span("persistence_flush"), self._conn:
+            for item_id in self._dirty_items:
+                item = store.get_item(item_id)
+                if item is None:
+                    self._conn.execute("DELETE FROM items WHERE id = ?", (item_id,))
+                    deleted += 1
+                    continue
+                data = _dumps(item.to_dict())
+                self._conn.execute(_UPSERT_ITEM, (item_id, data))
+                written += 1
+                size += len(item_id) + len(data)
+
+            for vehicle_id in self._dirty_vehicles:
+                vehicle = store.get_vehicle(vehicle_id)
+                self._conn.execute("DELETE FROM vehicle_items WHERE vehicle_id = ?", (vehicle_id,))
+                if vehicle is None:
+                    self._conn.execute("DELETE FROM vehicles WHERE vehicle_id = ?", (vehicle_id,))
+                    deleted += 1
+                    continue
+                data = _dumps(vehicle.extra)
+                self._conn.execute(_UPSERT_VEHICLE, (vehicle_id, data))
+                line_extra = {k: _dumps(v) for k, v in vehicle.line_extra.items() if v and k in vehicle.items}
+                self._conn.executemany(
+                    _INSERT_LINE,
+                    (
+                        (vehicle_id, item_id, qty, i, line_extra.get(item_id))
+                        for i, (item_id, qty) in enumerate(vehicle.items.items())
+                    ),
+                )
+                written += 1 + len(vehicle.items)
+                size += len(vehicle_id) + len(data) + sum(map(len, line_extra.values()))
+                size += sum(len(vehicle_id) + len(item_id) + 8 for item_id in vehicle.items)
+
+            for vehicle_id, item_id in self._dirty_stock:
+                if vehicle_id in self._dirty_vehicles:
+                    continue
+                vehicle = store.get_vehicle(vehicle_id)
+                qty = vehicle.items.get(item_id) if vehicle is not None else None
+                if qty is None:
+                    self._conn.execute(
+                        "DELETE FROM vehicle_items WHERE vehicle_id = ? AND item_id = ?", (vehicle_id, item_id)
+                    )
+                    deleted += 1
+                    continue
+                self._conn.execute(_UPSERT_STOCK, (vehicle_id, item_id, qty))
+                written += 1
+                size += len(vehicle_id) + len(item_id) + 8
+
+        self._dirty_items.clear()
+        self._dirty_vehicles.clear()
+        self._dirty_stock.clear()
+        stats.flushes += 1
+        stats.rows_written += written
+        stats.rows_deleted += deleted
+        stats.bytes_written += size
+        REGISTRY.inc("persistence_rows_written_total", written)
+        REGISTRY.inc("persistence_bytes_written_total", size)
+        return written + deleted
+
+    # -- keyed records ---------------------------------------------------
+
+    def put_record(self, kind: str, key: str, data: Any) -> None:
+        payload = _dumps(data)
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO records (kind, key, data) VALUES (?, ?, ?)", (kind, key, payload)
+            )
+        self.stats.rows_written += 1
+        self.stats.bytes_written += len(kind) + len(key) + len(payload)
+
+    def delete_record(self, kind: str, key: str) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM records WHERE kind = ? AND key = ?", (kind, key))
+        self.stats.rows_deleted += 1
+
+    def get_record(self, kind: str, key: str) -> Any | None:
+        row = self._conn.execute("SELECT data FROM records WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def iter_records(self, kind: str) -> Iterator[tuple[str, Any]]:
+        for key, data in self._conn.execute("SELECT key, data FROM records WHERE kind = ?", (kind,)):
+            yield key, json.loads(data)
+
+    def checkpoint(self) -> None:
+        """Fold the WAL back into the main database file."""
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
@@ -0,0 +1,312 @@
+"""Paginated inventory queries and the vehicle-item join.
+
+``MainWarehouse`` and ``VehicleManagement`` receive the full arrays and
+render every row, and ``VehicleManagement`` looks each ``vehicle.items``
+entry up in ``inventory`` by scanning. :class:`InventoryIndex` keeps sorted
+keys per column, so an unfiltered page costs O(log n + page size). A
+prefix search collects the matching ids once by bisecting each column and
+keeps them, updated from store events, for the following reruns. A page of
+matches then comes from sorting them when the prefix is selective, or
+from walking the column order until the page is full when it is broad.
+:class:`VehicleJoin` keeps each vehicle's
+joined rows materialized from store events. :func:`visible_range` and
+:func:`render_inventory_page` only materialize the rows that are on screen.
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Literal, TypeVar
+
+from .models import InventoryItem
+from .store import InventoryStore, ItemChanged, StoreEvent, VehicleChanged, VehicleStockChanged
+
+T = TypeVar("T")
+SortField = Literal["id", "name", "category", "quantity"]
+SEARCH_FIELDS: tuple[SortField, ...] = ("id", "name", "category")
+
+
+@dataclass(frozen=True, slots=True)
+class Page(Generic[T]):
+    rows: list[T]
+    total: int
+    offset: int
+    limit: int
+
+    @property
+    def has_more(self) -> bool:
+        return self.offset + len(self.rows) < self.total
+
+
+def _sort_key(item: InventoryItem, field: SortField) -> Any:
+    if field == "quantity":
+        return item.quantity
+    return getattr(item, field).casefold()
+
+
+class InventoryIndex:
+    """Sorted ``(key, item_id)`` lists per column, kept current from events."""
+
+    FIELDS: tuple[SortField, ...] = ("id", "name", "category", "quantity")
+    # Match sets kept for recent (prefix, fields) searches.
+    MATCH_CACHE = 32
+    # A prefix matching fewer than 1/SELECTIVE of the items sorts its
+    # matches; a broader one walks the column order instead.
+    SELECTIVE = 16
+
+    def __init__(self, store: InventoryStore) -> None:
+        self.store = store
+        # Current keys per item, so removals never depend on ``event.before``.
+        self._keys: dict[str, tuple[Any, ...]] = {
+            item.id: tuple(_sort_key(item, f) for f in self.FIELDS) for item in store.items()
+        }
+        self._sorted: dict[SortField, list[tuple[Any, str]]] = {
+            field: sorted((keys[n], item_id) for item_id, keys in self._keys.items())
+            for n, field in enumerate(self.FIELDS)
+        }
+        self._matches: OrderedDict[tuple[str, tuple[SortField, ...]], set[str]] = OrderedDict()
+        self._unsubscribe = store.subscribe(self._on_change)
+
+    def close(self) -> None:
+        self._unsubscribe()
+
+    def _on_change(self, event: StoreEvent) -> None:
+        if not isinstance(event, ItemChanged):
+            return
+        item_id, after = event.item_id, event.after
+        old = self._keys.pop(item_id, None)
+        new = tuple(_sort_key(after, f) for f in self.FIELDS) if after is not None else None
+        if new is not None:
+            self._keys[item_id] = new
+        if old == new:
+            return
+        for (needle, fields), found in self._matches.items():
+            if new is not None and _matches(new, needle, fields):
+                found.add(item_id)
+            else:
+                found.discard(item_id)
+        for n, field in enumerate(self.FIELDS):
+            if old is not None and new is not None and old[n] == new[n]:
+                continue
+            keys = self._sorted[field]
+            if old is not None:
+                i = bisect.bisect_left(keys, (old[n], item_id))
+                if i < len(keys) and keys[i] == (old[n], item_id):
+                    del keys[i]
+            if new is not None:
+                bisect.insort(keys, (new[n], item_id))
+
+    def query(
+        self,
+        *,
+        prefix: str = "",
+        fields: tuple[SortField, ...] = SEARCH_FIELDS,
+        sort: SortField = "id",
+        descending: bool = False,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> Page[InventoryItem]:
+        """One page of items, optionally filtered by a case-insensitive prefix
+        on any of ``fields``."""
+        if offset < 0 or limit <= 0:
+            raise ValueError("offset must be >= 0 and limit > 0")
+        store = self.store
+        if not prefix:
+            keys = self._sorted[sort]
+            total = len(keys)
+            if descending:
+                stop = total - offset
+                window = keys[max(0, stop - limit) : max(0, stop)][::-1]
+            else:
+                window = keys[offset : offset + limit]
+            return Page([store.item(item_id) for _, item_id in window], total, offset, limit)
+
+        matches = self._match_set(prefix, fields)
+        keys = self._sorted[sort]
+        if len(matches) * self.SELECTIVE < len(keys):
+            column = self.FIELDS.index(sort)
+            ordered = sorted((self._keys[i][column], i) for i in matches)
+            if descending:
+                ordered.reverse()
+            ids = [item_id for _, item_id in ordered[offset : offset + limit]]
+        else:
+            # Broad prefix: about one key in SELECTIVE or more matches, so the
+            # page turns up within roughly SELECTIVE * (offset + limit) keys.
+            ids = []
+            skip = offset
+            for _, item_id in reversed(keys) if descending else keys:
+                if item_id not in matches:
+                    continue
+                if skip:
+                    skip -= 1
+                    continue
+                ids.append(item_id)
+                if len(ids) == limit:
+                    break
+        return Page([store.item(item_id) for item_id in ids], len(matches), offset, limit)
+
+    def count(self, prefix: str = "", fields: tuple[SortField, ...] = SEARCH_FIELDS) -> int:
+        """Number of items :meth:`query` would page through; O(1) for a
+        repeated prefix."""
+        return len(self._match_set(prefix, fields)) if prefix else len(self._keys)
+
+    def match_ids(self, prefix: str, fields: tuple[SortField, ...] = SEARCH_FIELDS) -> set[str]:
+        """Ids whose ``fields`` start with ``prefix`` (case-insensitive)."""
+        return set(self._match_set(prefix, fields))
+
+    def _match_set(self, prefix: str, fields: tuple[SortField, ...]) -> set[str]:
+        """The cached match set for ``prefix``; callers must not modify it."""
+        if "quantity" in fields:
+            raise ValueError("quantity is not searchable by prefix")
+        key = (prefix.casefold(), tuple(fields))
+        found = self._matches.get(key)
+        if found is not None:
+            self._matches.move_to_end(key)
+            return found
+        needle = key[0]
+        found = set()
+        for field in fields:
+            keys = self._sorted[field]
+            i = bisect.bisect_left(keys, (needle, ""))
+            while i < len(keys) and keys[i][0].startswith(needle):
+                found.add(keys[i][1])
+                i += 1
+        self._matches[key] = found
+        while len(self._matches) > self.MATCH_CACHE:
+            self._matches.popitem(last=False)
+        return found
+
+
+def _matches(keys: tuple[Any, ...], needle: str, fields: tuple[SortField, ...]) -> bool:
+    return any(keys[InventoryIndex.FIELDS.index(field)].startswith(needle) for field in fields)
+
+
+@dataclass(frozen=True, slots=True)
+class JoinedRow:
+    """One ``vehicle.items`` line joined with its inventory record."""
+
+    item_id: str
+    name: str
+    category: str
+    unit: str
+    quantity: int
+
+
+class VehicleJoin:
+    """Materialized ``vehicle.items ⨝ inventory`` rows per vehicle.
+
+    Rows keep the order items were first loaded onto the vehicle, and a
+    reverse index from item to vehicles lets item renames reach every
+    vehicle that carries the item.
+    """
+
+    def __init__(self, store: InventoryStore) -> None:
+        self.store = store
+        self._rows: dict[str, list[JoinedRow]] = {}
+        self._pos: dict[str, dict[str, int]] = {}
+        self._carriers: dict[str, set[str]] = {}
+        # Last-seen name/category/unit per item, so renames are detected
+        # without relying on ``event.before``.
+        self._labels = {item.id: self._label(item) for item in store.items()}
+        for vehicle in store.vehicles():
+            self._rebuild(vehicle.vehicle_id)
+        self._unsubscribe = store.subscribe(self._on_change)
+
+    def close(self) -> None:
+        self._unsubscribe()
+
+    def page(self, vehicle_id: str, offset: int = 0, limit: int = 50) -> Page[JoinedRow]:
+        rows = self._rows.get(vehicle_id, [])
+        return Page(rows[offset : offset + limit], len(rows), offset, limit)
+
+    def _row(self, item_id: str, quantity: int) -> JoinedRow:
+        item = self.store.get_item(item_id)
+        if item is None:
+            return JoinedRow(item_id, item_id, "", "", quantity)
+        return JoinedRow(item_id, item.name, item.category, item.unit, quantity)
+
+    @staticmethod
+    def _label(item: InventoryItem | None) -> tuple[str, str, str] | None:
+        return (item.name, item.category, item.unit) if item is not None else None
+
+    def _rebuild(self, vehicle_id: str) -> None:
+        for carried in self._pos.get(vehicle_id, {}):
+            self._carriers.get(carried, set()).discard(vehicle_id)
+        vehicle = self.store.get_vehicle(vehicle_id)
+        if vehicle is None:
+            self._rows.pop(vehicle_id, None)
+            self._pos.pop(vehicle_id, None)
+            return
+        rows = [self._row(item_id, qty) for item_id, qty in vehicle.items.items()]
+        self._rows[vehicle_id] = rows
+        self._pos[vehicle_id] = {row.item_id: i for i, row in enumerate(rows)}
+        for item_id in vehicle.items:
+            self._carriers.setdefault(item_id, set()).add(vehicle_id)
+
+    def _set(self, vehicle_id: str, item_id: str, quantity: int) -> None:
+        rows = self._rows.setdefault(vehicle_id, [])
+        pos = self._pos.setdefault(vehicle_id, {})
+        i = pos.get(item_id)
+        if i is None:
+            pos[item_id] = len(rows)
+            rows.append(self._row(item_id, quantity))
+            self._carriers.setdefault(item_id, set()).add(vehicle_id)
+        else:
+            rows[i] = self._row(item_id, quantity)
+
+    def _on_change(self, event: StoreEvent) -> None:
+        if isinstance(event, VehicleStockChanged):
+            self._set(event.vehicle_id, event.item_id, event.after)
+        elif isinstance(event, VehicleChanged):
+            self._rebuild(event.vehicle_id)
+        elif isinstance(event, ItemChanged):
+            label = self._label(event.after)
+            if self._labels.get(event.item_id) == label:
+                return
+            if label is None:
+                self._labels.pop(event.item_id, None)
+            else:
+                self._labels[event.item_id] = label
+            for vehicle_id in self._carriers.get(event.item_id, ()):
+                i = self._pos[vehicle_id][event.item_id]
+                self._rows[vehicle_id][i] = self._row(event.item_id, self._rows[vehicle_id][i].quantity)
+
+
+def visible_range(
+    scroll_top: float,
+    row_height: float,
+    viewport_height: float,
+    total: int,
+    overscan: int = 5,
+) -> tuple[int, int]:
+    """``(start, stop)`` row indexes to materialize for a scrolled viewport."""
+    if row_height <= 0:
+        raise ValueError("row_height must be positive")
+    first = int(max(0.0, scroll_top) // row_height)
+    count = int(viewport_height // row_height) + 1
+    start = max(0, first - overscan)
+    stop = min(total, first + count + overscan)
+    return start, max(start, stop)
+
+
+def render_inventory_page(
+    st: Any,
+    index: InventoryIndex,
+    *,
+    page_size: int = 50,
+    key: str = "inventory",
+    columns: Callable[[InventoryItem], dict[str, Any]] | None = None,
+) -> Page[InventoryItem]:
+    """Search box, pager and a table holding only the current page."""
+    prefix = st.text_input("ค้นหา (รหัส / ชื่อ / หมวดหมู่)", key=f"{key}_search")
+    sort = st.selectbox("เรียงตาม", ("id", "name", "category", "quantity"), key=f"{key}_sort")
+    # count() keeps the match set, so the query below reuses it.
+    pages = max(1, -(-index.count(prefix) // page_size))
+    page_no = st.number_input("หน้า", min_value=1, max_value=pages, value=1, step=1, key=f"{key}_page")
+    page = index.query(prefix=prefix, sort=sort, offset=(int(page_no) - 1) * page_size, limit=page_size)
+    to_row = columns or (lambda item: item.to_dict())
+    st.dataframe([to_row(item) for item in page.rows], use_container_width=True, hide_index=True)
+    st.caption(f"{page.offset + 1 if page.rows else 0}-{page.offset + len(page.rows)} จาก {page.total}")
+    return page
@@ -0,0 +1,253 @@
+"""Daily reconciliation of vehicle counts against expected stock.
+
+The daily count (การตรวจนับประจำวัน) records what is left on each truck
+after work. Nothing in the front end compares it with what should be on
+the truck. :func:`reconcile` takes one day's :class:`DailyCountLog`
+entries and computes each vehicle's expected stock: its opening
+``vehicles[].items`` plus the warehouse transfers made to it that day
+up to the moment it was counted.
+It diffs expected against counted per item and returns a
+:class:`ReconciliationReport`. The parent only groups transfers and logs
+by vehicle; picking the latest count, parsing its date, replaying the
+transfers made before it and diffing all happen per vehicle, in chunks.
+Chunks run in-process by default: the work is linear in the input, and
+pickling that input for a process pool already costs more than the whole
+serial pass (see ``benchmarks.bench_reconcile``). A pool is used only
+when asked for.
+:func:`opening_stock` rewinds the live store by the transfer history when
+no start-of-day snapshot was kept.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from itertools import repeat
+from typing import Any, Iterable, Literal, Mapping
+
+from .metrics import REGISTRY
+from .models import DailyCountLog, TransferRecord, VehicleInventory
+from .store import InventoryStore
+
+Kind = Literal["short", "over", "uncounted", "unexpected"]
+Stock = dict[str, int]
+
+CHUNK_SIZE = 250
+
+
+@dataclass(frozen=True, slots=True)
+class Discrepancy:
+    item_id: str
+    kind: Kind
+    expected: int
+    counted: int | None
+
+    @property
+    def delta(self) -> int:
+        """``counted - expected``; uncounted lines count as zero."""
+        return (self.counted or 0) - self.expected
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "itemId": self.item_id,
+            "kind": self.kind,
+            "expected": self.expected,
+            "counted": self.counted,
+            "delta": self.delta,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class VehicleReconciliation:
+    vehicle_id: str
+    log_id: str | None
+    expected_total: int
+    counted_total: int
+    discrepancies: tuple[Discrepancy, ...]
+
+    @property
+    def ok(self) -> bool:
+        return not self.discrepancies
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "vehicleId": self.vehicle_id,
+            "logId": self.log_id,
+            "expectedTotal": self.expected_total,
+            "countedTotal": self.counted_total,
+            "discrepancies": [d.to_dict() for d in self.discrepancies],
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class ReconciliationReport:
+    day: date
+    vehicles: list[VehicleReconciliation]
+    missing_logs: list[str]
+    unknown_vehicles: list[str]
+
+    @property
+    def discrepancy_count(self) -> int:
+        return sum(len(v.discrepancies) for v in self.vehicles)
+
+    @property
+    def flagged(self) -> list[VehicleReconciliation]:
+        return [v for v in self.vehicles if not v.ok]
+
+    def rows(self) -> list[dict[str, Any]]:
+        """One flat row per discrepancy, for tables and CSV export."""
+        return [{"vehicleId": v.vehicle_id, **d.to_dict()} for v in self.vehicles for d in v.discrepancies]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "day": self.day.isoformat(),
+            "vehicleCount": len(self.vehicles),
+            "flaggedCount": len(self.flagged),
+            "discrepancyCount": self.discrepancy_count,
+            "missingLogs": self.missing_logs,
+            "unknownVehicles": self.unknown_vehicles,
+            "vehicles": [v.to_dict() for v in self.flagged],
+        }
+
+
+def day_bounds(day: date, tz: tzinfo = timezone.utc) -> tuple[float, float]:
+    """``[start, end)`` epoch seconds of ``day`` in ``tz``."""
+    start = datetime.combine(day, time.min, tz)
+    return start.timestamp(), (start + timedelta(days=1)).timestamp()
+
+
+def opening_stock(
+    store: InventoryStore,
+    history: Iterable[TransferRecord],
+    since: float,
+) -> dict[str, Stock]:
+    """Vehicle stock as it was at ``since``, by undoing later transfers.
+
+    ``history`` is e.g. ``TransferService.history``.
+    """
+    stock = {v.vehicle_id: dict(v.items) for v in store.vehicles()}
+    for record in history:
+        if record.at < since or record.vehicle_id not in stock:
+            continue
+        items = stock[record.vehicle_id]
+        for line in record.lines:
+            items[line.item_id] = items.get(line.item_id, 0) - line.quantity
+    return {
+        vehicle_id: {item_id: qty for item_id, qty in items.items() if qty > 0}
+        for vehicle_id, items in stock.items()
+    }
+
+
+_Task = tuple[str, Stock, list[TransferRecord], list[DailyCountLog]]
+
+
+def _reconcile_vehicle(
+    vehicle_id: str,
+    opening: Stock,
+    transfers: list[TransferRecord],
+    logs: list[DailyCountLog],
+    start: float,
+    end: float,
+) -> VehicleReconciliation:
+    latest: DailyCountLog | None = None
+    counted_at = end
+    for log in logs:
+        ts = log.timestamp
+        if start <= ts < end and (latest is None or counted_at <= ts):
+            latest, counted_at = log, ts
+    expected = dict(opening)
+    for record in transfers:
+        # Transfers made after the count are not yet on the truck it describes.
+        if record.at <= counted_at:
+            for line in record.lines:
+                expected[line.item_id] = expected.get(line.item_id, 0) + line.quantity
+    if latest is None:
+        return VehicleReconciliation(vehicle_id, None, sum(expected.values()), 0, ())
+    log_id, counted = latest.id, latest.counts
+    found = []
+    for item_id, want in expected.items():
+        got = counted.get(item_id)
+        if got is None:
+            if want:
+                found.append(Discrepancy(item_id, "uncounted", want, None))
+        elif got != want:
+            found.append(Discrepancy(item_id, "short" if got < want else "over", want, got))
+    for item_id, got in counted.items():
+        if item_id not in expected and got:
+            found.append(Discrepancy(item_id, "unexpected", 0, got))
+    return VehicleReconciliation(
+        vehicle_id, log_id, sum(expected.values()), sum(counted.values()), tuple(found)
+    )
+
+
+def _reconcile_chunk(tasks: list[_Task], start: float, end: float) -> list[VehicleReconciliation]:
+    return [_reconcile_vehicle(*task, start, end) for task in tasks]
+
+
+def reconcile(
+    day: date,
+    opening: Mapping[str, Mapping[str, int]] | Iterable[VehicleInventory],
+    transfers: Iterable[TransferRecord],
+    logs: Iterable[DailyCountLog],
+    *,
+    tz: tzinfo = timezone.utc,
+    workers: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    executor: ProcessPoolExecutor | None = None,
+) -> ReconciliationReport:
+    """Reconcile every vehicle for ``day``.
+
+    ``opening`` is stock at the start of the day, either
+    ``{vehicle_id: {item_id: qty}}`` (see :func:`opening_stock`) or
+    ``VehicleInventory`` records. Transfers and logs outside ``day`` are
+    ignored, and when a vehicle was counted more than once the latest
+    count wins. Transfers made after that count are not yet on the truck
+    it describes, so they are left out of the vehicle's expected stock.
+
+    Chunks of ``chunk_size`` vehicles run in-process unless ``executor``
+    is given, or ``workers > 1`` asks for a pool of that many processes
+    created for this call.
+    """
+    start, end = day_bounds(day, tz)
+    if isinstance(opening, Mapping):
+        stock = {vehicle_id: dict(items) for vehicle_id, items in opening.items()}
+    else:
+        stock = {v.vehicle_id: dict(v.items) for v in opening}
+
+    by_vehicle_transfers: dict[str, list[TransferRecord]] = {}
+    for record in transfers:
+        if start <= record.at < end and record.vehicle_id in stock:
+            by_vehicle_transfers.setdefault(record.vehicle_id, []).append(record)
+    by_vehicle_logs: dict[str, list[DailyCountLog]] = {}
+    for log in logs:
+        by_vehicle_logs.setdefault(log.vehicle_id, []).append(log)
+
+    tasks: list[_Task] = [
+        (vehicle_id, items, by_vehicle_transfers.get(vehicle_id, []), by_vehicle_logs.get(vehicle_id, []))
+        for vehicle_id, items in stock.items()
+    ]
+    chunks = [tasks[i : i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+    processes = workers or 1
+
+    with REGISTRY.span("reconcile"):
+        if executor is not None:
+            results = list(executor.map(_reconcile_chunk, chunks, repeat(start), repeat(end)))
+        elif processes <= 1 or len(chunks) <= 1:
+            results = [_reconcile_chunk(chunk, start, end) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=min(processes, len(chunks))) as pool:
+                results = list(pool.map(_reconcile_chunk, chunks, repeat(start), repeat(end)))
+
+    vehicles = [v for chunk in results for v in chunk]
+    unknown = [
+        vehicle_id
+        for vehicle_id, counted in by_vehicle_logs.items()
+        if vehicle_id not in stock and any(start <= log.timestamp < end for log in counted)
+    ]
+    return ReconciliationReport(
+        day,
+        vehicles,
+        missing_logs=[v.vehicle_id for v in vehicles if v.log_id is None],
+        unknown_vehicles=sorted(unknown),
+    )
@@ -0,0 +1,192 @@
+"""Batched QR scan ingestion for vehicle loadouts.
+
+Shelf QR codes carry the item id, and technicians scan them in bursts while
+loading a truck ("เบิกของเข้ารถ"). Applying every scan as its own transfer
+means one state update and one persist per scan. :class:`ScanIngestor`
+collects scans per vehicle, drops double-reads of the same code within a
+short window, and hands each burst to ``commit`` as one batched transfer
+once scanning goes quiet or the batch is full. While offline, batches wait
+in a bounded queue and are replayed in order on reconnect.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from .models import TransferLine
+from .store import TransferError
+
+CommitFn = Callable[[str, list[TransferLine]], Any]
+
+
+class ScanBufferFull(RuntimeError):
+    """The offline queue is full; the scan was not accepted."""
+
+
+@dataclass(frozen=True, slots=True)
+class Batch:
+    vehicle_id: str
+    lines: tuple[TransferLine, ...]
+    scans: int
+
+
+@dataclass(slots=True)
+class IngestMetrics:
+    scans: int = 0
+    duplicates: int = 0
+    batches: int = 0
+    lines_committed: int = 0
+    queued_offline: int = 0
+    rejected: int = 0
+
+
+@dataclass(slots=True)
+class _Pending:
+    counts: dict[str, int] = field(default_factory=dict)
+    scans: int = 0
+    last_at: float = 0.0
+
+
+class ScanIngestor:
+    """Debounces, deduplicates and batches scans into transfers.
+
+    ``poll()`` should be called from a UI timer; it flushes vehicles whose
+    last scan is older than ``quiet_period``. ``commit`` raising
+    ``OSError`` (including ``ConnectionError``) is treated as being offline;
+    a :class:`~pea_bpn.store.TransferError` rejects the batch, which is kept
+    in :attr:`rejected` for the UI to show.
+    """
+
+    def __init__(
+        self,
+        commit: CommitFn,
+        *,
+        quiet_period: float = 0.5,
+        dedup_window: float = 0.8,
+        max_batch: int = 200,
+        max_queued_scans: int = 5_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._commit = commit
+        self.quiet_period = quiet_period
+        self.dedup_window = dedup_window
+        self.max_batch = max_batch
+        self.max_queued_scans = max_queued_scans
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._pending: dict[str, _Pending] = {}
+        self._last_read: dict[tuple[str, str], float] = {}
+        self._queue: deque[Batch] = deque()
+        self._queued_scans = 0
+        self.online = True
+        self.rejected: list[tuple[Batch, TransferError]] = []
+        self.metrics = IngestMetrics()
+
+    @property
+    def queued(self) -> int:
+        """Scans waiting in the offline queue."""
+        return self._queued_scans
+
+    def push(self, vehicle_id: str, code: str, quantity: int = 1) -> bool:
+        """Record one scan; returns False if it was dropped as a double-read."""
+        now = self._clock()
+        with self._lock:
+            key = (vehicle_id, code)
+            last = self._last_read.get(key)
+            # The window is measured from the last accepted scan, so dropped
+            # double-reads do not extend it.
+            if last is not None and now - last < self.dedup_window:
+                self.metrics.duplicates += 1
+                return False
+            waiting = self._queued_scans + self._pending_scans()
+            if not self.online and waiting >= self.max_queued_scans:
+                raise ScanBufferFull(f"{waiting} scans waiting to sync")
+            self._last_read[key] = now
+
+            pending = self._pending.setdefault(vehicle_id, _Pending())
+            pending.counts[code] = pending.counts.get(code, 0) + quantity
+            pending.scans += 1
+            pending.last_at = now
+            self.metrics.scans += 1
+            if len(pending.counts) >= self.max_batch:
+                self._flush_vehicle(vehicle_id)
+            return True
+
+    def poll(self) -> int:
+        """Flush every vehicle that has been quiet long enough; returns batches flushed."""
+        now = self._clock()
+        with self._lock:
+            due = [v for v, p in self._pending.items() if now - p.last_at >= self.quiet_period]
+            for vehicle_id in due:
+                self._flush_vehicle(vehicle_id)
+            self._prune_reads(now)
+            return len(due)
+
+    def flush(self) -> None:
+        """Flush all pending scans now, e.g. when the loadout screen closes."""
+        with self._lock:
+            for vehicle_id in list(self._pending):
+                self._flush_vehicle(vehicle_id)
+
+    def set_online(self, online: bool) -> None:
+        with self._lock:
+            self.online = online
+            if online:
+                self.drain()
+
+    def drain(self) -> int:
+        """Replay queued batches in order; stops at the first network error."""
+        sent = 0
+        with self._lock:
+            while self._queue and self.online:
+                batch = self._queue[0]
+                if not self._send(batch):
+                    break
+                self._queue.popleft()
+                self._queued_scans -= batch.scans
+                sent += 1
+        return sent
+
+    def _pending_scans(self) -> int:
+        return sum(p.scans for p in self._pending.values())
+
+    def _flush_vehicle(self, vehicle_id: str) -> None:
+        pending = self._pending.pop(vehicle_id, None)
+        if pending is None or not pending.counts:
+            return
+        batch = Batch(
+            vehicle_id,
+            tuple(TransferLine(code, qty) for code, qty in pending.counts.items()),
+            pending.scans,
+        )
+        # Keep order: nothing may overtake batches already waiting offline.
+        if self._queue or not self.online or not self._send(batch):
+            self._enqueue(batch)
+
+    def _send(self, batch: Batch) -> bool:
+        try:
+            self._commit(batch.vehicle_id, list(batch.lines))
+        except OSError:
+            self.online = False
+            return False
+        except TransferError as exc:
+            self.rejected.append((batch, exc))
+            self.metrics.rejected += 1
+            return True
+        self.metrics.batches += 1
+        self.metrics.lines_committed += len(batch.lines)
+        return True
+
+    def _enqueue(self, batch: Batch) -> None:
+        self._queue.append(batch)
+        self._queued_scans += batch.scans
+        self.metrics.queued_offline += batch.scans
+
+    def _prune_reads(self, now: float) -> None:
+        if len(self._last_read) > 4 * self.max_batch:
+            horizon = now - self.dedup_window
+            self._last_read = {k: t for k, t in self._last_read.items() if t >= horizon}
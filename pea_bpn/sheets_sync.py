@@ -0,0 +1,314 @@
+"""Delta sync of the inventory to Google Sheets.
+
+``handleSyncToSheets`` rebuilds every row and writes the whole matrix at
+``Sheet1!A1`` on each sync. :class:`SheetsSyncEngine` instead remembers which
+sheet row each item lives on and a hash of what was last written there, and
+sends only rows whose content changed as ``values:batchUpdate`` calls.
+Hashes are committed per batch, so a sync that fails half way resumes with
+the rows that were not yet acknowledged.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Protocol, Sequence
+
+from .metrics import REGISTRY
+from .models import InventoryItem
+from .store import InventoryStore, ItemChanged, StoreEvent
+
+HEADER = ["รหัสพัสดุ", "ชื่อพัสดุ", "หมวดหมู่", "จำนวนคงเหลือ", "หน่วย", "จุดเตือนขั้นต่ำ"]
+_HEADER_KEY = "\x00header"
+_LAST_COLUMN = chr(ord("A") + len(HEADER) - 1)
+
+
+class SheetsSyncError(RuntimeError):
+    """A Sheets request failed; rows from earlier batches stay committed."""
+
+
+class SheetsTransport(Protocol):
+    def batch_update(self, spreadsheet_id: str, data: list[dict[str, Any]]) -> None:
+        """Write each ``{"range", "values"}`` entry of ``data``."""
+
+
+class HttpSheetsTransport:
+    """Blocking ``values:batchUpdate`` client for the Sheets v4 REST API.
+
+    ``base_url`` can point at :class:`~pea_bpn.fake_sheets.FakeSheetsServer`
+    for local runs.
+    """
+
+    def __init__(
+        self,
+        access_token: str,
+        base_url: str = "https://sheets.googleapis.com",
+        timeout: float = 30.0,
+    ) -> None:
+        self.access_token = access_token
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def batch_update(self, spreadsheet_id: str, data: list[dict[str, Any]]) -> None:
+        body = json.dumps({"valueInputOption": "RAW", "data": data}, ensure_ascii=False).encode()
+        request = urllib.request.Request(
+            f"{self.base_url}/v4/spreadsheets/{spreadsheet_id}/values:batchUpdate",
+            data=body,
+            method="POST",
+            headers={
+                "Authorization": f"Bearer {self.access_token}",
+                "Content-Type": "application/json; charset=utf-8",
+            },
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except (urllib.error.URLError, OSError) as exc:
+            raise SheetsSyncError(f"batchUpdate failed: {exc}") from exc
+
+
+def item_row(item: InventoryItem) -> list[Any]:
+    """The sheet row for ``item``, in :data:`HEADER` column order."""
+    return [item.id, item.name, item.category, item.quantity, item.unit, item.min_threshold]
+
+
+def _row_hash(values: Sequence[Any]) -> str:
+    encoded = json.dumps(values, ensure_ascii=False, separators=(",", ":")).encode()
+    return hashlib.blake2b(encoded, digest_size=12).hexdigest()
+
+
+@dataclass(slots=True)
+class SyncState:
+    """What the engine believes is on the sheet, keyed by item id.
+
+    ``to_dict``/``from_dict`` let the state be kept next to the inventory,
+    e.g. with ``SqliteRepository.put_record("sheets_sync", spreadsheet_id, ...)``.
+    """
+
+    rows: dict[str, int] = field(default_factory=dict)
+    hashes: dict[str, str] = field(default_factory=dict)
+    free_rows: list[int] = field(default_factory=list)
+    next_row: int = 2
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "hashes": self.hashes,
+            "freeRows": self.free_rows,
+            "nextRow": self.next_row,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> SyncState:
+        return cls(
+            rows=dict(data.get("rows", {})),
+            hashes=dict(data.get("hashes", {})),
+            free_rows=list(data.get("freeRows", [])),
+            next_row=int(data.get("nextRow", 2)),
+        )
+
+    def assign_row(self, item_id: str) -> int:
+        row = self.rows.get(item_id)
+        if row is None:
+            if self.free_rows:
+                self.free_rows.sort()
+                row = self.free_rows.pop(0)
+            else:
+                row = self.next_row
+                self.next_row += 1
+            self.rows[item_id] = row
+        return row
+
+
+@dataclass(slots=True)
+class SyncMetrics:
+    syncs: int = 0
+    requests: int = 0
+    failures: int = 0
+    rows_sent: int = 0
+    last_rows_sent: int = 0
+    last_rows_pending: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class _Pending:
+    key: str
+    row: int
+    values: list[Any]
+    digest: str | None
+
+
+class SheetsSyncEngine:
+    """Sends only inventory rows that changed since the last successful sync."""
+
+    def __init__(
+        self,
+        transport: SheetsTransport,
+        spreadsheet_id: str,
+        *,
+        sheet: str = "Sheet1",
+        state: SyncState | None = None,
+        max_rows_per_request: int = 500,
+    ) -> None:
+        self.transport = transport
+        self.spreadsheet_id = spreadsheet_id
+        self.sheet = sheet
+        self.state = state or SyncState()
+        self.max_rows_per_request = max_rows_per_request
+        self.metrics = SyncMetrics()
+        self._store: InventoryStore | None = None
+        self._unsubscribe: Callable[[], None] | None = None
+        self._dirty: dict[str, None] = {}
+        self._full_scan = True
+
+    def attach(self, store: InventoryStore) -> None:
+        """Follow ``store`` so :meth:`sync` only hashes items edited since.
+
+        The first sync after attaching still scans every item, since the
+        sheet may predate the store.
+        """
+        self.detach()
+        self._store = store
+        self._unsubscribe = store.subscribe(self._on_change)
+        self._full_scan = True
+
+    def detach(self) -> None:
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+        self._store = None
+        self._unsubscribe = None
+
+    def _on_change(self, event: StoreEvent) -> None:
+        if isinstance(event, ItemChanged):
+            self._dirty[event.item_id] = None
+
+    def plan(self, items: Iterable[InventoryItem]) -> list[_Pending]:
+        """Rows of ``items`` that differ from the last acknowledged write.
+
+        ``items`` is the full inventory: ids in the sync state but missing
+        from it have their rows blanked.
+        """
+        pending = self._plan_header()
+        seen = set()
+        for item in items:
+            seen.add(item.id)
+            self._plan_item(pending, item.id, item)
+        for item_id in [k for k in self.state.rows if k not in seen]:
+            self._plan_item(pending, item_id, None)
+        pending.sort(key=lambda p: p.row)
+        return pending
+
+    def _plan_dirty(self, store: InventoryStore, item_ids: Iterable[str]) -> list[_Pending]:
+        pending = self._plan_header()
+        for item_id in item_ids:
+            self._plan_item(pending, item_id, store.get_item(item_id))
+        pending.sort(key=lambda p: p.row)
+        return pending
+
+    def _plan_header(self) -> list[_Pending]:
+        digest = _row_hash(HEADER)
+        if self.state.hashes.get(_HEADER_KEY) == digest:
+            return []
+        return [_Pending(_HEADER_KEY, 1, list(HEADER), digest)]
+
+    def _plan_item(self, pending: list[_Pending], item_id: str, item: InventoryItem | None) -> None:
+        state = self.state
+        if item is None:
+            if item_id in state.rows:
+                pending.append(_Pending(item_id, state.rows[item_id], [""] * len(HEADER), None))
+            return
+        values = item_row(item)
+        digest = _row_hash(values)
+        if state.hashes.get(item_id) != digest:
+            pending.append(_Pending(item_id, state.assign_row(item_id), values, digest))
+
+    def sync(self, items: Iterable[InventoryItem] | None = None) -> int:
+        """Push changed rows; returns how many rows were sent.
+
+        With ``items`` every row is hashed and compared. Without it the
+        attached store is used and only items edited since the last complete
+        sync are looked at.
+
+        Raises :class:`SheetsSyncError` on the first failing request. Rows
+        from batches that already succeeded are committed to :attr:`state`;
+        calling ``sync`` again resends only the remainder.
+        """
+        with REGISTRY.span("sheets_sync"):
+            return self._sync(items)
+
+    def _sync(self, items: Iterable[InventoryItem] | None) -> int:
+        dirty, self._dirty = self._dirty, {}
+        if items is not None:
+            pending = self.plan(items)
+        elif self._store is None:
+            raise ValueError("sync() needs items or an attached store")
+        elif self._full_scan:
+            pending = self.plan(self._store.items())
+        else:
+            pending = self._plan_dirty(self._store, dirty)
+
+        try:
+            sent = self._send(pending)
+        except SheetsSyncError:
+            self._dirty = {**dirty, **self._dirty}
+            raise
+        if items is None:
+            self._full_scan = False
+        return sent
+
+    def _send(self, pending: list[_Pending]) -> int:
+        metrics = self.metrics
+        metrics.syncs += 1
+        metrics.last_rows_pending = len(pending)
+        metrics.last_rows_sent = 0
+
+        for start in range(0, len(pending), self.max_rows_per_request):
+            batch = pending[start : start + self.max_rows_per_request]
+            metrics.requests += 1
+            try:
+                with REGISTRY.span("sheets_request"):
+                    self.transport.batch_update(self.spreadsheet_id, self._ranges(batch))
+            except Exception as exc:
+                metrics.failures += 1
+                if isinstance(exc, SheetsSyncError):
+                    raise
+                raise SheetsSyncError(str(exc)) from exc
+            self._commit(batch)
+            metrics.rows_sent += len(batch)
+            metrics.last_rows_sent += len(batch)
+            REGISTRY.inc("sheets_rows_sent_total", len(batch))
+        return metrics.last_rows_sent
+
+    def _ranges(self, batch: list[_Pending]) -> list[dict[str, Any]]:
+        """Merge consecutive rows into one range each."""
+        data: list[dict[str, Any]] = []
+        first = last = -1
+        values: list[list[Any]] = []
+        for p in batch:
+            if values and p.row == last + 1:
+                values.append(p.values)
+                last = p.row
+                continue
+            if values:
+                data.append(self._range(first, last, values))
+            first = last = p.row
+            values = [p.values]
+        if values:
+            data.append(self._range(first, last, values))
+        return data
+
+    def _range(self, first: int, last: int, values: list[list[Any]]) -> dict[str, Any]:
+        return {"range": f"{self.sheet}!A{first}:{_LAST_COLUMN}{last}", "values": values}
+
+    def _commit(self, batch: list[_Pending]) -> None:
+        state = self.state
+        for p in batch:
+            if p.digest is None:
+                del state.rows[p.key]
+                state.hashes.pop(p.key, None)
+                state.free_rows.append(p.row)
+            else:
+                state.hashes[p.key] = p.digest
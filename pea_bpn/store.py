@@ -0,0 +1,228 @@
+"""Keyed inventory and vehicle store.
+
+Replaces the array scans in ``handleTransferItems`` (``transfers.find`` per
+item, ``findIndex`` per transfer) with dict lookups by ``itemId`` and
+``vehicleId``, so a transfer costs O(lines) regardless of catalogue size.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Mapping, Union
+
+from .metrics import REGISTRY
+from .models import InventoryItem, TransferLine, TransferRecord, VehicleInventory
+
+
+@dataclass(frozen=True, slots=True)
+class ItemChanged:
+    """An inventory item was added, edited or removed.
+
+    ``before`` is a detached copy (``None`` for additions); ``after`` is the
+    live record (``None`` for removals).
+    """
+
+    item_id: str
+    before: InventoryItem | None
+    after: InventoryItem | None
+
+
+@dataclass(frozen=True, slots=True)
+class VehicleChanged:
+    """A vehicle record was added, replaced or removed as a whole."""
+
+    vehicle_id: str
+    before: VehicleInventory | None
+    after: VehicleInventory | None
+
+
+@dataclass(frozen=True, slots=True)
+class VehicleStockChanged:
+    """The quantity of one item on one vehicle changed."""
+
+    vehicle_id: str
+    item_id: str
+    before: int
+    after: int
+
+
+StoreEvent = Union[ItemChanged, VehicleChanged, VehicleStockChanged]
+Listener = Callable[[StoreEvent], None]
+
+
+class TransferError(ValueError):
+    """Raised when a transfer batch fails validation; nothing is applied."""
+
+    def __init__(self, problems: list[str]) -> None:
+        super().__init__("; ".join(problems))
+        self.problems = problems
+
+
+class InventoryStore:
+    """Warehouse items and vehicle stock, indexed by id."""
+
+    def __init__(
+        self,
+        items: Iterable[InventoryItem] = (),
+        vehicles: Iterable[VehicleInventory] = (),
+    ) -> None:
+        self._items: dict[str, InventoryItem] = {item.id: item for item in items}
+        self._vehicles: dict[str, VehicleInventory] = {v.vehicle_id: v for v in vehicles}
+        self._listeners: list[Listener] = []
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        inventory: Iterable[Mapping[str, Any]],
+        vehicles: Iterable[Mapping[str, Any]] = (),
+    ) -> InventoryStore:
+        """Build a store from the ``inventory``/``vehicles`` JSON arrays."""
+        return cls(
+            (InventoryItem.from_dict(d) for d in inventory),
+            (VehicleInventory.from_dict(d) for d in vehicles),
+        )
+
+    def snapshot(self) -> dict[str, list[dict[str, Any]]]:
+        return {
+            "inventory": [item.to_dict() for item in self._items.values()],
+            "vehicles": [v.to_dict() for v in self._vehicles.values()],
+        }
+
+    # -- change events ---------------------------------------------------
+
+    def subscribe(self, listener: Listener) -> Callable[[], None]:
+        """Call ``listener`` after every change; returns an unsubscribe hook."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _emit(self, event: StoreEvent) -> None:
+        for listener in self._listeners:
+            listener(event)
+
+    # -- lookups ---------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self._items
+
+    def item(self, item_id: str) -> InventoryItem:
+        return self._items[item_id]
+
+    def get_item(self, item_id: str) -> InventoryItem | None:
+        return self._items.get(item_id)
+
+    def items(self) -> Iterator[InventoryItem]:
+        return iter(self._items.values())
+
+    def vehicle(self, vehicle_id: str) -> VehicleInventory:
+        return self._vehicles[vehicle_id]
+
+    def get_vehicle(self, vehicle_id: str) -> VehicleInventory | None:
+        return self._vehicles.get(vehicle_id)
+
+    def vehicles(self) -> Iterator[VehicleInventory]:
+        return iter(self._vehicles.values())
+
+    # -- edits -----------------------------------------------------------
+
+    def upsert_item(self, item: InventoryItem) -> None:
+        """Add or replace ``item``.
+
+        If the caller edited the stored record in place before upserting
+        it, ``before`` already shows the edit. Listeners that need the
+        previous state must keep their own copy.
+        """
+        before = self._items.get(item.id)
+        if before is not None:
+            before = dataclasses.replace(before)
+        self._items[item.id] = item
+        self._emit(ItemChanged(item.id, before, item))
+
+    def remove_item(self, item_id: str) -> InventoryItem:
+        item = self._items.pop(item_id)
+        self._emit(ItemChanged(item_id, item, None))
+        return item
+
+    def set_quantity(self, item_id: str, quantity: int) -> None:
+        if quantity < 0:
+            raise ValueError(f"quantity for {item_id!r} must be >= 0, got {quantity}")
+        item = self._items[item_id]
+        before = dataclasses.replace(item)
+        item.quantity = quantity
+        self._emit(ItemChanged(item_id, before, item))
+
+    def upsert_vehicle(self, vehicle: VehicleInventory) -> None:
+        before = self._vehicles.get(vehicle.vehicle_id)
+        self._vehicles[vehicle.vehicle_id] = vehicle
+        self._emit(VehicleChanged(vehicle.vehicle_id, before, vehicle))
+
+    def remove_vehicle(self, vehicle_id: str) -> VehicleInventory:
+        vehicle = self._vehicles.pop(vehicle_id)
+        self._emit(VehicleChanged(vehicle_id, vehicle, None))
+        return vehicle
+
+    # -- transfers -------------------------------------------------------
+
+    def apply_transfers(
+        self,
+        vehicle_id: str,
+        transfers: Iterable[TransferLine | Mapping[str, Any]],
+    ) -> TransferRecord:
+        """Move stock from the warehouse onto ``vehicle_id`` as one batch.
+
+        Lines for the same item are merged, then every line is validated in a
+        single pass. If any line is invalid a :class:`TransferError` listing
+        all problems is raised and the store is left untouched; unlike the
+        front end, oversubscription is reported rather than clamped to zero.
+        """
+        with REGISTRY.span("transfer"):
+            lines = merge_lines(transfers)
+            self.validate_transfer(vehicle_id, lines)
+
+            vehicle_items = self._vehicles[vehicle_id].items
+            for line in lines:
+                item = self._items[line.item_id]
+                before = dataclasses.replace(item) if self._listeners else None
+                item.quantity -= line.quantity
+                on_vehicle = vehicle_items.get(line.item_id, 0)
+                vehicle_items[line.item_id] = on_vehicle + line.quantity
+                if self._listeners:
+                    self._emit(ItemChanged(item.id, before, item))
+                    self._emit(
+                        VehicleStockChanged(vehicle_id, item.id, on_vehicle, on_vehicle + line.quantity)
+                    )
+        REGISTRY.inc("transfer_lines_total", len(lines))
+        return TransferRecord(vehicle_id, lines, time.time())
+
+    def validate_transfer(self, vehicle_id: str, lines: Iterable[TransferLine]) -> None:
+        problems = []
+        if vehicle_id not in self._vehicles:
+            problems.append(f"unknown vehicle {vehicle_id!r}")
+        for line in lines:
+            item = self._items.get(line.item_id)
+            if item is None:
+                problems.append(f"unknown item {line.item_id!r}")
+            elif line.quantity <= 0:
+                problems.append(f"quantity for {line.item_id!r} must be positive")
+            elif line.quantity > item.quantity:
+                problems.append(
+                    f"insufficient stock for {line.item_id!r}: "
+                    f"requested {line.quantity}, available {item.quantity}"
+                )
+        if problems:
+            raise TransferError(problems)
+
+
+def merge_lines(
+    transfers: Iterable[TransferLine | Mapping[str, Any]],
+) -> tuple[TransferLine, ...]:
+    """Normalise transfer lines, summing quantities per item."""
+    merged: dict[str, int] = {}
+    for t in transfers:
+        line = t if isinstance(t, TransferLine) else TransferLine.from_dict(t)
+        merged[line.item_id] = merged.get(line.item_id, 0) + line.quantity
+    return tuple(TransferLine(item_id, qty) for item_id, qty in merged.items())
@@ -0,0 +1,187 @@
+"""Server-side warehouse-to-vehicle transfers with optimistic versioning.
+
+In the browser ``handleTransferItems`` clamps oversubscribed stock with
+``Math.max(0, ...)`` and two storekeepers transferring at once simply
+overwrite each other in localStorage. :class:`TransferService` commits each
+multi-item transfer atomically against a shared :class:`InventoryStore`.
+Every item carries a version that is bumped on each change; a client that
+read stale versions, or asks for more than is on the shelf, gets a
+:class:`TransferConflict` listing every offending line and nothing is
+applied.
+"""
+
+from __future__ import annotations
+
+import itertools
+import threading
+from dataclasses import dataclass
+from typing import Any, Iterable, Literal, Mapping
+
+from .metrics import REGISTRY
+from .models import TransferLine, TransferRecord
+from .store import InventoryStore, ItemChanged, StoreEvent, TransferError, merge_lines
+
+
+@dataclass(frozen=True, slots=True)
+class Conflict:
+    item_id: str
+    reason: Literal["stale", "insufficient", "unknown"]
+    expected_version: int | None
+    current_version: int | None
+    requested: int
+    available: int
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "itemId": self.item_id,
+            "reason": self.reason,
+            "expectedVersion": self.expected_version,
+            "currentVersion": self.current_version,
+            "requested": self.requested,
+            "available": self.available,
+        }
+
+
+class TransferConflict(TransferError):
+    """The transfer was rejected; ``conflicts`` says why, per item."""
+
+    def __init__(self, conflicts: list[Conflict]) -> None:
+        super().__init__([f"{c.item_id}: {c.reason}" for c in conflicts])
+        self.conflicts = conflicts
+
+    @property
+    def retryable(self) -> bool:
+        """True when every conflict is a stale read rather than missing stock."""
+        return all(c.reason == "stale" for c in self.conflicts)
+
+
+@dataclass(frozen=True, slots=True)
+class Committed:
+    transfer_id: int
+    record: TransferRecord
+    versions: dict[str, int]
+
+
+class TransferService:
+    """Serializes transfers against one store and keeps the transfer history.
+
+    Only writes made through :meth:`commit`/:meth:`transfer` take the lock.
+    Direct store writes (``upsert_item``, ``set_quantity``, a sheets sync)
+    still bump versions, so readers see them as stale, but they are not
+    serialized with a commit running on another thread: route every writer
+    in a threaded server through the service, or through the same thread.
+    """
+
+    def __init__(self, store: InventoryStore) -> None:
+        self.store = store
+        self.history: list[TransferRecord] = []
+        self._lock = threading.Lock()
+        self._versions: dict[str, int] = {}
+        self._ids = itertools.count(1)
+        self._unsubscribe = store.subscribe(self._on_change)
+
+    def close(self) -> None:
+        self._unsubscribe()
+
+    def _on_change(self, event: StoreEvent) -> None:
+        if isinstance(event, ItemChanged):
+            self._versions[event.item_id] = self._versions.get(event.item_id, 0) + 1
+
+    def version(self, item_id: str) -> int:
+        return self._versions.get(item_id, 0)
+
+    def read(self, item_ids: Iterable[str]) -> dict[str, tuple[int, int]]:
+        """``{item_id: (quantity, version)}`` as one consistent snapshot."""
+        with self._lock:
+            out = {}
+            for item_id in item_ids:
+                item = self.store.get_item(item_id)
+                if item is not None:
+                    out[item_id] = (item.quantity, self.version(item_id))
+            return out
+
+    def commit(
+        self,
+        vehicle_id: str,
+        lines: Iterable[TransferLine | Mapping[str, Any]],
+        expected_versions: Mapping[str, int] | None = None,
+    ) -> Committed:
+        """Apply all lines or none.
+
+        ``expected_versions`` maps item ids to the versions the client saw;
+        items left out are not version-checked, only stock-checked.
+        """
+        merged = merge_lines(lines)
+        expected = expected_versions or {}
+        with self._lock:
+            if self.store.get_vehicle(vehicle_id) is None:
+                raise TransferError([f"unknown vehicle {vehicle_id!r}"])
+            conflicts = self._check(merged, expected)
+            if conflicts:
+                for conflict in conflicts:
+                    REGISTRY.inc("transfer_conflicts_total", reason=conflict.reason)
+                raise TransferConflict(conflicts)
+            record = self.store.apply_transfers(vehicle_id, merged)
+            self.history.append(record)
+            versions = {line.item_id: self.version(line.item_id) for line in merged}
+            return Committed(next(self._ids), record, versions)
+
+    def transfer(
+        self,
+        vehicle_id: str,
+        lines: Iterable[TransferLine | Mapping[str, Any]],
+        retries: int = 3,
+    ) -> Committed:
+        """Read versions, then commit; retry only on stale-version conflicts."""
+        merged = merge_lines(lines)
+        for attempt in range(retries + 1):
+            snapshot = self.read(line.item_id for line in merged)
+            try:
+                return self.commit(vehicle_id, merged, {k: v for k, (_, v) in snapshot.items()})
+            except TransferConflict as exc:
+                if not exc.retryable or attempt == retries:
+                    raise
+        raise AssertionError("unreachable")
+
+    def _check(self, lines: tuple[TransferLine, ...], expected: Mapping[str, int]) -> list[Conflict]:
+        conflicts = []
+        for line in lines:
+            if line.quantity <= 0:
+                raise TransferError([f"quantity for {line.item_id!r} must be positive"])
+            item = self.store.get_item(line.item_id)
+            if item is None:
+                conflicts.append(Conflict(line.item_id, "unknown", expected.get(line.item_id), None, line.quantity, 0))
+                continue
+            current = self.version(line.item_id)
+            want = expected.get(line.item_id)
+            if want is not None and want != current:
+                conflicts.append(Conflict(line.item_id, "stale", want, current, line.quantity, item.quantity))
+            elif line.quantity > item.quantity:
+                conflicts.append(
+                    Conflict(line.item_id, "insufficient", want, current, line.quantity, item.quantity)
+                )
+        return conflicts
+
+    def handle(self, payload: Mapping[str, Any]) -> dict[str, Any]:
+        """JSON entry point for ``POST /api/transfers``.
+
+        Takes ``{vehicleId, transfers: [{itemId, quantity, version?}]}`` and
+        answers in the ``{success, error}`` shape the other API routes use.
+        """
+        try:
+            transfers = list(payload["transfers"])
+            expected = {str(t["itemId"]): int(t["version"]) for t in transfers if "version" in t}
+            committed = self.commit(str(payload["vehicleId"]), transfers, expected)
+        except TransferConflict as exc:
+            return {
+                "success": False,
+                "error": str(exc),
+                "conflicts": [c.to_dict() for c in exc.conflicts],
+            }
+        except (TransferError, KeyError, TypeError, ValueError) as exc:
+            return {"success": False, "error": str(exc)}
+        return {
+            "success": True,
+            "transferId": committed.transfer_id,
+            "versions": committed.versions,
+        }
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import pytest
+
+from pea_bpn import InventoryItem, InventoryStore, TransferLine, VehicleInventory
+from pea_bpn.aggregates import DashboardViews, check_consistency, recompute
+
+INVENTORY = [
+    {"id": "A", "name": "สายไฟ", "category": "สายไฟ", "quantity": 10, "unit": "ม้วน", "minThreshold": 2},
+    {"id": "B", "name": "ฟิวส์", "category": "ฟิวส์", "quantity": 1, "unit": "ชิ้น", "minThreshold": 2},
+]
+VEHICLES = [{"vehicleId": "V1", "items": [{"itemId": "B", "quantity": 1}]}]
+
+
+@pytest.fixture
+def views() -> DashboardViews:
+    return DashboardViews(InventoryStore.from_snapshot(INVENTORY, VEHICLES))
+
+
+def test_snapshot_returns_totals_and_read_only_views(views: DashboardViews) -> None:
+    snap = views.snapshot()
+    assert snap["itemCount"] == 2
+    assert snap["lowStockCount"] == 1
+    assert snap["fleetIssued"] == 1
+    assert dict(snap["categoryQuantity"]) == {"สายไฟ": 10, "ฟิวส์": 1}
+    with pytest.raises(TypeError):
+        snap["vehicleQuantity"]["V1"] = 0
+
+    views.store.apply_transfers("V1", [TransferLine("A", 4)])
+    assert snap["vehicleQuantity"]["V1"] == 5
+    assert views.snapshot()["warehouseQuantity"] == 7
+
+
+def test_views_match_a_recompute_after_every_kind_of_change(views: DashboardViews) -> None:
+    store = views.store
+    store.apply_transfers("V1", [TransferLine("A", 3), TransferLine("B", 1)])
+    store.upsert_item(InventoryItem("A", "สายไฟ", "อื่นๆ", 1, "ม้วน", 5))
+    store.upsert_item(InventoryItem("C", "มิเตอร์", "มิเตอร์", 4, "ชิ้น"))
+    store.remove_item("B")
+    store.upsert_vehicle(VehicleInventory("V2", {"A": 2}))
+    store.remove_vehicle("V1")
+    assert check_consistency(views) == []
+    expected = recompute(store).to_dict()
+    actual = views.snapshot()
+    assert {k: v if isinstance(v, int) else dict(v) for k, v in actual.items()} == {
+        k: v if isinstance(v, int) else dict(v) for k, v in expected.items()
+    }
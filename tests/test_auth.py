@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from pea_bpn import auth
+from pea_bpn.app_cache import open_app_data
+from pea_bpn.auth import Authenticator, PasswordHasher, SessionTokens, UserRecord, UserStore
+
+ITERATIONS = 1_000
+
+
+def make_auth(**kwargs: Any) -> Authenticator:
+    authenticator = Authenticator(UserStore(PasswordHasher(ITERATIONS)), **kwargs)
+    authenticator.import_users(
+        [
+            {"id": "U1", "name": "สมชาย", "username": "somchai", "password": "pw1", "role": "USER"},
+            {"id": "U2", "name": "admin", "username": "admin", "password": "pw2", "role": "ADMIN"},
+        ]
+    ).result()
+    return authenticator
+
+
+def test_login_and_session() -> None:
+    with make_auth() as authenticator:
+        result = authenticator.login_sync("somchai", "pw1")
+        assert result.ok and result.user is not None and result.user.id == "U1"
+        assert authenticator.session(result.token) is result.user
+        assert not authenticator.login_sync("somchai", "wrong").ok
+        assert not authenticator.login_sync("nobody", "pw1").ok
+
+
+def test_unknown_user_costs_one_derivation_like_a_wrong_password(monkeypatch: pytest.MonkeyPatch) -> None:
+    with make_auth() as authenticator:
+        authenticator.login_sync("nobody", "x")  # derive the dummy hash
+        calls: list[int] = []
+        real = hashlib.pbkdf2_hmac
+
+        def counting(name: str, password: bytes, salt: bytes, iterations: int, *args: Any) -> bytes:
+            calls.append(iterations)
+            return real(name, password, salt, iterations, *args)
+
+        monkeypatch.setattr(auth.hashlib, "pbkdf2_hmac", counting)
+        authenticator.login_sync("somchai", "wrong")
+        wrong_password = list(calls)
+        calls.clear()
+        authenticator.login_sync("nobody", "wrong")
+        assert calls == wrong_password == [ITERATIONS]
+
+
+def test_hashing_never_runs_on_the_caller(monkeypatch: pytest.MonkeyPatch) -> None:
+    threads: set[str] = set()
+    real = hashlib.pbkdf2_hmac
+
+    def recording(*args: Any) -> bytes:
+        threads.add(threading.current_thread().name)
+        return real(*args)
+
+    monkeypatch.setattr(auth.hashlib, "pbkdf2_hmac", recording)
+    with make_auth() as authenticator:
+        authenticator.put_user({"id": "U3", "name": "", "username": "new", "password": "pw3"}).result()
+        authenticator.change_password("U1", "pw4").result()
+        authenticator.login_sync("nobody", "x")
+    assert threads and threading.current_thread().name not in threads
+
+
+def test_logout_revokes_one_token() -> None:
+    with make_auth() as authenticator:
+        first = authenticator.login_sync("somchai", "pw1").token
+        second = authenticator.login_sync("somchai", "pw1").token
+        authenticator.logout(first)
+        assert authenticator.session(first) is None
+        assert authenticator.session(second) is not None
+
+
+def test_password_change_revokes_every_token() -> None:
+    with make_auth() as authenticator:
+        token = authenticator.login_sync("somchai", "pw1").token
+        authenticator.change_password("U1", "new").result()
+        assert authenticator.session(token) is None
+        assert not authenticator.login_sync("somchai", "pw1").ok
+        assert authenticator.session(authenticator.login_sync("somchai", "new").token) is not None
+
+
+def test_revoke_during_verify_is_not_cached() -> None:
+    class Racing(SessionTokens):
+        race = False
+
+        def _sign(self, payload: str) -> str:
+            if self.race:
+                self.race = False
+                self.revoke_user("U1")
+            return super()._sign(payload)
+
+    tokens = Racing()
+    token = tokens.issue(UserRecord("U1", "", "somchai", "USER", "x"))
+    tokens._cache.clear()
+    tokens.race = True
+    assert tokens.verify(token) is None
+    assert tokens.verify(token) is None
+
+
+def test_revoked_set_ignores_forgeries_and_forgets_expired_tokens() -> None:
+    now = [1_000.0]
+    tokens = SessionTokens(ttl=60, clock=lambda: now[0])
+    user = UserRecord("U1", "", "somchai", "USER", "x")
+    token = tokens.issue(user)
+    tokens.revoke("forged.token")
+    tokens.revoke(token)
+    assert list(tokens._revoked) == [token]
+    now[0] += 61
+    tokens.revoke(tokens.issue(user))
+    assert token not in tokens._revoked
+
+
+@pytest.mark.parametrize("token", ["abc.ดี", "ดี.abc", "ดี", "", "a.b.c", "e30.x"])
+def test_malformed_tokens_are_rejected(token: str) -> None:
+    assert SessionTokens().verify(token) is None
+
+
+def test_revocations_survive_reopen(tmp_path: Path) -> None:
+    path = tmp_path / "app.db"
+    data = open_app_data(path)
+    data.users_loaded.result()
+    data.put_user({"id": "U1", "name": "", "username": "somchai", "password": "pw1"}).result()
+    logged_out = data.auth.login_sync("somchai", "pw1").token
+    kept = data.auth.login_sync("somchai", "pw1").token
+    changed = data.auth.login_sync("admin", "admin").token
+    data.auth.logout(logged_out)
+    data.put_user({"id": "U-ADMIN", "name": "", "username": "admin", "password": "new", "role": "ADMIN"}).result()
+    data.auth.close()
+    data.repo.close()
+
+    reopened = open_app_data(path)
+    reopened.users_loaded.result()
+    assert reopened.auth.session(logged_out) is None
+    assert reopened.auth.session(kept) is not None
+    assert reopened.auth.session(changed) is None
+    assert reopened.auth.login_sync("admin", "new").ok
+    assert reopened.users["U1"]["passwordHash"].startswith("pbkdf2_sha256$")
+    reopened.auth.close()
+
+
+def test_open_app_data_does_not_hash_on_the_caller(tmp_path: Path) -> None:
+    start = time.perf_counter()
+    data = open_app_data(tmp_path / "app.db")
+    opened_s = time.perf_counter() - start
+    data.users_loaded.result()
+    assert opened_s < 0.1
+    assert data.auth.login_sync("admin", "admin").ok
+    data.auth.close()
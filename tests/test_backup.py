@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import io
+import json
+from typing import Any
+
+import pytest
+
+from pea_bpn import DailyCountLog, EquipmentChecklist, InventoryItem, InventoryStore
+from pea_bpn.backup import BackupError, export_records, read_backup, restore_backup, write_backup
+from pea_bpn.logstore import checklist_store, daily_count_store
+from pea_bpn.metrics import REGISTRY
+
+ITEM = {"id": "I1", "name": "สายไฟ", "category": "สายไฟ", "quantity": 5, "unit": "ม้วน", "minThreshold": 2}
+VEHICLE = {"vehicleId": "V1", "items": [{"itemId": "I1", "quantity": 2}]}
+LOG = {"id": "L1", "vehicleId": "V1", "date": "2024-01-15T08:00:00Z", "items": [], "checkedBy": "u"}
+CHECKLIST = {"id": "C1", "vehicleId": "V1", "date": "2024-01-15", "items": [], "checkedBy": "u"}
+
+
+def backup_lines(records: list[tuple[str, dict[str, Any]]]) -> list[str]:
+    counts: dict[str, int] = {}
+    for kind, _ in records:
+        counts[kind] = counts.get(kind, 0) + 1
+    fh = io.StringIO()
+    write_backup(fh, export_records(records, counts))
+    return fh.getvalue().splitlines(keepends=True)
+
+
+def restore(lines: list[str] | list[bytes]) -> tuple[InventoryStore, Any, Any]:
+    store, logs, lists = InventoryStore(), daily_count_store(), checklist_store()
+    for _ in restore_backup(lines, store, logs, lists):
+        pass
+    return store, logs, lists
+
+
+def test_round_trip() -> None:
+    lines = backup_lines([("inventory", ITEM), ("vehicle", VEHICLE), ("dailyLog", LOG), ("checklist", CHECKLIST)])
+    store, logs, lists = restore(lines)
+    assert store.item("I1") == InventoryItem.from_dict(ITEM)
+    assert store.get_vehicle("V1").items == {"I1": 2}
+    assert list(logs.iter_range()) == [DailyCountLog.from_dict(LOG)]
+    assert list(lists.iter_range()) == [EquipmentChecklist.from_dict(CHECKLIST)]
+
+
+def test_malformed_line() -> None:
+    lines = backup_lines([("inventory", ITEM)])
+    lines[1] = lines[1][:-10] + "\n"
+    with pytest.raises(BackupError) as info:
+        restore(lines)
+    assert info.value.line == 2
+
+
+@pytest.mark.parametrize(("kind", "record"), [("dailyLog", LOG), ("checklist", CHECKLIST)])
+def test_bad_date_fails_validation_with_line_number(kind: str, record: dict[str, Any]) -> None:
+    lines = backup_lines([("inventory", ITEM), (kind, {**record, "date": "15/01/2567"})])
+    with pytest.raises(BackupError, match="invalid date") as info:
+        list(read_backup(lines))
+    assert info.value.line == 3
+
+
+def test_truncated_file() -> None:
+    lines = backup_lines([("inventory", ITEM), ("vehicle", VEHICLE)])
+    with pytest.raises(BackupError, match="truncated"):
+        restore(lines[:-1])
+    with pytest.raises(BackupError, match="counts"):
+        restore(lines[:2] + lines[-1:])
+
+
+def test_invalid_utf8() -> None:
+    lines = [line.encode() for line in backup_lines([("inventory", ITEM)])]
+    lines[1] = lines[1].replace("สาย".encode(), b"\xe0\xb8")
+    with pytest.raises(BackupError, match="UTF-8") as info:
+        restore(lines)
+    assert info.value.line == 2
+
+
+@pytest.mark.parametrize(
+    ("kind", "record"),
+    [
+        ("inventory", {**ITEM, "quantity": 1.7}),
+        ("vehicle", {"vehicleId": "V1", "items": [{"itemId": "I1", "quantity": 0.5}]}),
+    ],
+)
+def test_fractional_quantities_are_rejected(kind: str, record: dict[str, Any]) -> None:
+    records = [("inventory", ITEM), (kind, record)] if kind == "vehicle" else [(kind, record)]
+    with pytest.raises(BackupError, match="whole number"):
+        restore(backup_lines(records))
+
+
+def test_integral_floats_are_accepted() -> None:
+    store, _, _ = restore(backup_lines([("inventory", {**ITEM, "quantity": 5.0})]))
+    assert store.item("I1").quantity == 5
+
+
+def test_stopping_early_is_not_an_error() -> None:
+    lines = backup_lines([("inventory", ITEM)])
+    before = REGISTRY.counter("backup_import_errors_total", error="GeneratorExit")
+    progress = restore_backup(lines, InventoryStore())
+    next(progress)
+    progress.close()
+    assert REGISTRY.counter("backup_import_errors_total", error="GeneratorExit") == before
+
+
+def test_lines_hash_the_same_with_crlf() -> None:
+    lines = [line.replace("\n", "\r\n") for line in backup_lines([("inventory", ITEM)])]
+    assert [kind for kind, _ in read_backup(lines)] == ["manifest", "inventory"]
+    assert json.loads(lines[0])["counts"]["inventory"] == 1
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import pytest
+
+from pea_bpn import InventoryItem, TransferLine
+from pea_bpn.columnar import CHUNK, ColumnarInventory
+
+INVENTORY = [
+    {"id": f"I{i}", "name": f"item {i}", "category": "สายไฟ", "quantity": 10, "unit": "ชิ้น", "minThreshold": 2}
+    for i in range(CHUNK + 10)
+]
+VEHICLES = [{"vehicleId": "V1", "items": [{"itemId": "I0", "quantity": 1}]}, {"vehicleId": "V2", "items": []}]
+
+
+@pytest.fixture
+def table() -> ColumnarInventory:
+    return ColumnarInventory.from_records([{**INVENTORY[0], "barcode": "885"}, *INVENTORY[1:]], VEHICLES)
+
+
+def test_extra_fields_round_trip(table: ColumnarInventory) -> None:
+    assert table.item("I0").to_dict() == {**INVENTORY[0], "barcode": "885"}
+    assert table.item("I1").extra == {}
+    table.item("I0").extra["barcode"] = "changed"
+    assert table.item("I0").extra == {"barcode": "885"}
+
+
+def test_append_existing_id_replaces_every_column(table: ColumnarInventory) -> None:
+    updated = InventoryItem("I0", "renamed", "ฟิวส์", 4, "ม้วน", 7, {"note": "x"})
+    table.append(updated)
+    assert len(table) == len(INVENTORY)
+    assert table.item("I0") == updated
+    assert table.low_stock_count() == 1
+
+
+def test_snapshot_is_isolated_from_later_writes(table: ColumnarInventory) -> None:
+    snap = table.snapshot()
+    table.append(InventoryItem("I0", "renamed", "ฟิวส์", 4, "ม้วน", 7))
+    table.apply_transfers("V1", [TransferLine("I0", 1), TransferLine(f"I{CHUNK}", 2)])
+    table.apply_transfers("V2", [TransferLine("I1", 3)])
+    table.append(InventoryItem("NEW", "new", "ฟิวส์", 1, "ชิ้น"))
+
+    assert snap.item("I0").to_dict() == {**INVENTORY[0], "barcode": "885"}
+    assert snap.quantity(f"I{CHUNK}") == 10
+    assert dict(snap.vehicles["V1"]) == {"I0": 1}
+    assert dict(snap.vehicles["V2"]) == {}
+    assert "NEW" not in snap
+    with pytest.raises(TypeError):
+        snap.vehicles["V1"]["I0"] = 5  # type: ignore[index]
+
+    assert table.vehicles == {"V1": {"I0": 2, f"I{CHUNK}": 2}, "V2": {"I1": 3}}
+    assert table.quantity("I0") == 3
+
+
+def test_untouched_vehicles_are_shared(table: ColumnarInventory) -> None:
+    table.snapshot()
+    lines = table.vehicles["V2"]
+    table.apply_transfers("V1", [TransferLine("I1", 1)])
+    second = table.snapshot()
+    assert table.vehicles["V2"] is lines
+    assert dict(second.vehicles["V1"]) == {"I0": 1, "I1": 1}
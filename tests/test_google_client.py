@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from pea_bpn import InventoryItem, InventoryStore
+from pea_bpn.fake_sheets import FakeSheetsServer
+from pea_bpn.google_client import BlockingSheetsTransport, GoogleApiClient, GoogleApiError, OAuthTokens
+from pea_bpn.sheets_sync import HEADER, SheetsSyncEngine, SheetsSyncError, item_row
+
+SHEET_ID = "sheet-1"
+ROWS = [{"range": "Sheet1!A1:B2", "values": [["a", 1], ["b", 2]]}]
+
+
+def make_client(server: FakeSheetsServer, tokens: OAuthTokens | None = None, **kwargs: Any) -> GoogleApiClient:
+    if tokens is None:
+        tokens = OAuthTokens("unchecked", refresh_token="refresh", expires_at=time.time() + 3600)
+    kwargs.setdefault("backoff_base", 0.001)
+    return GoogleApiClient(
+        "client",
+        "secret",
+        tokens,
+        token_url=f"{server.url}/token",
+        sheets_url=server.url,
+        requests_per_minute=60_000,
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def server():
+    with FakeSheetsServer() as server:
+        yield server
+
+
+def test_write_and_read_back(server: FakeSheetsServer) -> None:
+    async def main() -> list[list[Any]]:
+        async with make_client(server) as client:
+            await client.batch_update(SHEET_ID, ROWS)
+            return await client.get_values(SHEET_ID, "Sheet1!A1:B2")
+
+    assert asyncio.run(main()) == [["a", 1], ["b", 2]]
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_retries_throttling_and_server_errors(server: FakeSheetsServer, status: int) -> None:
+    server.fail_next = 2
+    server.fail_status = status
+    server.retry_after = 0
+
+    async def main() -> GoogleApiClient:
+        async with make_client(server) as client:
+            await client.batch_update(SHEET_ID, ROWS)
+            return client
+
+    client = asyncio.run(main())
+    assert client.metrics.retries == 2
+    assert client.metrics.failures == 0
+    assert server.requests == 3
+    assert server.rows(SHEET_ID) == [["a", 1], ["b", 2]]
+
+
+def test_retry_after_is_honoured(server: FakeSheetsServer) -> None:
+    server.fail_next = 1
+    server.fail_status = 429
+    server.retry_after = 0.2
+
+    async def main() -> None:
+        async with make_client(server, backoff_base=0) as client:
+            await client.batch_update(SHEET_ID, ROWS)
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    assert time.perf_counter() - start >= 0.2
+
+
+def test_gives_up_after_max_retries(server: FakeSheetsServer) -> None:
+    server.fail_next = 10
+
+    async def main() -> GoogleApiClient:
+        async with make_client(server, max_retries=2) as client:
+            with pytest.raises(GoogleApiError) as info:
+                await client.batch_update(SHEET_ID, ROWS)
+            assert info.value.status == 503
+            return client
+
+    client = asyncio.run(main())
+    assert client.metrics.retries == 2
+    assert client.metrics.failures == 1
+    assert server.requests == 3
+
+
+def test_client_errors_are_not_retried(server: FakeSheetsServer) -> None:
+    server.fail_next = 1
+    server.fail_status = 400
+
+    async def main() -> None:
+        async with make_client(server) as client:
+            with pytest.raises(GoogleApiError) as info:
+                await client.batch_update(SHEET_ID, ROWS)
+            assert info.value.status == 400
+            assert client.metrics.retries == 0
+
+    asyncio.run(main())
+    assert server.requests == 1
+
+
+def test_401_refreshes_once_and_retries() -> None:
+    saved: list[OAuthTokens] = []
+
+    async def main(server: FakeSheetsServer) -> GoogleApiClient:
+        async with make_client(server, on_tokens=saved.append) as client:
+            await client.batch_update(SHEET_ID, ROWS)
+            return client
+
+    with FakeSheetsServer(check_auth=True) as server:
+        client = asyncio.run(main(server))
+        assert server.tokens_issued == 1
+        assert server.rows(SHEET_ID) == [["a", 1], ["b", 2]]
+    assert client.metrics.refreshes == 1
+    assert client.tokens is not None and client.tokens.access_token in server.valid_tokens
+    # The refresh reply carries no refresh token; the old one is kept.
+    assert client.tokens.refresh_token == "refresh"
+    assert saved == [client.tokens]
+
+
+def test_expiring_token_is_refreshed_before_the_request() -> None:
+    tokens = OAuthTokens("stale", refresh_token="refresh", expires_at=time.time() + 10)
+
+    async def main(server: FakeSheetsServer) -> GoogleApiClient:
+        async with make_client(server, tokens) as client:
+            await client.batch_update(SHEET_ID, ROWS)
+            return client
+
+    with FakeSheetsServer(check_auth=True) as server:
+        client = asyncio.run(main(server))
+        assert server.requests == 1
+    assert client.metrics.refreshes == 1
+    assert client.metrics.retries == 0
+
+
+def test_401_without_refresh_token_fails() -> None:
+    tokens = OAuthTokens("stale", expires_at=time.time() + 3600)
+
+    async def main(server: FakeSheetsServer) -> None:
+        async with make_client(server, tokens) as client:
+            with pytest.raises(GoogleApiError) as info:
+                await client.batch_update(SHEET_ID, ROWS)
+            assert info.value.status == 401
+
+    with FakeSheetsServer(check_auth=True) as server:
+        asyncio.run(main(server))
+        assert server.tokens_issued == 0
+
+
+def test_sync_engine_over_client_resumes_after_failure() -> None:
+    store = InventoryStore.from_snapshot(
+        [InventoryItem(f"I{i}", f"item {i}", "สายไฟ", i, "ม้วน", 5).to_dict() for i in range(5)], []
+    )
+    expected = [list(HEADER)] + [item_row(item) for item in store.items()]
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        with FakeSheetsServer(check_auth=True) as server:
+            client = make_client(server, max_retries=1)
+            asyncio.run_coroutine_threadsafe(client.__aenter__(), loop).result()
+            try:
+                engine = SheetsSyncEngine(BlockingSheetsTransport(client, loop), SHEET_ID, max_rows_per_request=3)
+                engine.attach(store)
+                assert engine.sync() == 6
+                assert server.rows(SHEET_ID) == expected
+
+                store.set_quantity("I0", 42)
+                store.set_quantity("I4", 7)
+                server.fail_next = 2
+                with pytest.raises(SheetsSyncError):
+                    engine.sync()
+                assert engine.sync() == 2
+                expected = [list(HEADER)] + [item_row(item) for item in store.items()]
+                assert server.rows(SHEET_ID) == expected
+            finally:
+                asyncio.run_coroutine_threadsafe(client.close(), loop).result()
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+    assert client.metrics.refreshes == 1
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from pea_bpn import DailyCountLog
+from pea_bpn.logstore import LogStore, daily_count_store
+
+
+def log(log_id: str, vehicle_id: str, date: str) -> DailyCountLog:
+    return DailyCountLog(log_id, vehicle_id, date, {"I1": 1}, "u")
+
+
+# several logs share a timestamp and they arrive out of id order
+LOGS = [
+    log("L5", "V1", "2024-01-31T17:00:00Z"),
+    log("L2", "V2", "2024-01-31T17:00:00Z"),
+    log("L9:x", "V1", "2024-01-31T17:00:00Z"),
+    log("L1", "V1", "2024-02-01T08:00:00Z"),
+    log("L3", "V2", "2024-01-15T08:00:00Z"),
+    log("L4", "V1", "2024-02-01T08:00:00Z"),
+]
+ORDER = ["L3", "L2", "L5", "L9:x", "L1", "L4"]
+
+
+def pages(store: LogStore[DailyCountLog], limit: int, **filters: str) -> list[list[str]]:
+    result, cursor = [], None
+    while True:
+        page = store.query(limit=limit, cursor=cursor, **filters)
+        result.append([r.id for r in page.records])
+        if page.next_cursor is None:
+            return result
+        cursor = page.next_cursor
+
+
+@pytest.mark.parametrize("limit", [1, 2, 4, 10])
+def test_pages_cover_every_record_once(limit: int) -> None:
+    store = daily_count_store()
+    for record in LOGS:
+        store.append(record)
+    assert [i for page in pages(store, limit) for i in page] == ORDER
+    assert [i for page in pages(store, limit, vehicle_id="V1") for i in page] == ["L5", "L9:x", "L1", "L4"]
+
+
+def test_range_bounds() -> None:
+    store = daily_count_store()
+    for record in LOGS:
+        store.append(record)
+    ids = [r.id for r in store.iter_range(start="2024-01-31T17:00:00Z", end="2024-02-01T08:00:00Z")]
+    assert ids == ["L2", "L5", "L9:x"]
+
+
+def test_replay_keeps_order_and_cursors(tmp_path: Path) -> None:
+    store = daily_count_store(tmp_path)
+    for record in LOGS:
+        store.append(record)
+    first = store.query(limit=2)
+    second = store.query(limit=2, cursor=first.next_cursor)
+
+    reopened = daily_count_store(tmp_path)
+    assert len(reopened) == len(LOGS)
+    assert list(reopened.iter_range()) == list(store.iter_range())
+    page = reopened.query(limit=2, cursor=first.next_cursor)
+    assert page == second
+    assert [r.id for r in reopened.query(limit=10, cursor=page.next_cursor).records] == ORDER[4:]
+
+
+def test_duplicate_and_bad_cursor() -> None:
+    store = daily_count_store()
+    store.append(LOGS[0])
+    with pytest.raises(ValueError, match="duplicate"):
+        store.append(LOGS[0])
+    with pytest.raises(ValueError, match="cursor"):
+        store.query(cursor="not a cursor")
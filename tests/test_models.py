@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from pea_bpn import DailyCountLog, VehicleInventory
+
+LOG = {"id": "L1", "vehicleId": "V1", "date": "2024-01-15T08:00:00Z", "checkedBy": "u"}
+
+
+@pytest.mark.parametrize(
+    "lines",
+    [
+        [{"itemId": "I1", "countedQuantity": 3}, {"itemId": "I2", "countedQuantity": 0}],
+        [{"itemId": "I1", "quantity": 3}, {"itemId": "I2", "quantity": 0}],
+        [{"itemId": "I1", "countedQuantity": 3, "note": "ชำรุด", "expected": 4}],
+        [],
+    ],
+)
+def test_daily_log_round_trips(lines: list[dict[str, Any]]) -> None:
+    record = {**LOG, "items": lines, "shift": "เช้า"}
+    log = DailyCountLog.from_dict(record)
+    assert log.to_dict() == record
+    assert DailyCountLog.from_dict(log.to_dict()) == log
+
+
+def test_daily_log_prefers_counted_quantity() -> None:
+    log = DailyCountLog.from_dict({**LOG, "items": [{"itemId": "I1", "countedQuantity": 2, "quantity": 5}]})
+    assert log.counts == {"I1": 2}
+    assert log.to_dict()["items"] == [{"itemId": "I1", "countedQuantity": 2, "quantity": 5}]
+
+
+def test_vehicle_lines_keep_extra_fields() -> None:
+    record = {
+        "vehicleId": "V1",
+        "plate": "กข 1234",
+        "items": [{"itemId": "I1", "quantity": 2, "serials": ["A", "B"]}, {"itemId": "I2", "quantity": 1}],
+    }
+    vehicle = VehicleInventory.from_dict(record)
+    assert vehicle.items == {"I1": 2, "I2": 1}
+    assert vehicle.to_dict() == record
+
+
+def test_vehicle_duplicate_lines_are_merged() -> None:
+    vehicle = VehicleInventory.from_dict(
+        {"vehicleId": "V1", "items": [{"itemId": "I1", "quantity": 2, "a": 1}, {"itemId": "I1", "quantity": 3, "b": 2}]}
+    )
+    assert vehicle.to_dict()["items"] == [{"itemId": "I1", "quantity": 5, "a": 1, "b": 2}]
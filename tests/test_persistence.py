@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+from pea_bpn import InventoryItem, InventoryStore, TransferLine, VehicleInventory
+from pea_bpn.persistence import SqliteRepository
+
+INVENTORY = [
+    {"id": i, "name": i, "category": "สายไฟ", "quantity": 10, "unit": "ชิ้น", "minThreshold": 0}
+    for i in ("Z9", "A1", "M5", "B2")
+]
+VEHICLES = [
+    {
+        "vehicleId": "V2",
+        "plate": "กข 1234",
+        "items": [
+            {"itemId": "Z9", "quantity": 1, "serials": ["S1"]},
+            {"itemId": "A1", "quantity": 2},
+        ],
+    },
+    {"vehicleId": "V1", "items": [{"itemId": "M5", "quantity": 3}]},
+]
+
+
+def reopen(path: Path) -> dict:
+    with SqliteRepository(path) as repo:
+        return repo.load_store().snapshot()
+
+
+def test_round_trip_keeps_array_order(tmp_path: Path) -> None:
+    path = tmp_path / "depot.db"
+    with SqliteRepository(path) as repo:
+        repo.save_all(InventoryStore.from_snapshot(INVENTORY, VEHICLES))
+    assert reopen(path) == {"inventory": INVENTORY, "vehicles": VEHICLES}
+
+
+def test_edits_keep_line_positions(tmp_path: Path) -> None:
+    path = tmp_path / "depot.db"
+    with SqliteRepository(path) as repo:
+        repo.save_all(InventoryStore.from_snapshot(INVENTORY, VEHICLES))
+        store = repo.load_store()
+        store.apply_transfers("V2", [TransferLine("A1", 1), TransferLine("B2", 1), TransferLine("M5", 1)])
+        store.upsert_item(InventoryItem("C3", "C3", "ฟิวส์", 1, "ชิ้น"))
+        repo.flush()
+        expected = store.snapshot()
+        store.upsert_vehicle(VehicleInventory("V1", {"B2": 1, "A1": 1}))
+        repo.flush()
+        expected["vehicles"][1] = store.vehicle("V1").to_dict()
+
+    snapshot = reopen(path)
+    assert snapshot == expected
+    assert [line["itemId"] for line in snapshot["vehicles"][0]["items"]] == ["Z9", "A1", "B2", "M5"]
+
+
+def test_opens_databases_without_positions(tmp_path: Path) -> None:
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE vehicles (vehicle_id TEXT PRIMARY KEY, data TEXT NOT NULL);
+        CREATE TABLE vehicle_items (
+            vehicle_id TEXT NOT NULL, item_id TEXT NOT NULL, quantity INTEGER NOT NULL,
+            PRIMARY KEY (vehicle_id, item_id)
+        ) WITHOUT ROWID;
+        INSERT INTO vehicles VALUES ('V1', '{}');
+        INSERT INTO vehicle_items VALUES ('V1', 'B', 1), ('V1', 'A', 2);
+        """
+    )
+    conn.commit()
+    conn.close()
+    with SqliteRepository(path) as repo:
+        store = repo.load_store()
+        assert list(store.vehicle("V1").items) == ["A", "B"]
+        store.upsert_vehicle(VehicleInventory("V1", {"B": 1, "A": 2}))
+        repo.flush()
+    assert list(reopen(path)["vehicles"][0]["items"]) == [{"itemId": "B", "quantity": 1}, {"itemId": "A", "quantity": 2}]
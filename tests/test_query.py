@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from pea_bpn import InventoryItem, InventoryStore
+from pea_bpn.query import InventoryIndex, SortField, _sort_key
+
+CATEGORIES = ("สายไฟ", "สายดิน", "มิเตอร์", "ฟิวส์")
+
+
+@pytest.fixture
+def store() -> InventoryStore:
+    rng = random.Random(0)
+    items = [
+        InventoryItem(f"ITM-{i:04d}", f"Item {rng.randrange(1000)}", rng.choice(CATEGORIES), rng.randrange(50), "ชิ้น")
+        for i in range(2_000)
+    ]
+    return InventoryStore.from_snapshot([item.to_dict() for item in items], [])
+
+
+def reference(store: InventoryStore, prefix: str, sort: SortField, descending: bool) -> list[str]:
+    needle = prefix.casefold()
+    matches = [
+        item for item in store.items() if any(_sort_key(item, f).startswith(needle) for f in ("id", "name", "category"))
+    ]
+    ordered = sorted((_sort_key(item, sort), item.id) for item in matches)
+    if descending:
+        ordered.reverse()
+    return [item_id for _, item_id in ordered]
+
+
+@pytest.mark.parametrize("prefix", ["", "itm", "สาย", "item 12", "ITM-001", "nothing"])
+@pytest.mark.parametrize("sort", ["id", "name", "quantity"])
+@pytest.mark.parametrize("descending", [False, True])
+def test_pages_match_a_full_sort(store: InventoryStore, prefix: str, sort: SortField, descending: bool) -> None:
+    index = InventoryIndex(store)
+    expected = reference(store, prefix, sort, descending)
+    assert index.count(prefix) == len(expected)
+    for offset in (0, 50, 1_000):
+        page = index.query(prefix=prefix, sort=sort, descending=descending, offset=offset, limit=50)
+        assert page.total == len(expected)
+        assert [item.id for item in page.rows] == expected[offset : offset + 50]
+
+
+def test_cached_matches_follow_store_changes(store: InventoryStore) -> None:
+    index = InventoryIndex(store)
+    for prefix in ("สาย", "item 1"):
+        index.query(prefix=prefix)
+
+    store.upsert_item(InventoryItem("ITM-0001", "สายใหม่", "อื่นๆ", 1, "ชิ้น"))
+    store.upsert_item(InventoryItem("NEW-1", "Item 1999", "มิเตอร์", 3, "ชิ้น"))
+    store.remove_item("ITM-0002")
+    store.set_quantity("ITM-0003", 49)
+
+    for prefix in ("สาย", "item 1"):
+        for sort in ("name", "quantity"):
+            expected = reference(store, prefix, sort, False)  # type: ignore[arg-type]
+            page = index.query(prefix=prefix, sort=sort, limit=100)  # type: ignore[arg-type]
+            assert page.total == len(expected)
+            assert [item.id for item in page.rows] == expected[:100]
+
+
+def test_quantity_is_not_searchable(store: InventoryStore) -> None:
+    with pytest.raises(ValueError):
+        InventoryIndex(store).query(prefix="1", fields=("quantity",))
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from pea_bpn import DailyCountLog, TransferLine, TransferRecord
+from pea_bpn.reconcile import day_bounds, reconcile
+
+from benchmarks.bench_reconcile import make_day
+
+DAY = date(2024, 1, 1)
+START, _ = day_bounds(DAY)
+
+
+def log(vehicle_id: str, hour: int, counts: dict[str, int], log_id: str = "") -> DailyCountLog:
+    return DailyCountLog(log_id or f"DL-{vehicle_id}-{hour}", vehicle_id, f"2024-01-01T{hour:02d}:00:00Z", counts)
+
+
+def transfer(vehicle_id: str, hour: int, item_id: str, quantity: int) -> TransferRecord:
+    return TransferRecord(vehicle_id, (TransferLine(item_id, quantity),), START + hour * 3600)
+
+
+def test_transfers_after_the_count_are_not_expected() -> None:
+    opening = {"V1": {"A": 5}}
+    transfers = [transfer("V1", 6, "A", 2), transfer("V1", 14, "A", 10), transfer("V1", 15, "B", 1)]
+    report = reconcile(DAY, opening, transfers, [log("V1", 8, {"A": 7})], workers=1)
+    assert report.flagged == []
+    assert report.vehicles[0].expected_total == 7
+
+
+def test_latest_count_wins_and_unknown_vehicles_are_reported() -> None:
+    opening = {"V1": {"A": 5}, "V2": {"A": 1}}
+    logs = [
+        log("V1", 8, {"A": 1}),
+        log("V1", 9, {"A": 5}),
+        log("V9", 8, {"A": 1}),
+        DailyCountLog("old", "V8", "2023-12-31T08:00:00Z", {}),
+    ]
+    report = reconcile(DAY, opening, [], logs, workers=1)
+    assert report.vehicles[0].log_id == "DL-V1-9"
+    assert report.flagged == []
+    assert report.missing_logs == ["V2"]
+    assert report.unknown_vehicles == ["V9"]
+
+
+def test_short_over_uncounted_and_unexpected() -> None:
+    opening = {"V1": {"A": 5, "B": 2, "C": 1}}
+    report = reconcile(DAY, opening, [], [log("V1", 8, {"A": 4, "B": 3, "D": 1})], workers=1)
+    kinds = {d.item_id: d.kind for d in report.vehicles[0].discrepancies}
+    assert kinds == {"A": "short", "B": "over", "C": "uncounted", "D": "unexpected"}
+
+
+def test_process_pool_matches_in_process() -> None:
+    opening, transfers, logs = make_day(300)
+    serial = reconcile(DAY, opening, transfers, logs)
+    pooled = reconcile(DAY, opening, transfers, logs, workers=2, chunk_size=50)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        shared = reconcile(DAY, opening, transfers, logs, executor=pool, chunk_size=64)
+    assert serial.rows()
+    for other in (pooled, shared):
+        assert other.rows() == serial.rows()
+        assert other.missing_logs == serial.missing_logs
+        assert other.unknown_vehicles == serial.unknown_vehicles
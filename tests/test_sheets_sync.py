@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from pea_bpn import InventoryItem, InventoryStore
+from pea_bpn.fake_sheets import FakeSheetsServer
+from pea_bpn.sheets_sync import HEADER, HttpSheetsTransport, SheetsSyncEngine, SheetsSyncError, item_row
+
+SHEET_ID = "sheet-1"
+
+
+def make_store(n: int = 5) -> InventoryStore:
+    return InventoryStore.from_snapshot(
+        [InventoryItem(f"I{i}", f"item {i}", "สายไฟ", 10 + i, "ม้วน", 5).to_dict() for i in range(n)], []
+    )
+
+
+def expected_rows(store: InventoryStore) -> list[list[Any]]:
+    return [list(HEADER)] + [item_row(item) for item in store.items()]
+
+
+class FailOnCall:
+    """Makes the server reject the ``n``-th batchUpdate (1-based)."""
+
+    def __init__(self, server: FakeSheetsServer, n: int) -> None:
+        self.inner = HttpSheetsTransport("token", base_url=server.url)
+        self.server = server
+        self.n = n
+        self.calls = 0
+
+    def batch_update(self, spreadsheet_id: str, data: list[dict[str, Any]]) -> None:
+        self.calls += 1
+        if self.calls == self.n:
+            self.server.fail_next = 1
+        self.inner.batch_update(spreadsheet_id, data)
+
+
+@pytest.fixture
+def server():
+    with FakeSheetsServer() as server:
+        yield server
+
+
+def test_full_then_delta_sync(server: FakeSheetsServer) -> None:
+    store = make_store()
+    engine = SheetsSyncEngine(HttpSheetsTransport("token", base_url=server.url), SHEET_ID)
+    engine.attach(store)
+
+    assert engine.sync() == 6
+    assert server.rows(SHEET_ID) == expected_rows(store)
+
+    store.set_quantity("I3", 99)
+    assert engine.sync() == 1
+    assert server.rows_written == 7
+    assert server.rows(SHEET_ID) == expected_rows(store)
+    assert engine.sync() == 0
+
+
+def test_removed_item_row_is_blanked(server: FakeSheetsServer) -> None:
+    store = make_store(3)
+    engine = SheetsSyncEngine(HttpSheetsTransport("token", base_url=server.url), SHEET_ID)
+    engine.attach(store)
+    engine.sync()
+
+    store.remove_item("I2")
+    assert engine.sync() == 1
+    assert server.rows(SHEET_ID) == expected_rows(store)
+    assert "I2" not in engine.state.rows
+
+
+def test_partial_failure_resumes_with_unacknowledged_rows(server: FakeSheetsServer) -> None:
+    store = make_store()
+    transport = FailOnCall(server, 2)
+    engine = SheetsSyncEngine(transport, SHEET_ID, max_rows_per_request=2)
+    engine.attach(store)
+
+    with pytest.raises(SheetsSyncError):
+        engine.sync()
+    assert engine.metrics.failures == 1
+    assert engine.metrics.last_rows_sent == 2
+    assert server.rows(SHEET_ID) == expected_rows(store)[:2]
+
+    # The first batch is committed; only the other four rows are resent.
+    assert engine.sync() == 4
+    assert server.rows_written == 6
+    assert server.rows(SHEET_ID) == expected_rows(store)
+
+
+def test_failed_delta_sync_keeps_edits_pending(server: FakeSheetsServer) -> None:
+    store = make_store()
+    engine = SheetsSyncEngine(HttpSheetsTransport("token", base_url=server.url), SHEET_ID)
+    engine.attach(store)
+    engine.sync()
+
+    store.set_quantity("I1", 0)
+    server.fail_next = 1
+    with pytest.raises(SheetsSyncError):
+        engine.sync()
+
+    assert engine.sync() == 1
+    assert server.rows(SHEET_ID) == expected_rows(store)
+
+
+def test_rejected_token_is_a_sync_error() -> None:
+    with FakeSheetsServer(check_auth=True) as server:
+        engine = SheetsSyncEngine(HttpSheetsTransport("unknown", base_url=server.url), SHEET_ID)
+        with pytest.raises(SheetsSyncError):
+            engine.sync(make_store().items())
+        assert server.rows(SHEET_ID) == []
+        assert engine.state.hashes == {}
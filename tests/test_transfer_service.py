@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from pea_bpn import InventoryStore, TransferLine
+from pea_bpn.transfer_service import TransferConflict, TransferService
+
+INVENTORY = [
+    {"id": "A", "name": "สายไฟ", "category": "สายไฟ", "quantity": 10, "unit": "ม้วน"},
+    {"id": "B", "name": "ฟิวส์", "category": "ฟิวส์", "quantity": 5, "unit": "ชิ้น"},
+]
+VEHICLES = [{"vehicleId": "V1", "items": []}, {"vehicleId": "V2", "items": []}]
+
+
+@pytest.fixture
+def service() -> TransferService:
+    return TransferService(InventoryStore.from_snapshot(INVENTORY, VEHICLES))
+
+
+def test_versions_bump_on_every_change(service: TransferService) -> None:
+    assert service.read(["A", "B", "missing"]) == {"A": (10, 0), "B": (5, 0)}
+    committed = service.commit("V1", [TransferLine("A", 2)], {"A": 0})
+    assert committed.versions == {"A": 1}
+    service.store.set_quantity("B", 4)
+    assert service.read(["A", "B"]) == {"A": (8, 1), "B": (4, 1)}
+
+
+def test_stale_version_conflicts_and_applies_nothing(service: TransferService) -> None:
+    service.store.set_quantity("A", 9)
+    with pytest.raises(TransferConflict) as info:
+        service.commit("V1", [TransferLine("A", 1), TransferLine("B", 9)], {"A": 0, "B": 0})
+    assert [(c.item_id, c.reason) for c in info.value.conflicts] == [("A", "stale"), ("B", "insufficient")]
+    assert not info.value.retryable
+    assert service.read(["A", "B"]) == {"A": (9, 1), "B": (5, 0)}
+    assert service.store.vehicle("V1").items == {}
+    assert service.history == []
+
+
+def test_transfer_retries_stale_reads(service: TransferService, monkeypatch: pytest.MonkeyPatch) -> None:
+    read = service.read
+    calls = 0
+
+    def racing_read(item_ids):
+        nonlocal calls
+        snapshot = read(item_ids)
+        calls += 1
+        if calls == 1:
+            service.store.set_quantity("A", 8)  # another writer lands between read and commit
+        return snapshot
+
+    monkeypatch.setattr(service, "read", racing_read)
+    committed = service.transfer("V1", [TransferLine("A", 3)])
+    assert calls == 2
+    assert committed.versions == {"A": 2}
+    assert service.store.item("A").quantity == 5
+
+
+def test_transfer_gives_up_after_retries(service: TransferService, monkeypatch: pytest.MonkeyPatch) -> None:
+    read = service.read
+
+    def always_stale(item_ids):
+        snapshot = read(item_ids)
+        service.store.set_quantity("A", service.store.item("A").quantity)
+        return snapshot
+
+    monkeypatch.setattr(service, "read", always_stale)
+    with pytest.raises(TransferConflict) as info:
+        service.transfer("V1", [TransferLine("A", 1)], retries=2)
+    assert info.value.retryable
+    assert service.store.item("A").quantity == 10
+
+
+def test_insufficient_stock_is_not_retried(service: TransferService) -> None:
+    with pytest.raises(TransferConflict) as info:
+        service.transfer("V1", [TransferLine("B", 6)])
+    assert [c.reason for c in info.value.conflicts] == ["insufficient"]
+
+
+def test_concurrent_transfers_never_oversubscribe(service: TransferService) -> None:
+    barrier = threading.Barrier(8)
+    outcomes: list[bool] = []
+
+    def worker(vehicle_id: str) -> None:
+        barrier.wait()
+        for _ in range(5):
+            try:
+                service.transfer(vehicle_id, [TransferLine("A", 1)])
+                outcomes.append(True)
+            except TransferConflict as exc:
+                assert not exc.retryable
+                outcomes.append(False)
+
+    threads = [threading.Thread(target=worker, args=(f"V{i % 2 + 1}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    store = service.store
+    assert outcomes.count(True) == 10
+    assert store.item("A").quantity == 0
+    assert store.vehicle("V1").items.get("A", 0) + store.vehicle("V2").items.get("A", 0) == 10
+    assert len(service.history) == 10
+    assert service.version("A") == 10
+
+
+def test_commit_waits_for_the_lock(service: TransferService) -> None:
+    done = threading.Event()
+    with service._lock:
+        thread = threading.Thread(target=lambda: (service.commit("V1", [TransferLine("A", 1)]), done.set()))
+        thread.start()
+        assert not done.wait(0.05)
+        assert service.store.item("A").quantity == 10
+    thread.join()
+    assert done.is_set()
+    assert service.store.item("A").quantity == 9
+
+
+def test_handle_reports_conflicts(service: TransferService) -> None:
+    reply = service.handle({"vehicleId": "V1", "transfers": [{"itemId": "A", "quantity": 1, "version": 3}]})
+    assert reply["success"] is False
+    assert reply["conflicts"][0]["reason"] == "stale"
+    assert service.handle({"vehicleId": "V9", "transfers": []})["success"] is False
+    reply = service.handle({"vehicleId": "V1", "transfers": [{"itemId": "A", "quantity": 1, "version": 0}]})
+    assert reply == {"success": True, "transferId": 1, "versions": {"A": 1}}
+
+
+def test_close_stops_tracking(service: TransferService) -> None:
+    service.close()
+    service.store.set_quantity("A", 1)
+    assert service.version("A") == 0